@@ -0,0 +1,128 @@
+import json
+from typing import AsyncIterator, Awaitable, Callable
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+
+from app.api.streaming import NDJSON_MEDIA_TYPE
+from app.core.config import settings
+from app.db import db_manager
+from app.db.fanout import FanoutResult, TenantFanout, TenantQuery
+from app.db.tenant_stats import compute_tenant_stats
+from app.models.tenant import Document, Profile
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+class FanoutParams:
+    """Query parameters chung cho các truy vấn fan-out qua nhiều tenant."""
+
+    def __init__(
+        self,
+        tenant_ids: str | None = Query(
+            None,
+            description="Danh sách tenant IDs, phân tách bởi dấu phẩy (mặc định: tất cả)",
+        ),
+        concurrency: int = Query(
+            settings.fanout_concurrency, ge=1, le=256,
+            description="Số tenant được truy vấn đồng thời",
+        ),
+        timeout: float = Query(
+            settings.fanout_tenant_timeout, gt=0,
+            description="Timeout cho mỗi tenant (giây)",
+        ),
+    ):
+        self.tenant_ids = (
+            [tenant_id.strip() for tenant_id in tenant_ids.split(",") if tenant_id.strip()]
+            if tenant_ids
+            else None
+        )
+        self.fanout = TenantFanout(concurrency=concurrency, timeout=timeout)
+
+
+async def _stream_fanout(
+    params: FanoutParams,
+    query: TenantQuery,
+    on_result: Callable[[FanoutResult], Awaitable[None]] | None = None,
+) -> AsyncIterator[bytes]:
+    """Stream kết quả fan-out dạng NDJSON, mỗi tenant một dòng khi tenant đó xong."""
+    async for result in params.fanout.run(query, params.tenant_ids):
+        if on_result is not None and result.ok:
+            try:
+                await on_result(result)
+            except Exception as exc:
+                result.error = str(exc)
+        line = {
+            "tenant_id": result.tenant_id,
+            "value": jsonable_encoder(result.value),
+            "error": result.error,
+            "elapsed_ms": round(result.elapsed * 1000, 2),
+        }
+        yield json.dumps(line, ensure_ascii=False).encode() + b"\n"
+
+
+@router.get("/tenants/profiles/count", response_class=StreamingResponse)
+async def count_profiles_per_tenant(params: FanoutParams = Depends()):
+    """
+    Đếm số profiles của từng tenant.
+    Kết quả stream dạng NDJSON: `{"tenant_id", "value", "error", "elapsed_ms"}`.
+    """
+    async def count_profiles(conn):
+        return await conn.scalar(select(func.count()).select_from(Profile))
+
+    return StreamingResponse(
+        _stream_fanout(params, count_profiles),
+        media_type=NDJSON_MEDIA_TYPE,
+    )
+
+
+@router.get("/tenants/documents/search", response_class=StreamingResponse)
+async def search_documents_in_tenants(
+    title: str = Query(..., min_length=1, description="Chuỗi cần tìm trong title (không phân biệt hoa thường)"),
+    limit: int = Query(20, ge=1, le=settings.list_max_limit, description="Số documents tối đa mỗi tenant"),
+    params: FanoutParams = Depends(),
+):
+    """
+    Tìm documents có title chứa chuỗi cho trước trong mọi tenant.
+    Kết quả stream dạng NDJSON, `value` là danh sách `{id, title, created_at}`;
+    tenant không có kết quả vẫn có một dòng với `value` rỗng.
+    """
+    stmt = (
+        select(Document.id, Document.title, Document.created_at)
+        .where(Document.title.icontains(title, autoescape=True))
+        .order_by(Document.id)
+        .limit(limit)
+    )
+
+    async def find_documents(conn):
+        result = await conn.execute(stmt)
+        return [dict(row) for row in result.mappings()]
+
+    return StreamingResponse(
+        _stream_fanout(params, find_documents),
+        media_type=NDJSON_MEDIA_TYPE,
+    )
+
+
+@router.post("/tenants/stats/rebuild", response_class=StreamingResponse)
+async def rebuild_tenant_stats(params: FanoutParams = Depends()):
+    """
+    Tính lại thống kê (`/shared/tenants/stats`) từ dữ liệu thật của từng tenant
+    và ghi đè vào shared database. Dùng khi số liệu cộng dồn bị lệch
+    (process dừng đột ngột, ghi trực tiếp vào tenant file, ...).
+    """
+    async def compute(conn):
+        counts, modified_at = await compute_tenant_stats(conn)
+        return {"counts": counts, "modified_at": modified_at}
+
+    async def save(result: FanoutResult):
+        await db_manager.tenant_stats.set_absolute(
+            result.tenant_id, result.value["counts"], result.value["modified_at"]
+        )
+
+    return StreamingResponse(
+        _stream_fanout(params, compute, on_result=save),
+        media_type=NDJSON_MEDIA_TYPE,
+    )
@@ -0,0 +1,108 @@
+import json
+from typing import Any, Generic, Iterator, List, Sequence, Type, TypeVar
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, ValidationError
+
+from app.api.streaming import NDJSON_MEDIA_TYPE
+from app.core.config import settings
+
+T = TypeVar("T")
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+class BulkItemError(BaseModel):
+    """Lỗi của một phần tử trong bulk request (index theo thứ tự gửi lên)."""
+    index: int
+    detail: Any
+
+
+class BulkResult(BaseModel, Generic[T]):
+    """Kết quả bulk create: các bản ghi đã tạo và lỗi theo từng phần tử."""
+    created: List[T]
+    errors: List[BulkItemError]
+
+
+def bulk_openapi(schema: Type[BaseModel]) -> dict:
+    """Mô tả request body (JSON array hoặc NDJSON) cho OpenAPI docs."""
+    item_ref = {"$ref": f"#/components/schemas/{schema.__name__}"}
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"type": "array", "items": item_ref}},
+                NDJSON_MEDIA_TYPE: {"schema": item_ref},
+            },
+        }
+    }
+
+
+async def _iter_raw_items(request: Request):
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith(NDJSON_MEDIA_TYPE):
+        # Đọc NDJSON theo từng dòng khi body đang được stream lên
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield line
+        if buffer.strip():
+            yield buffer
+        return
+
+    try:
+        payload = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body không phải JSON hợp lệ")
+    if not isinstance(payload, list):
+        raise HTTPException(status_code=400, detail="Body phải là JSON array")
+    for item in payload:
+        yield item
+
+
+async def read_bulk_items(
+    request: Request,
+    schema: Type[SchemaT],
+) -> tuple[list[tuple[int, SchemaT]], list[BulkItemError]]:
+    """
+    Đọc và validate các phần tử của bulk request.
+    Hỗ trợ JSON array (`application/json`) và NDJSON (`application/x-ndjson`).
+
+    Args:
+        request: FastAPI request
+        schema: Pydantic schema của từng phần tử
+
+    Returns:
+        (danh sách (index, item) hợp lệ, danh sách lỗi validate)
+
+    Raises:
+        HTTPException: 400 nếu body sai định dạng, 413 nếu vượt BULK_MAX_ITEMS
+    """
+    items: list[tuple[int, SchemaT]] = []
+    errors: list[BulkItemError] = []
+    index = 0
+    async for raw in _iter_raw_items(request):
+        if index >= settings.bulk_max_items:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Tối đa {settings.bulk_max_items} phần tử mỗi request",
+            )
+        try:
+            if isinstance(raw, bytes):
+                items.append((index, schema.model_validate_json(raw)))
+            else:
+                items.append((index, schema.model_validate(raw)))
+        except ValidationError as exc:
+            detail = exc.errors(include_url=False, include_context=False)
+            errors.append(BulkItemError(index=index, detail=detail))
+        index += 1
+    return items, errors
+
+
+def chunked(items: Sequence[T], size: int | None = None) -> Iterator[Sequence[T]]:
+    """Chia danh sách thành các chunk (mặc định BULK_CHUNK_SIZE phần tử)."""
+    size = size or settings.bulk_chunk_size
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
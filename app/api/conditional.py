@@ -0,0 +1,141 @@
+import hashlib
+from typing import Any, Awaitable, Callable
+
+from fastapi import HTTPException, Request, Response
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db import db_manager
+
+# Header không lưu cùng body trong cache (được tính lại khi tạo Response)
+_UNCACHED_HEADERS = ("content-length", "content-type")
+
+# Cache response bytes: ETag -> (body, headers, media_type)
+response_cache = TTLCache(settings.response_cache_size, settings.response_cache_ttl)
+
+
+def _request_tenant_id(request: Request) -> str | None:
+    """Tenant của request: path parameter, query parameter hoặc header X-Tenant-ID."""
+    return (
+        request.path_params.get("tenant_id")
+        or request.query_params.get("tenant_id")
+        or request.headers.get("x-tenant-id")
+    )
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """So khớp header If-None-Match (weak comparison, hỗ trợ danh sách và `*`)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class ConditionalRead:
+    """
+    Conditional GET cho một tenant read route, trả về bởi `conditional_read`.
+
+    ETag được tính từ tenant, schema version, version của các tables mà route
+    đọc, path và query string. Version nằm trong chính tenant database (tăng
+    bởi triggers) nên mọi lệnh ghi - từ worker khác, CLI hay sqlite client -
+    đều đổi ETag; kiểm tra chỉ tốn một truy vấn nhỏ qua reader pool thay vì
+    chạy truy vấn của route. Route gọi `respond()` với hàm tạo response thật.
+    """
+
+    def __init__(self, response: Response, etag: str | None = None):
+        self.response = response
+        self.etag = etag
+
+    @classmethod
+    async def for_request(
+        cls, request: Request, response: Response, tables: tuple[str, ...]
+    ) -> "ConditionalRead":
+        """Tính ETag hiện tại của request (None nếu tắt hoặc không có tenant)."""
+        tenant_id = _request_tenant_id(request)
+        if not settings.tenant_etag_enabled or tenant_id is None:
+            return cls(response)
+
+        versions = await db_manager.get_table_versions(tenant_id, tables)
+        parts = [
+            tenant_id,
+            str(db_manager.tenant_schema_version),
+            *(f"{table}={versions[table]}" for table in tables),
+            request.url.path,
+            str(request.url.query),
+        ]
+        digest = hashlib.sha256("\n".join(parts).encode()).hexdigest()[:32]
+        return cls(response, f'"{digest}"')
+
+    @property
+    def headers(self) -> dict[str, str]:
+        """Header gắn vào mọi response của route (kể cả 304)."""
+        if self.etag is None:
+            return {}
+        return {"ETag": self.etag, "Cache-Control": "no-cache"}
+
+    async def respond(self, build: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Trả response từ cache nếu có, nếu không gọi `build()` và gắn ETag.
+        Chỉ response dạng bytes (Response, ví dụ FastJSONResponse) được cache;
+        kết quả khác (ORM objects) vẫn được gắn ETag qua sub-response.
+        """
+        if self.etag is None:
+            return await build()
+
+        if settings.response_cache_enabled:
+            cached = response_cache.get(self.etag)
+            if cached is not None:
+                body, headers, media_type = cached
+                return Response(body, media_type=media_type, headers={**headers, **self.headers})
+
+        result = await build()
+        if not isinstance(result, Response):
+            self.response.headers.update(self.headers)
+            return result
+
+        if (
+            settings.response_cache_enabled
+            and result.status_code == 200
+            and len(result.body) <= settings.response_cache_max_entry_bytes
+        ):
+            headers = {
+                name: value
+                for name, value in result.headers.items()
+                if name not in _UNCACHED_HEADERS
+            }
+            response_cache.set(self.etag, (bytes(result.body), headers, result.media_type))
+        result.headers.update(self.headers)
+        return result
+
+
+def conditional_read(*tables: str) -> Callable[[Request, Response], Awaitable[ConditionalRead]]:
+    """
+    Dependency cho tenant read routes: trả 304 khi If-None-Match khớp ETag hiện tại.
+
+    Khai báo trước dependency tenant session để request 304 không mở session
+    và không chạy truy vấn của route.
+
+    Sử dụng:
+        @router.get("/{tenant_id}/items")
+        async def get_items(
+            conditional: ConditionalRead = Depends(conditional_read("items")),
+            db: AsyncSession = Depends(get_tenant_db_from_path),
+        ):
+            return await conditional.respond(lambda: load_items(db))
+
+    Args:
+        *tables: Các tenant tables mà route đọc
+    """
+
+    async def dependency(request: Request, response: Response) -> ConditionalRead:
+        conditional = await ConditionalRead.for_request(request, response, tables)
+        if conditional.etag is not None and _etag_matches(
+            request.headers.get("if-none-match"), conditional.etag
+        ):
+            raise HTTPException(status_code=304, headers=conditional.headers)
+        return conditional
+
+    return dependency
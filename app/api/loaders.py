@@ -0,0 +1,115 @@
+import asyncio
+from typing import Any, Iterable
+
+from fastapi import Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.bulk import chunked
+from app.api.records import USER_RECORD_COLUMNS
+from app.core.cache import record_cache, user_keys
+from app.db import get_shared_read_db
+from app.models.shared import User
+
+
+class UserLoader:
+    """
+    Request-scoped batching loader cho users trong shared database.
+
+    Các lời gọi `load()` trong cùng một vòng event loop được gom lại và
+    resolve bằng một truy vấn `IN` duy nhất, tránh N+1 khi kết hợp dữ liệu
+    giữa tenant database và shared database. Users đã có trong record cache
+    không cần truy vấn; kết quả được cache trong phạm vi request.
+
+    Sử dụng:
+        @router.get("/...")
+        async def route(users: UserLoader = Depends(get_user_loader)):
+            user = await users.load(user_id)            # dict hoặc None
+            many = await users.load_many([1, 2, 3])      # một truy vấn
+    """
+
+    def __init__(self, db: AsyncSession):
+        self._db = db
+        self._futures: dict[int, asyncio.Future] = {}
+        self._pending: list[int] = []
+        self._dispatch_scheduled = False
+        # Event loop chỉ giữ weak reference tới task: giữ reference để task
+        # dispatch không bị garbage-collect khi đang chạy
+        self._dispatch_tasks: set[asyncio.Task] = set()
+        # AsyncSession không cho phép truy vấn đồng thời
+        self._lock = asyncio.Lock()
+
+    def load(self, user_id: int) -> "asyncio.Future[dict[str, Any] | None]":
+        """
+        Lấy user theo ID (được gom batch).
+
+        Returns:
+            Future trả về dict {id, email, name, created_at} hoặc None
+        """
+        future = self._futures.get(user_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._futures[user_id] = future
+            self._pending.append(user_id)
+            if not self._dispatch_scheduled:
+                self._dispatch_scheduled = True
+                # Task chạy sau các lời gọi load() còn lại trong vòng event loop hiện tại
+                task = loop.create_task(self._dispatch())
+                self._dispatch_tasks.add(task)
+                task.add_done_callback(self._dispatch_tasks.discard)
+        return future
+
+    async def load_many(self, user_ids: Iterable[int]) -> list[dict[str, Any] | None]:
+        """Lấy nhiều users, giữ nguyên thứ tự của `user_ids`."""
+        return list(await asyncio.gather(*(self.load(user_id) for user_id in user_ids)))
+
+    async def _dispatch(self) -> None:
+        user_ids, self._pending = self._pending, []
+        self._dispatch_scheduled = False
+        futures = [self._futures[user_id] for user_id in user_ids]
+
+        records: dict[int, dict[str, Any]] = {}
+        missing = []
+        for user_id in user_ids:
+            record = record_cache.get(f"user:id:{user_id}")
+            if record is None:
+                missing.append(user_id)
+            else:
+                records[user_id] = record
+
+        try:
+            async with self._lock:
+                for chunk in chunked(missing):
+                    result = await self._db.execute(
+                        select(*USER_RECORD_COLUMNS).where(User.id.in_(chunk))
+                    )
+                    for row in result.mappings():
+                        record = dict(row)
+                        record_cache.set(user_keys(record), record)
+                        records[record["id"]] = record
+        except BaseException as exc:
+            # Truy vấn lỗi hoặc task bị hủy: không để request nào chờ mãi
+            for user_id, future in zip(user_ids, futures):
+                # Không cache lỗi: lần load sau sẽ truy vấn lại
+                self._futures.pop(user_id, None)
+                if future.done():
+                    continue
+                if isinstance(exc, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(exc)
+            if not isinstance(exc, Exception):
+                raise
+            return
+
+        for user_id, future in zip(user_ids, futures):
+            if not future.done():
+                future.set_result(records.get(user_id))
+
+
+async def get_user_loader(
+    shared_db: AsyncSession = Depends(get_shared_read_db),
+) -> UserLoader:
+    """Dependency tạo UserLoader dùng chung trong một request."""
+    return UserLoader(shared_db)
@@ -0,0 +1,187 @@
+from typing import Any, Type
+
+from fastapi import HTTPException, Query, Response
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.serialization import FastJSONResponse, response_columns
+from app.core.config import settings
+
+# Header trả về cursor cho trang kế tiếp (không có nếu là trang cuối)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class CursorParams:
+    """Query parameters cho keyset pagination theo `id`."""
+
+    def __init__(
+        self,
+        limit: int = Query(
+            settings.list_default_limit,
+            ge=1,
+            le=settings.list_max_limit,
+            description="Số bản ghi tối đa mỗi trang",
+        ),
+        after: int | None = Query(
+            None,
+            description=f"Cursor: giá trị header {NEXT_CURSOR_HEADER} của trang trước",
+        ),
+    ):
+        self.limit = limit
+        self.after = after
+        self.fields: str | None = None
+
+
+class PageParams(CursorParams):
+    """
+    Query parameters cho keyset pagination theo `id` và field projection.
+
+    Sử dụng:
+        @router.get("/items", response_model=List[ItemResponse])
+        async def get_items(
+            response: Response,
+            page: PageParams = Depends(),
+            db: AsyncSession = Depends(get_db),
+        ):
+            return await paginate(db, Item, ItemResponse, page, response)
+    """
+
+    def __init__(
+        self,
+        limit: int = Query(
+            settings.list_default_limit,
+            ge=1,
+            le=settings.list_max_limit,
+            description="Số bản ghi tối đa mỗi trang",
+        ),
+        after: int | None = Query(
+            None,
+            description=f"Cursor: giá trị header {NEXT_CURSOR_HEADER} của trang trước",
+        ),
+        fields: str | None = Query(
+            None,
+            description="Danh sách field cần lấy, phân tách bởi dấu phẩy (ví dụ: id,title)",
+        ),
+    ):
+        super().__init__(limit=limit, after=after)
+        self.fields = fields
+
+
+def resolve_fields(model, schema: Type[BaseModel], fields: str | None) -> list[str] | None:
+    """
+    Kiểm tra danh sách field projection.
+
+    Args:
+        model: SQLAlchemy model
+        schema: Pydantic response schema (contract của endpoint)
+        fields: Chuỗi field phân tách bởi dấu phẩy
+
+    Returns:
+        Danh sách tên cột (luôn gồm `id`), hoặc None nếu không projection
+
+    Raises:
+        HTTPException: 400 nếu field không tồn tại trong response schema
+    """
+    if not fields:
+        return None
+
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    columns = model.__table__.columns
+    invalid = [
+        name for name in requested
+        if name not in schema.model_fields or name not in columns
+    ]
+    if invalid:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Field không hợp lệ: {', '.join(invalid)}",
+        )
+
+    names = ["id"] + [name for name in requested if name != "id"]
+    return list(dict.fromkeys(names))
+
+
+async def load_page(
+    db: AsyncSession,
+    model,
+    page: CursorParams,
+    *criteria: Any,
+    columns: list[str] | None = None,
+) -> tuple[list, str | None]:
+    """
+    Lấy một trang dữ liệu theo keyset (`id > after ORDER BY id LIMIT n`).
+
+    Args:
+        db: Database session
+        model: SQLAlchemy model (phải có cột `id`)
+        page: Tham số phân trang
+        *criteria: Điều kiện WHERE bổ sung
+        columns: Chỉ SELECT các cột này (Core rows), mặc định lấy ORM objects
+
+    Returns:
+        (danh sách ORM objects hoặc Core rows, cursor trang kế tiếp hoặc None)
+    """
+    if columns is None:
+        stmt = select(model)
+    else:
+        stmt = select(*(model.__table__.c[name] for name in columns))
+
+    stmt = stmt.where(*criteria)
+    if page.after is not None:
+        stmt = stmt.where(model.id > page.after)
+    stmt = stmt.order_by(model.id).limit(page.limit + 1)
+
+    result = await db.execute(stmt)
+    rows = result.scalars().all() if columns is None else result.all()
+
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[: page.limit]
+        next_cursor = str(rows[-1].id)
+    return rows, next_cursor
+
+
+async def paginate(
+    db: AsyncSession,
+    model,
+    schema: Type[BaseModel],
+    page: CursorParams,
+    response: Response,
+    *criteria: Any,
+):
+    """
+    Lấy một trang dữ liệu theo keyset (`id > after ORDER BY id LIMIT n`).
+    Cursor của trang kế tiếp được trả qua header `X-Next-Cursor`.
+
+    Khi bật FAST_LIST_SERIALIZATION (mặc định), chỉ SELECT các cột của response
+    schema dưới dạng Core rows (không qua identity map, không validate bằng
+    Pydantic) và serialize thẳng ra JSON bytes. Nếu có `fields`, chỉ các cột
+    được yêu cầu được SELECT (bỏ qua các cột lớn như `Document.content` ở mức SQL).
+
+    Args:
+        db: Database session
+        model: SQLAlchemy model (phải có cột `id`)
+        schema: Pydantic response schema (contract của endpoint)
+        page: Tham số phân trang
+        response: Response của route (để gắn header)
+        *criteria: Điều kiện WHERE bổ sung
+
+    Returns:
+        FastJSONResponse, hoặc danh sách ORM objects khi tắt fast path
+    """
+    column_names = resolve_fields(model, schema, page.fields)
+    if column_names is None and settings.fast_list_serialization:
+        column_names = response_columns(model, schema)
+
+    rows, next_cursor = await load_page(db, model, page, *criteria, columns=column_names)
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor is not None else {}
+
+    if column_names is not None:
+        return FastJSONResponse(
+            content=[dict(zip(column_names, row)) for row in rows],
+            headers=headers,
+        )
+
+    response.headers.update(headers)
+    return rows
@@ -0,0 +1,65 @@
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import record_cache, tenant_keys, user_keys
+from app.models.shared import Tenant, User
+
+# Các cột được lưu trong record (dạng dict, không gắn với session)
+USER_RECORD_COLUMNS = (User.id, User.email, User.name, User.created_at)
+TENANT_RECORD_COLUMNS = (
+    Tenant.id,
+    Tenant.tenant_id,
+    Tenant.name,
+    Tenant.status,
+    Tenant.created_at,
+)
+
+
+async def get_user_record(db: AsyncSession, user_id: int) -> dict[str, Any] | None:
+    """
+    Lấy user theo ID qua read-through cache.
+
+    Returns:
+        dict {id, email, name, created_at} hoặc None nếu không tồn tại
+    """
+    record = record_cache.get(f"user:id:{user_id}")
+    if record is None:
+        result = await db.execute(select(*USER_RECORD_COLUMNS).where(User.id == user_id))
+        row = result.mappings().one_or_none()
+        if row is None:
+            return None
+        record = dict(row)
+        record_cache.set(user_keys(record), record)
+    return record
+
+
+async def get_tenant_record(db: AsyncSession, tenant_id: str) -> dict[str, Any] | None:
+    """
+    Lấy tenant theo tenant_id qua read-through cache.
+
+    Returns:
+        dict {id, tenant_id, name, status, created_at} hoặc None nếu không tồn tại
+    """
+    record = record_cache.get(f"tenant:tenant_id:{tenant_id}")
+    if record is None:
+        result = await db.execute(
+            select(*TENANT_RECORD_COLUMNS).where(Tenant.tenant_id == tenant_id)
+        )
+        row = result.mappings().one_or_none()
+        if row is None:
+            return None
+        record = dict(row)
+        record_cache.set(tenant_keys(record), record)
+    return record
+
+
+def invalidate_user(user: User) -> None:
+    """Invalidate cache sau khi ghi user."""
+    record_cache.invalidate(*user_keys({"id": user.id, "email": user.email}))
+
+
+def invalidate_tenant(tenant: Tenant) -> None:
+    """Invalidate cache sau khi ghi tenant."""
+    record_cache.invalidate(*tenant_keys({"id": tenant.id, "tenant_id": tenant.tenant_id}))
@@ -0,0 +1,69 @@
+import datetime
+import decimal
+import json
+import uuid
+from typing import Any, Type
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # orjson là optional dependency (extra `fast`)
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Kiểu không có sẵn trong json: định dạng giống Pydantic JSON mode."""
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, decimal.Decimal)):
+        return str(value)
+    if isinstance(value, bytes):
+        return value.decode()
+    raise TypeError(f"Kiểu {type(value).__name__} không serialize được sang JSON")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serialize sang JSON bytes (UTF-8, không escape ký tự non-ASCII).
+    Dùng orjson nếu đã cài, nếu không dùng thư viện json chuẩn.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(
+        content,
+        default=_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse serialize trực tiếp bằng `dumps` (orjson nếu có).
+    Dùng cho dữ liệu đã ở dạng dict/list các giá trị đơn giản (Core rows),
+    không đi qua `jsonable_encoder` hay Pydantic.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def response_columns(model, schema: Type[BaseModel]) -> list[str]:
+    """
+    Các cột cần SELECT để trả về `schema` trực tiếp từ Core rows, theo thứ tự
+    field của schema (giống output của Pydantic).
+
+    Raises:
+        ValueError: nếu schema có field không phải là cột của model
+    """
+    columns = model.__table__.columns
+    missing = [name for name in schema.model_fields if name not in columns]
+    if missing:
+        raise ValueError(
+            f"{schema.__name__} có field không phải cột của {model.__tablename__}: "
+            f"{', '.join(missing)}"
+        )
+    return list(schema.model_fields)
@@ -1,13 +1,28 @@
 from datetime import datetime
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel, EmailStr
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import BaseModel, EmailStr, Field
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import get_shared_db
-from app.models.shared import Tenant, User
+from app.api.bulk import (
+    BulkItemError,
+    BulkResult,
+    bulk_openapi,
+    chunked,
+    read_bulk_items,
+)
+from app.api.pagination import PageParams, paginate
+from app.api.records import (
+    get_tenant_record,
+    get_user_record,
+    invalidate_tenant,
+    invalidate_user,
+)
+from app.core.config import TENANT_ID_PATTERN, settings
+from app.db import db_manager, get_shared_db, get_shared_read_db
+from app.models.shared import Tenant, TenantStats, User
 
 router = APIRouter(prefix="/shared", tags=["Shared Database"])
 
@@ -29,11 +44,24 @@ class UserResponse(BaseModel):
 
 
 class TenantCreate(BaseModel):
-    tenant_id: str
+    tenant_id: str = Field(pattern=TENANT_ID_PATTERN)
     name: str
     status: str = "active"
 
 
+class TenantStatsResponse(BaseModel):
+    id: int
+    tenant_id: str
+    profile_count: int
+    document_count: int
+    profile_modified_at: datetime | None
+    document_modified_at: datetime | None
+    updated_at: datetime | None
+
+    class Config:
+        from_attributes = True
+
+
 class TenantResponse(BaseModel):
     id: int
     tenant_id: str
@@ -63,23 +91,90 @@ async def create_user(
     db.add(new_user)
     await db.commit()
     await db.refresh(new_user)
+    invalidate_user(new_user)
 
     return new_user
 
 
+@router.post(
+    "/users/bulk",
+    response_model=BulkResult[UserResponse],
+    openapi_extra=bulk_openapi(UserCreate),
+)
+async def create_users_bulk(
+    request: Request,
+    db: AsyncSession = Depends(get_shared_db),
+):
+    """
+    Tạo nhiều users trong một request (JSON array hoặc NDJSON).
+    Email được kiểm tra bằng một truy vấn IN cho mỗi chunk, insert theo chunk
+    trong từng transaction; lỗi được trả về theo index của phần tử.
+    """
+    items, errors = await read_bulk_items(request, UserCreate)
+
+    # Loại bỏ email trùng trong cùng request
+    seen: set[str] = set()
+    unique_items = []
+    for index, item in items:
+        if item.email in seen:
+            errors.append(BulkItemError(index=index, detail="Email bị trùng trong request"))
+            continue
+        seen.add(item.email)
+        unique_items.append((index, item))
+
+    created = []
+    for chunk in chunked(unique_items):
+        result = await db.execute(
+            select(User.email).where(User.email.in_([item.email for _, item in chunk]))
+        )
+        existing = set(result.scalars().all())
+        rows = []
+        for index, item in chunk:
+            if item.email in existing:
+                errors.append(BulkItemError(index=index, detail="Email đã tồn tại"))
+            else:
+                rows.append((index, {"email": item.email, "name": item.name}))
+        if not rows:
+            continue
+
+        try:
+            result = await db.execute(
+                insert(User).returning(User), [values for _, values in rows]
+            )
+            chunk_created = result.scalars().all()
+            await db.commit()
+            for user in chunk_created:
+                invalidate_user(user)
+        except Exception as exc:
+            await db.rollback()
+            errors.extend(BulkItemError(index=index, detail=str(exc)) for index, _ in rows)
+            continue
+        created.extend(chunk_created)
+
+    errors.sort(key=lambda error: error.index)
+    return BulkResult[UserResponse](
+        created=[UserResponse.model_validate(user) for user in created],
+        errors=errors,
+    )
+
+
 @router.get("/users", response_model=List[UserResponse])
-async def get_users(db: AsyncSession = Depends(get_shared_db)):
-    """Lấy danh sách tất cả users từ shared database."""
-    result = await db.execute(select(User))
-    users = result.scalars().all()
-    return users
+async def get_users(
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_shared_read_db),
+):
+    """
+    Lấy danh sách users từ shared database.
+    Phân trang theo keyset: dùng header X-Next-Cursor làm `after` cho trang kế tiếp.
+    """
+    return await paginate(db, User, UserResponse, page, response)
 
 
 @router.get("/users/{user_id}", response_model=UserResponse)
-async def get_user(user_id: int, db: AsyncSession = Depends(get_shared_db)):
-    """Lấy thông tin user theo ID từ shared database."""
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+async def get_user(user_id: int, db: AsyncSession = Depends(get_shared_read_db)):
+    """Lấy thông tin user theo ID từ shared database (qua record cache)."""
+    user = await get_user_record(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User không tồn tại")
     return user
@@ -91,7 +186,7 @@ async def create_tenant(
     tenant_data: TenantCreate,
     db: AsyncSession = Depends(get_shared_db),
 ):
-    """Tạo tenant mới trong shared database."""
+    """Tạo tenant mới trong shared database và tạo sẵn tenant database ở nền."""
     # Kiểm tra tenant_id đã tồn tại chưa
     result = await db.execute(
         select(Tenant).where(Tenant.tenant_id == tenant_data.tenant_id)
@@ -109,23 +204,53 @@ async def create_tenant(
     db.add(new_tenant)
     await db.commit()
     await db.refresh(new_tenant)
+    invalidate_tenant(new_tenant)
+
+    # Tạo file và schema của tenant database ở nền để request đầu tiên không phải
+    # chờ (không mở engine trong cache: tạo hàng loạt tenant không evict tenant khác)
+    if settings.tenant_prewarm_on_create:
+        db_manager.schedule_prewarm(db_manager.provision_tenant(new_tenant.tenant_id))
 
     return new_tenant
 
 
 @router.get("/tenants", response_model=List[TenantResponse])
-async def get_tenants(db: AsyncSession = Depends(get_shared_db)):
-    """Lấy danh sách tất cả tenants từ shared database."""
-    result = await db.execute(select(Tenant))
-    tenants = result.scalars().all()
-    return tenants
+async def get_tenants(
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_shared_read_db),
+):
+    """
+    Lấy danh sách tenants từ shared database.
+    Phân trang theo keyset: dùng header X-Next-Cursor làm `after` cho trang kế tiếp.
+    """
+    return await paginate(db, Tenant, TenantResponse, page, response)
+
+
+@router.get("/tenants/stats", response_model=List[TenantStatsResponse])
+async def get_tenant_stats(
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_shared_db),
+):
+    """
+    Thống kê số profiles/documents và thời điểm sửa cuối của từng tenant.
+    Số liệu được cộng dồn khi ghi vào tenant database, nên mỗi tenant chỉ là
+    một dòng đọc từ shared database (không mở tenant database).
+
+    Nhất quán sau (eventually consistent): thay đổi của worker này được flush
+    trước khi đọc và đọc từ primary (không qua replica), thay đổi của các
+    worker khác xuất hiện sau tối đa TENANT_STATS_FLUSH_INTERVAL giây.
+    """
+    # Ghi các thay đổi đang chờ của worker này trước khi đọc từ primary
+    await db_manager.tenant_stats.flush()
+    return await paginate(db, TenantStats, TenantStatsResponse, page, response)
 
 
 @router.get("/tenants/{tenant_id}", response_model=TenantResponse)
-async def get_tenant(tenant_id: str, db: AsyncSession = Depends(get_shared_db)):
-    """Lấy thông tin tenant theo tenant_id từ shared database."""
-    result = await db.execute(select(Tenant).where(Tenant.tenant_id == tenant_id))
-    tenant = result.scalar_one_or_none()
+async def get_tenant(tenant_id: str, db: AsyncSession = Depends(get_shared_read_db)):
+    """Lấy thông tin tenant theo tenant_id từ shared database (qua record cache)."""
+    tenant = await get_tenant_record(db, tenant_id)
     if not tenant:
         raise HTTPException(status_code=404, detail="Tenant không tồn tại")
     return tenant
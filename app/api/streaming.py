@@ -0,0 +1,48 @@
+from typing import AsyncIterator, Type
+
+from pydantic import BaseModel
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db import db_manager
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+async def stream_tenant_ndjson(
+    tenant_id: str,
+    model,
+    schema: Type[BaseModel],
+) -> AsyncIterator[bytes]:
+    """
+    Stream toàn bộ bản ghi của một tenant table dưới dạng NDJSON.
+
+    Dùng server-side cursor (`AsyncSession.stream` + `yield_per`) và chỉ SELECT
+    các cột (Core rows, không qua identity map), nên bộ nhớ giữ ở mức một batch
+    bất kể tenant lớn cỡ nào. Session (reader pool) được mở bên trong generator
+    để tồn tại suốt quá trình stream response mà không giữ connection ghi.
+
+    Args:
+        tenant_id: ID của tenant/cá thể
+        model: SQLAlchemy model cần export
+        schema: Pydantic response schema dùng để serialize từng dòng
+
+    Yields:
+        Các đoạn bytes, mỗi đoạn gồm một batch dòng JSON kết thúc bằng newline
+    """
+    session_factory = db_manager.get_tenant_reader_session_factory(tenant_id)
+    # Chỉ các cột có trong response schema (bỏ qua cột nội bộ như `search_text`)
+    columns = [column for column in model.__table__.columns if column.key in schema.model_fields]
+    stmt = (
+        select(*columns)
+        .order_by(model.id)
+        .execution_options(yield_per=settings.export_batch_size)
+    )
+
+    async with session_factory() as session:
+        result = await session.stream(stmt)
+        async for partition in result.mappings().partitions():
+            yield b"".join(
+                schema.model_validate(dict(row)).model_dump_json().encode() + b"\n"
+                for row in partition
+            )
@@ -1,22 +1,46 @@
 from datetime import datetime
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import exists, insert, literal, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.bulk import (
+    BulkItemError,
+    BulkResult,
+    bulk_openapi,
+    chunked,
+    read_bulk_items,
+)
+from app.api.conditional import ConditionalRead, conditional_read
+from app.api.loaders import UserLoader, get_user_loader
+from app.api.pagination import (
+    NEXT_CURSOR_HEADER,
+    CursorParams,
+    PageParams,
+    load_page,
+    paginate,
+)
+from app.api.streaming import NDJSON_MEDIA_TYPE, stream_tenant_ndjson
+from app.core.config import settings
 from app.db import (
-    get_shared_db,
+    db_manager,
+    get_shared_read_db,
     get_tenant_db_from_header,
     get_tenant_db_from_path,
     get_tenant_db_from_query,
 )
+from app.db.blob_store import get_blob_store
+from app.db.fts import build_match_query
 from app.models.shared import User
-from app.models.tenant import Document, Profile
+from app.models.tenant import Document, Profile, documents_fts
 
 router = APIRouter(prefix="/tenants", tags=["Tenant Database"])
 
+DOCUMENT_CONTENT_MEDIA_TYPE = "text/plain; charset=utf-8"
+
 
 # Pydantic schemas
 class ProfileCreate(BaseModel):
@@ -52,6 +76,8 @@ class DocumentResponse(BaseModel):
     id: int
     title: str
     content: str | None
+    content_hash: str | None = None
+    content_size: int | None = None
     file_path: str | None
     created_at: datetime
 
@@ -59,6 +85,15 @@ class DocumentResponse(BaseModel):
         from_attributes = True
 
 
+class DocumentSearchResult(BaseModel):
+    """Kết quả tìm kiếm document: đoạn trích khớp (`<mark>`) và điểm xếp hạng."""
+    id: int
+    title: str
+    snippet: str | None
+    rank: float
+    created_at: datetime
+
+
 class TenantProfileResponse(BaseModel):
     """Response kết hợp thông tin từ shared và tenant database."""
     user: dict
@@ -68,6 +103,79 @@ class TenantProfileResponse(BaseModel):
         from_attributes = True
 
 
+def _user_summary(user: dict) -> dict:
+    """Thông tin user (từ shared database) trả về kèm profile."""
+    return {
+        "id": user["id"],
+        "email": user["email"],
+        "name": user["name"],
+    }
+
+
+async def _create_tenant_row(
+    tenant_id: str,
+    tenant_db: AsyncSession,
+    model,
+    values: dict,
+    *unless_exists,
+):
+    """
+    Tạo một bản ghi trong tenant database.
+    Khi bật TENANT_WRITE_QUEUE_ENABLED, câu lệnh INSERT được gửi qua
+    group-commit write queue của tenant thay vì commit riêng lẻ.
+
+    `unless_exists`: điều kiện trùng (ví dụ `Profile.user_id == 1`). Với write
+    queue, kiểm tra của route đã nằm ngoài transaction ghi nên câu lệnh là
+    `INSERT ... SELECT ... WHERE NOT EXISTS`: kiểm tra và INSERT chạy nguyên tử
+    trong batch của writer. Trả về None nếu đã có bản ghi trùng.
+    """
+    if settings.tenant_write_queue_enabled:
+        # Kết thúc transaction đọc của request trước khi ghi qua write queue
+        await tenant_db.commit()
+        columns = model.__table__.columns
+        if unless_exists:
+            row = select(
+                *(literal(value, columns[name].type) for name, value in values.items())
+            ).where(~exists().where(*unless_exists))
+            statement = insert(model).from_select(list(values), row)
+        else:
+            statement = insert(model).values(**values)
+        return await db_manager.submit_tenant_write(
+            tenant_id, statement.returning(*columns)
+        )
+
+    new_row = model(**values)
+    tenant_db.add(new_row)
+    await tenant_db.commit()
+    await tenant_db.refresh(new_row)
+    return new_row
+
+
+async def _document_values(tenant_id: str, document_data: DocumentCreate) -> dict:
+    """
+    Chuẩn bị giá trị INSERT cho document.
+    Nội dung lớn hơn DOCUMENT_INLINE_MAX_BYTES được lưu vào blob store của
+    tenant (dedup theo SHA-256), trong database chỉ giữ hash, kích thước và
+    bản text cho FTS index (`search_text`).
+    """
+    values = document_data.model_dump()
+    values["content_hash"] = None
+    values["content_size"] = None
+    values["search_text"] = None
+    content = values["content"]
+    if content is None:
+        return values
+
+    data = content.encode()
+    values["content_size"] = len(data)
+    limit = settings.document_inline_max_bytes
+    if limit and len(data) > limit:
+        values["content_hash"] = await get_blob_store(tenant_id).put(data)
+        values["content"] = None
+        values["search_text"] = content
+    return values
+
+
 # ==================== Routes sử dụng Path Parameter ====================
 
 @router.post("/{tenant_id}/profiles", response_model=ProfileResponse)
@@ -75,15 +183,14 @@ async def create_profile(
     tenant_id: str = Path(..., description="ID của tenant"),
     profile_data: ProfileCreate = ...,
     tenant_db: AsyncSession = Depends(get_tenant_db_from_path),
-    shared_db: AsyncSession = Depends(get_shared_db),
+    users: UserLoader = Depends(get_user_loader),
 ):
     """
     Tạo profile mới cho tenant.
     Sử dụng path parameter để xác định tenant database.
     """
     # Kiểm tra user có tồn tại trong shared database không
-    result = await shared_db.execute(select(User).where(User.id == profile_data.user_id))
-    user = result.scalar_one_or_none()
+    user = await users.load(profile_data.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User không tồn tại trong shared database")
 
@@ -96,57 +203,176 @@ async def create_profile(
         raise HTTPException(status_code=400, detail="Profile đã tồn tại cho user này")
 
     # Tạo profile mới trong tenant database
-    new_profile = Profile(
-        user_id=profile_data.user_id,
-        full_name=profile_data.full_name,
-        phone=profile_data.phone,
-        address=profile_data.address,
-        bio=profile_data.bio,
-        avatar_url=profile_data.avatar_url,
+    profile = await _create_tenant_row(
+        tenant_id,
+        tenant_db,
+        Profile,
+        profile_data.model_dump(),
+        Profile.user_id == profile_data.user_id,
     )
-    tenant_db.add(new_profile)
-    await tenant_db.commit()
-    await tenant_db.refresh(new_profile)
+    if profile is None:
+        raise HTTPException(status_code=400, detail="Profile đã tồn tại cho user này")
+    return profile
 
-    return new_profile
+
+@router.post(
+    "/{tenant_id}/profiles/bulk",
+    response_model=BulkResult[ProfileResponse],
+    openapi_extra=bulk_openapi(ProfileCreate),
+)
+async def create_profiles_bulk(
+    request: Request,
+    tenant_id: str = Path(..., description="ID của tenant"),
+    tenant_db: AsyncSession = Depends(get_tenant_db_from_path),
+    shared_db: AsyncSession = Depends(get_shared_read_db),
+):
+    """
+    Tạo nhiều profiles cho tenant trong một request (JSON array hoặc NDJSON).
+    User và profile đã tồn tại được kiểm tra bằng truy vấn IN theo chunk,
+    insert theo chunk trong từng transaction; lỗi trả về theo index phần tử.
+    """
+    items, errors = await read_bulk_items(request, ProfileCreate)
+
+    # Mỗi user chỉ có một profile: loại bỏ user_id trùng trong cùng request
+    seen: set[int] = set()
+    unique_items = []
+    for index, item in items:
+        if item.user_id in seen:
+            errors.append(BulkItemError(index=index, detail="user_id bị trùng trong request"))
+            continue
+        seen.add(item.user_id)
+        unique_items.append((index, item))
+
+    created = []
+    for chunk in chunked(unique_items):
+        user_ids = [item.user_id for _, item in chunk]
+        result = await shared_db.execute(select(User.id).where(User.id.in_(user_ids)))
+        known_users = set(result.scalars().all())
+        result = await tenant_db.execute(
+            select(Profile.user_id).where(Profile.user_id.in_(user_ids))
+        )
+        existing_profiles = set(result.scalars().all())
+
+        rows = []
+        for index, item in chunk:
+            if item.user_id not in known_users:
+                errors.append(BulkItemError(
+                    index=index, detail="User không tồn tại trong shared database"
+                ))
+            elif item.user_id in existing_profiles:
+                errors.append(BulkItemError(
+                    index=index, detail="Profile đã tồn tại cho user này"
+                ))
+            else:
+                rows.append((index, item.model_dump()))
+        if not rows:
+            continue
+
+        try:
+            result = await tenant_db.execute(
+                insert(Profile).returning(Profile), [values for _, values in rows]
+            )
+            chunk_created = result.scalars().all()
+            await tenant_db.commit()
+        except Exception as exc:
+            await tenant_db.rollback()
+            errors.extend(BulkItemError(index=index, detail=str(exc)) for index, _ in rows)
+            continue
+        created.extend(chunk_created)
+
+    errors.sort(key=lambda error: error.index)
+    return BulkResult[ProfileResponse](
+        created=[ProfileResponse.model_validate(profile) for profile in created],
+        errors=errors,
+    )
 
 
 @router.get("/{tenant_id}/profiles", response_model=List[ProfileResponse])
 async def get_profiles(
+    response: Response,
+    page: PageParams = Depends(),
+    conditional: ConditionalRead = Depends(conditional_read("profiles")),
     tenant_db: AsyncSession = Depends(get_tenant_db_from_path),
 ):
-    """Lấy danh sách tất cả profiles từ tenant database."""
-    result = await tenant_db.execute(select(Profile))
-    profiles = result.scalars().all()
-    return profiles
+    """
+    Lấy danh sách profiles từ tenant database.
+    Phân trang theo keyset: dùng header X-Next-Cursor làm `after` cho trang kế tiếp.
+    Hỗ trợ conditional GET: gửi lại ETag qua If-None-Match để nhận 304 khi không đổi.
+    """
+    return await conditional.respond(
+        lambda: paginate(tenant_db, Profile, ProfileResponse, page, response)
+    )
+
+
+@router.get("/{tenant_id}/profiles/with-users", response_model=List[TenantProfileResponse])
+async def get_profiles_with_users(
+    response: Response,
+    page: CursorParams = Depends(),
+    tenant_db: AsyncSession = Depends(get_tenant_db_from_path),
+    users: UserLoader = Depends(get_user_loader),
+):
+    """
+    Lấy danh sách profiles kèm thông tin user từ shared database.
+    Users của cả trang được lấy bằng một truy vấn IN (không N+1).
+    """
+    profiles, next_cursor = await load_page(tenant_db, Profile, page)
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    user_records = await users.load_many(profile.user_id for profile in profiles)
+
+    return [
+        TenantProfileResponse(
+            user=_user_summary(user) if user else {"id": profile.user_id},
+            profile=profile,
+        )
+        for profile, user in zip(profiles, user_records)
+    ]
+
+
+@router.get("/{tenant_id}/profiles/export", response_class=StreamingResponse)
+async def export_profiles(
+    tenant_id: str = Path(..., description="ID của tenant"),
+):
+    """
+    Export toàn bộ profiles của tenant dưới dạng NDJSON (mỗi dòng một profile).
+    Dữ liệu được stream theo batch, bộ nhớ không tăng theo kích thước tenant.
+    """
+    await db_manager.ensure_tenant_tables(tenant_id)
+    return StreamingResponse(
+        stream_tenant_ndjson(tenant_id, Profile, ProfileResponse),
+        media_type=NDJSON_MEDIA_TYPE,
+    )
 
 
 @router.get("/{tenant_id}/profiles/{profile_id}", response_model=ProfileResponse)
 async def get_profile(
     profile_id: int = Path(...),
+    conditional: ConditionalRead = Depends(conditional_read("profiles")),
     tenant_db: AsyncSession = Depends(get_tenant_db_from_path),
 ):
-    """Lấy thông tin profile theo ID từ tenant database."""
-    result = await tenant_db.execute(select(Profile).where(Profile.id == profile_id))
-    profile = result.scalar_one_or_none()
-    if not profile:
-        raise HTTPException(status_code=404, detail="Profile không tồn tại")
-    return profile
+    """Lấy thông tin profile theo ID từ tenant database (hỗ trợ ETag/If-None-Match)."""
+    async def load_profile():
+        result = await tenant_db.execute(select(Profile).where(Profile.id == profile_id))
+        profile = result.scalar_one_or_none()
+        if not profile:
+            raise HTTPException(status_code=404, detail="Profile không tồn tại")
+        return profile
+
+    return await conditional.respond(load_profile)
 
 
 @router.get("/{tenant_id}/profiles/user/{user_id}", response_model=TenantProfileResponse)
 async def get_profile_with_user(
     user_id: int = Path(...),
     tenant_db: AsyncSession = Depends(get_tenant_db_from_path),
-    shared_db: AsyncSession = Depends(get_shared_db),
+    users: UserLoader = Depends(get_user_loader),
 ):
     """
     Lấy profile kết hợp với thông tin user từ shared database.
     Ví dụ về việc sử dụng cả shared và tenant database trong một route.
     """
     # Lấy user từ shared database
-    result = await shared_db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await users.load(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User không tồn tại")
 
@@ -154,14 +380,7 @@ async def get_profile_with_user(
     result = await tenant_db.execute(select(Profile).where(Profile.user_id == user_id))
     profile = result.scalar_one_or_none()
 
-    return TenantProfileResponse(
-        user={
-            "id": user.id,
-            "email": user.email,
-            "name": user.name,
-        },
-        profile=profile,
-    )
+    return TenantProfileResponse(user=_user_summary(user), profile=profile)
 
 
 # ==================== Routes sử dụng Query Parameter ====================
@@ -171,47 +390,39 @@ async def create_profile_from_query(
     tenant_id: str = Query(..., description="ID của tenant"),
     profile_data: ProfileCreate = ...,
     tenant_db: AsyncSession = Depends(get_tenant_db_from_query),
-    shared_db: AsyncSession = Depends(get_shared_db),
+    users: UserLoader = Depends(get_user_loader),
 ):
     """
     Tạo profile mới cho tenant.
     Sử dụng query parameter để xác định tenant database.
     """
     # Kiểm tra user có tồn tại trong shared database không
-    result = await shared_db.execute(select(User).where(User.id == profile_data.user_id))
-    user = result.scalar_one_or_none()
+    user = await users.load(profile_data.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User không tồn tại trong shared database")
 
     # Tạo profile mới trong tenant database
-    new_profile = Profile(
-        user_id=profile_data.user_id,
-        full_name=profile_data.full_name,
-        phone=profile_data.phone,
-        address=profile_data.address,
-        bio=profile_data.bio,
-        avatar_url=profile_data.avatar_url,
+    return await _create_tenant_row(
+        tenant_id, tenant_db, Profile, profile_data.model_dump()
     )
-    tenant_db.add(new_profile)
-    await tenant_db.commit()
-    await tenant_db.refresh(new_profile)
-
-    return new_profile
 
 
 # ==================== Routes sử dụng Header ====================
 
 @router.get("/profiles/me", response_model=List[ProfileResponse])
 async def get_my_profiles(
+    response: Response,
+    page: PageParams = Depends(),
+    conditional: ConditionalRead = Depends(conditional_read("profiles")),
     tenant_db: AsyncSession = Depends(get_tenant_db_from_header),
 ):
     """
     Lấy danh sách profiles từ tenant database.
     Sử dụng header X-Tenant-ID để xác định tenant database.
     """
-    result = await tenant_db.execute(select(Profile))
-    profiles = result.scalars().all()
-    return profiles
+    return await conditional.respond(
+        lambda: paginate(tenant_db, Profile, ProfileResponse, page, response)
+    )
 
 
 # ==================== Document Routes ====================
@@ -222,37 +433,172 @@ async def create_document(
     document_data: DocumentCreate = ...,
     tenant_db: AsyncSession = Depends(get_tenant_db_from_path),
 ):
-    """Tạo document mới trong tenant database."""
-    new_document = Document(
-        title=document_data.title,
-        content=document_data.content,
-        file_path=document_data.file_path,
-    )
-    tenant_db.add(new_document)
-    await tenant_db.commit()
-    await tenant_db.refresh(new_document)
+    """
+    Tạo document mới trong tenant database.
+    Nội dung lớn được lưu trong blob store, đọc qua `/documents/{document_id}/content`.
+    """
+    values = await _document_values(tenant_id, document_data)
+    return await _create_tenant_row(tenant_id, tenant_db, Document, values)
 
-    return new_document
+
+@router.post(
+    "/{tenant_id}/documents/bulk",
+    response_model=BulkResult[DocumentResponse],
+    openapi_extra=bulk_openapi(DocumentCreate),
+)
+async def create_documents_bulk(
+    request: Request,
+    tenant_id: str = Path(...),
+    tenant_db: AsyncSession = Depends(get_tenant_db_from_path),
+):
+    """
+    Tạo nhiều documents trong một request (JSON array hoặc NDJSON).
+    Insert theo chunk trong từng transaction; lỗi trả về theo index phần tử.
+    """
+    items, errors = await read_bulk_items(request, DocumentCreate)
+
+    created = []
+    for chunk in chunked(items):
+        try:
+            rows = [await _document_values(tenant_id, item) for _, item in chunk]
+            result = await tenant_db.execute(insert(Document).returning(Document), rows)
+            chunk_created = result.scalars().all()
+            await tenant_db.commit()
+        except Exception as exc:
+            await tenant_db.rollback()
+            errors.extend(BulkItemError(index=index, detail=str(exc)) for index, _ in chunk)
+            continue
+        created.extend(chunk_created)
+
+    errors.sort(key=lambda error: error.index)
+    return BulkResult[DocumentResponse](
+        created=[DocumentResponse.model_validate(document) for document in created],
+        errors=errors,
+    )
 
 
 @router.get("/{tenant_id}/documents", response_model=List[DocumentResponse])
 async def get_documents(
+    response: Response,
+    page: PageParams = Depends(),
+    conditional: ConditionalRead = Depends(conditional_read("documents")),
+    tenant_db: AsyncSession = Depends(get_tenant_db_from_path),
+):
+    """
+    Lấy danh sách documents từ tenant database.
+    Dùng `fields=id,title` để bỏ qua cột `content` khi chỉ cần danh sách.
+    Hỗ trợ conditional GET: gửi lại ETag qua If-None-Match để nhận 304 khi không đổi.
+    """
+    return await conditional.respond(
+        lambda: paginate(tenant_db, Document, DocumentResponse, page, response)
+    )
+
+
+@router.get("/{tenant_id}/documents/export", response_class=StreamingResponse)
+async def export_documents(
+    tenant_id: str = Path(..., description="ID của tenant"),
+):
+    """
+    Export toàn bộ documents của tenant dưới dạng NDJSON (mỗi dòng một document).
+    Dữ liệu được stream theo batch, bộ nhớ không tăng theo kích thước tenant.
+    """
+    await db_manager.ensure_tenant_tables(tenant_id)
+    return StreamingResponse(
+        stream_tenant_ndjson(tenant_id, Document, DocumentResponse),
+        media_type=NDJSON_MEDIA_TYPE,
+    )
+
+
+# Xếp hạng bm25 (nhỏ hơn = khớp hơn), title có trọng số cao hơn content; snippet
+# lấy từ content inline, hoặc search_text nếu nội dung nằm trong blob store
+DOCUMENT_SEARCH_SQL = text(
+    f"""
+    SELECT d.id, d.title, d.created_at,
+           CASE WHEN d.content_hash IS NULL
+                THEN snippet({documents_fts.name}, 1, '<mark>', '</mark>', '…', 16)
+                ELSE snippet({documents_fts.name}, 2, '<mark>', '</mark>', '…', 16)
+           END AS snippet,
+           bm25({documents_fts.name}, 10.0, 1.0, 1.0) AS rank
+    FROM {documents_fts.name}
+    JOIN documents AS d ON d.id = {documents_fts.name}.rowid
+    WHERE {documents_fts.name} MATCH :match
+    ORDER BY rank, d.id
+    LIMIT :limit OFFSET :offset
+    """
+)
+
+
+@router.get("/{tenant_id}/documents/search", response_model=List[DocumentSearchResult])
+async def search_documents(
+    response: Response,
+    q: str = Query(..., min_length=1, description="Từ khóa tìm kiếm (từ kết thúc bằng * là tìm theo tiền tố)"),
+    page: CursorParams = Depends(),
     tenant_db: AsyncSession = Depends(get_tenant_db_from_path),
 ):
-    """Lấy danh sách tất cả documents từ tenant database."""
-    result = await tenant_db.execute(select(Document))
-    documents = result.scalars().all()
-    return documents
+    """
+    Tìm kiếm full-text trong title và content của documents (SQLite FTS5).
+    Kết quả sắp xếp theo độ liên quan; cursor trang kế tiếp trả qua header `X-Next-Cursor`.
+    """
+    match = build_match_query(q)
+    if match is None:
+        raise HTTPException(status_code=400, detail="Từ khóa tìm kiếm không hợp lệ")
+
+    offset = page.after or 0
+    result = await tenant_db.execute(
+        DOCUMENT_SEARCH_SQL,
+        {"match": match, "limit": page.limit + 1, "offset": offset},
+    )
+    rows = result.mappings().all()
+    if len(rows) > page.limit:
+        rows = rows[: page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = str(offset + page.limit)
+    return rows
 
 
 @router.get("/{tenant_id}/documents/{document_id}", response_model=DocumentResponse)
 async def get_document(
     document_id: int = Path(...),
+    conditional: ConditionalRead = Depends(conditional_read("documents")),
     tenant_db: AsyncSession = Depends(get_tenant_db_from_path),
 ):
-    """Lấy thông tin document theo ID từ tenant database."""
-    result = await tenant_db.execute(select(Document).where(Document.id == document_id))
-    document = result.scalar_one_or_none()
-    if not document:
+    """Lấy thông tin document theo ID từ tenant database (hỗ trợ ETag/If-None-Match)."""
+    async def load_document():
+        result = await tenant_db.execute(select(Document).where(Document.id == document_id))
+        document = result.scalar_one_or_none()
+        if not document:
+            raise HTTPException(status_code=404, detail="Document không tồn tại")
+        return document
+
+    return await conditional.respond(load_document)
+
+
+@router.get("/{tenant_id}/documents/{document_id}/content")
+async def get_document_content(
+    tenant_id: str = Path(...),
+    document_id: int = Path(...),
+    tenant_db: AsyncSession = Depends(get_tenant_db_from_path),
+):
+    """
+    Lấy nội dung document dạng text/plain.
+    Nội dung trong blob store được trả bằng FileResponse (hỗ trợ HTTP Range,
+    server không đọc file vào bộ nhớ); nội dung nhỏ trả trực tiếp từ database.
+    """
+    result = await tenant_db.execute(
+        select(Document.content, Document.content_hash).where(Document.id == document_id)
+    )
+    row = result.one_or_none()
+    if row is None:
         raise HTTPException(status_code=404, detail="Document không tồn tại")
-    return document
+
+    if row.content_hash is None:
+        return Response(content=row.content or "", media_type=DOCUMENT_CONTENT_MEDIA_TYPE)
+
+    blob_path = get_blob_store(tenant_id).path_for(row.content_hash)
+    if not blob_path.is_file():
+        raise HTTPException(status_code=404, detail="Nội dung document không tồn tại")
+    # Blob bất biến theo hash nên ETag là chính content hash
+    return FileResponse(
+        blob_path,
+        media_type=DOCUMENT_CONTENT_MEDIA_TYPE,
+        headers={"ETag": f'"{row.content_hash}"'},
+    )
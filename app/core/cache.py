@@ -0,0 +1,219 @@
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from app.core.config import Settings, settings
+
+
+class TTLCache:
+    """
+    Cache trong process kết hợp LRU (giới hạn số phần tử) và TTL.
+    Không thread-safe; được dùng trong event loop của một worker.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Any | None:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = item
+        if expires_at <= self._clock():
+            del self._data[key]
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._data[key] = (self._clock() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class InvalidationBackend:
+    """
+    Interface phát/nhận invalidation giữa các worker.
+    Mặc định (in-memory) chỉ có một process nên không cần phát đi đâu.
+    """
+
+    def publish(self, keys: Iterable[str]) -> None:
+        """Thông báo cho các worker khác rằng các keys đã thay đổi."""
+
+    def poll(self) -> list[str]:
+        """Lấy các keys bị invalidate bởi worker khác kể từ lần poll trước."""
+        return []
+
+
+class FileInvalidationBackend(InvalidationBackend):
+    """
+    Backend dùng một file log append-only chung giữa các worker trên cùng máy.
+    Mỗi dòng là một key; mỗi worker đọc tiếp từ offset lần trước.
+    Phù hợp cho development/test; production nên dùng backend như Redis pub/sub.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.touch(exist_ok=True)
+        # Worker mới chỉ cần các invalidation xảy ra sau khi khởi động
+        self._offset = self.path.stat().st_size
+
+    def publish(self, keys: Iterable[str]) -> None:
+        payload = "".join(f"{key}\n" for key in keys).encode()
+        if not payload:
+            return
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, payload)
+        finally:
+            os.close(fd)
+
+    def poll(self) -> list[str]:
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return []
+        if size < self._offset:
+            # File bị xóa/rotate: đọc lại từ đầu
+            self._offset = 0
+        if size == self._offset:
+            return []
+
+        with self.path.open("rb") as file:
+            file.seek(self._offset)
+            data = file.read(size - self._offset)
+        # Chỉ xử lý các dòng hoàn chỉnh
+        complete = data.rfind(b"\n") + 1
+        self._offset += complete
+        return [line for line in data[:complete].decode().splitlines() if line]
+
+
+def create_invalidation_backend(config: Settings) -> InvalidationBackend:
+    """
+    Tạo invalidation backend theo RECORD_CACHE_BACKEND. Mỗi lần gọi trả về
+    một instance riêng (offset đọc riêng), dùng chung file log nếu là `file`.
+    """
+    if config.record_cache_backend == "file":
+        return FileInvalidationBackend(config.record_cache_invalidation_path)
+    if config.record_cache_backend != "memory":
+        raise ValueError(
+            f"Record cache backend '{config.record_cache_backend}' không được hỗ trợ. "
+            "Các backend có sẵn: ['memory', 'file']"
+        )
+    return InvalidationBackend()
+
+
+class RecordCache:
+    """
+    Read-through cache cho các bản ghi ít thay đổi của shared database
+    (User, Tenant), lưu dưới dạng dict và được tra theo nhiều key
+    (ví dụ `user:id:1`, `user:email:a@example.com`, `tenant:tenant_id:t1`).
+
+    Các giá trị trả về dùng chung giữa các request: chỉ đọc, không sửa.
+    """
+
+    def __init__(
+        self,
+        cache: TTLCache,
+        backend: InvalidationBackend | None = None,
+        enabled: bool = True,
+        poll_interval: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._cache = cache
+        self.backend = backend or InvalidationBackend()
+        self.enabled = enabled
+        self._poll_interval = poll_interval
+        self._clock = clock
+        self._next_poll = 0.0
+
+    @classmethod
+    def from_settings(cls, config: Settings) -> "RecordCache":
+        """Tạo RecordCache theo cấu hình trong Settings."""
+        return cls(
+            TTLCache(config.record_cache_size, config.record_cache_ttl),
+            backend=create_invalidation_backend(config),
+            enabled=config.record_cache_enabled,
+            poll_interval=config.record_cache_poll_interval,
+        )
+
+    def _sync(self) -> None:
+        now = self._clock()
+        if now < self._next_poll:
+            return
+        self._next_poll = now + self._poll_interval
+        for key in self.backend.poll():
+            self._cache.delete(key)
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Lấy bản ghi theo key, None nếu chưa có hoặc đã hết hạn."""
+        if not self.enabled:
+            return None
+        self._sync()
+        return self._cache.get(key)
+
+    def set(self, keys: Iterable[str], record: dict[str, Any]) -> None:
+        """Lưu bản ghi dưới tất cả các keys tra cứu của nó."""
+        if not self.enabled:
+            return
+        for key in keys:
+            self._cache.set(key, record)
+
+    def invalidate(self, *keys: str) -> None:
+        """Xóa keys khỏi cache local và phát invalidation tới các worker khác."""
+        for key in keys:
+            self._cache.delete(key)
+        if self.enabled:
+            self.backend.publish(keys)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._cache),
+            "hits": self._cache.hits,
+            "misses": self._cache.misses,
+        }
+
+
+def user_keys(record: dict[str, Any]) -> list[str]:
+    """Các key tra cứu của một user record."""
+    return [f"user:id:{record['id']}", f"user:email:{record['email']}"]
+
+
+def tenant_keys(record: dict[str, Any]) -> list[str]:
+    """Các key tra cứu của một tenant record."""
+    return [f"tenant:id:{record['id']}", f"tenant:tenant_id:{record['tenant_id']}"]
+
+
+# Global record cache instance
+record_cache = RecordCache.from_settings(settings)
@@ -0,0 +1,114 @@
+import asyncio
+import re
+from typing import Iterable
+
+# Header ảnh hưởng tới response: request chỉ được gộp khi các header này giống nhau
+COALESCE_VARY_HEADERS = (
+    b"authorization",
+    b"cookie",
+    b"x-tenant-id",
+    b"if-none-match",
+    b"accept",
+    b"range",
+)
+
+
+def _copy_message(message: dict) -> dict:
+    """
+    Bản sao của ASGI message: middleware bên ngoài (CORS, ...) sửa trực tiếp
+    list headers của `http.response.start` cho từng request.
+    """
+    if "headers" in message:
+        return {**message, "headers": list(message["headers"])}
+    return dict(message)
+
+
+class _SharedResponse:
+    """Response của request dẫn đầu: các ASGI messages và route đã khớp."""
+
+    def __init__(self, messages: list[dict], route, path_params: dict):
+        self.messages = messages
+        self.route = route
+        self.path_params = path_params
+
+
+class RequestCoalescingMiddleware:
+    """
+    ASGI middleware gộp các GET/HEAD request giống hệt nhau đang chạy đồng thời:
+    request đầu tiên (leader) chạy app bình thường, các request đến trong lúc
+    leader chưa xong chờ và nhận lại đúng response của leader thay vì tự mở
+    session và chạy cùng câu truy vấn.
+
+    Chỉ áp dụng cho các path khớp `paths` (regex) - chỉ nên khai báo route
+    idempotent, không phụ thuộc vào người gọi ngoài các header trong
+    COALESCE_VARY_HEADERS. Response lớn hơn `max_bytes`, hoặc leader bị lỗi/hủy,
+    thì các request đang chờ tự chạy app như bình thường.
+    """
+
+    def __init__(self, app, paths: Iterable[str], max_bytes: int = 1048576):
+        self.app = app
+        self.patterns = [re.compile(path) for path in paths]
+        self.max_bytes = max_bytes
+        self._inflight: dict[tuple, asyncio.Future] = {}
+
+    def _key(self, scope) -> tuple | None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            return None
+        path = scope["path"]
+        if not any(pattern.match(path) for pattern in self.patterns):
+            return None
+        headers = dict(scope["headers"])
+        return (
+            scope["method"],
+            path,
+            scope["query_string"],
+            tuple(headers.get(name) for name in COALESCE_VARY_HEADERS),
+        )
+
+    async def __call__(self, scope, receive, send):
+        key = self._key(scope)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+
+        leader = self._inflight.get(key)
+        if leader is not None:
+            shared = await asyncio.shield(leader)
+            if shared is not None:
+                # Giữ route/path params của leader cho các middleware bên ngoài (metrics)
+                if shared.route is not None:
+                    scope["route"] = shared.route
+                    scope["path_params"] = shared.path_params
+                for message in shared.messages:
+                    await send(_copy_message(message))
+                return
+            await self.app(scope, receive, send)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        messages: list[dict] | None = []
+        size = 0
+
+        async def capture_send(message):
+            nonlocal messages, size
+            if messages is not None:
+                if message["type"] == "http.response.body":
+                    size += len(message.get("body", b""))
+                if size > self.max_bytes:
+                    messages = None
+                else:
+                    messages.append(_copy_message(message))
+            await send(message)
+
+        shared = None
+        try:
+            await self.app(scope, receive, capture_send)
+            if messages is not None:
+                shared = _SharedResponse(
+                    messages, scope.get("route"), scope.get("path_params", {})
+                )
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            future.set_result(shared)
@@ -1,23 +1,162 @@
+import re
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List
 
 from pydantic_settings import BaseSettings
 
+# Tenant ID hợp lệ: dùng trong tên file database và thư mục blob nên không được
+# chứa dấu gạch chéo hay bắt đầu bằng `.` (không thoát khỏi thư mục gốc)
+TENANT_ID_PATTERN = r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,127}$"
+_TENANT_ID_RE = re.compile(TENANT_ID_PATTERN)
+
+
+class InvalidTenantIdError(ValueError):
+    """Tenant ID không khớp TENANT_ID_PATTERN."""
+
+
+def validate_tenant_id(tenant_id: str) -> str:
+    """
+    Kiểm tra tenant ID trước khi dùng để tạo đường dẫn file.
+
+    Raises:
+        InvalidTenantIdError: Tenant ID không hợp lệ
+    """
+    if not isinstance(tenant_id, str) or not _TENANT_ID_RE.fullmatch(tenant_id):
+        raise InvalidTenantIdError(f"Tenant ID không hợp lệ: {tenant_id!r}")
+    return tenant_id
+
 
 class Settings(BaseSettings):
     app_name: str = "Profile API"
     debug: bool = False
+    # Query profiling (opt-in, dùng khi phát triển cùng DEBUG): log câu lệnh chậm
+    # kèm query plan và cảnh báo request chạy lặp một câu lệnh quá nhiều lần (N+1)
+    query_profiling: bool = False
+    slow_query_threshold_ms: float = 100.0
+    n_plus_one_threshold: int = 10
     
     # Shared Database - Database chung chứa thông tin cơ bản
     # Có thể là PostgreSQL, MySQL, hoặc SQLite
     shared_database_url: str = "sqlite+aiosqlite:///./shared.db"
+    # Read replicas cho shared database (optional), ví dụ:
+    # SHARED_DATABASE_REPLICA_URLS='["postgresql+asyncpg://...replica1/shared"]'
+    shared_database_replica_urls: List[str] = []
+    # Chiến lược chọn replica: "round_robin" hoặc "least_busy"
+    shared_replica_strategy: str = "round_robin"
     
     # Tenant Databases - Database riêng cho từng cá thể (SQLite)
     # Thư mục chứa các tenant database files
     tenant_database_dir: str = "./tenants"
     # Template cho tenant database path: {tenant_id} sẽ được thay thế
     tenant_database_template: str = "tenant_{tenant_id}.db"
+    # Document content lớn hơn ngưỡng này (bytes, UTF-8) được lưu ngoài SQLite
+    # trong blob store theo content hash; 0 = luôn lưu inline
+    document_inline_max_bytes: int = 65536
+    # Thư mục blob store (mặc định: <TENANT_DATABASE_DIR>/blobs), mỗi tenant một thư mục con
+    blob_storage_dir: str | None = None
+    # Số tenant engines tối đa được giữ trong cache (LRU)
+    tenant_engine_cache_size: int = 256
+    # Engine không được dùng quá số giây này sẽ bị dispose (0 = không giới hạn)
+    tenant_engine_idle_ttl: float = 600.0
+
+    # Pre-warm tenant databases (engine, file, schema, reader connection)
+    tenant_prewarm_count: int = 32  # Số tenant hoạt động gần nhất mở sẵn khi khởi động (0 = tắt)
+    tenant_prewarm_concurrency: int = 8
+    tenant_prewarm_wait: bool = False  # True: chờ pre-warm xong mới nhận request
+    tenant_prewarm_on_create: bool = True  # Tạo file và schema ngay khi tạo tenant
+
+    # Tạo tenant database mới bằng cách copy file mẫu đã có sẵn schema
+    # (reflink/copy_file_range) thay vì chạy DDL
+    tenant_template_enabled: bool = True
+    # Thư mục file mẫu (mặc định: <TENANT_DATABASE_DIR>/templates), mỗi schema version một file
+    tenant_template_dir: str | None = None
+
+    # Tách reader/writer cho mỗi tenant: pool chỉ đọc (mode=ro, query_only) cho
+    # GET requests và một connection ghi duy nhất cho các request ghi
+    tenant_read_write_split: bool = True
+    tenant_reader_pool_size: int = 4
+    tenant_writer_pool_timeout: float = 30.0  # giây chờ connection ghi
+
+    # Group-commit write queue cho tenant databases: gom các câu lệnh ghi đồng thời
+    # của một tenant và commit chung một transaction
+    tenant_write_queue_enabled: bool = False
+    tenant_write_queue_window_ms: float = 2.0  # Cửa sổ gom batch
+    tenant_write_queue_max_batch: int = 256  # Số câu lệnh tối đa mỗi batch
+    tenant_write_queue_idle_timeout: float = 30.0  # Writer task dừng khi idle (giây)
+
+    # SQLite performance profile - áp dụng cho mọi SQLite engine (shared + tenant)
+    # thông qua PRAGMA khi mở connection
+    sqlite_pragmas_enabled: bool = True
+    sqlite_journal_mode: str = "WAL"  # WAL: readers không block writer
+    sqlite_synchronous: str = "NORMAL"  # NORMAL an toàn với WAL, ít fsync hơn FULL
+    sqlite_mmap_size: int = 134217728  # 128MB memory-mapped I/O
+    sqlite_cache_size: int = -16000  # Giá trị âm = KiB (~16MB mỗi connection)
+    sqlite_busy_timeout: int = 5000  # ms chờ khi database bị lock
+    sqlite_temp_store: str = "MEMORY"
+    # Ghi đè pragma cho từng tenant, ví dụ:
+    # SQLITE_TENANT_PRAGMAS='{"tenant_001": {"synchronous": "FULL"}}'
+    sqlite_tenant_pragmas: Dict[str, Dict[str, str | int]] = {}
     
+    # Phân trang cho các list endpoints (keyset pagination theo id)
+    list_default_limit: int = 100
+    list_max_limit: int = 1000
+    # Số dòng mỗi batch khi stream export NDJSON
+    export_batch_size: int = 500
+    # Bulk create: số phần tử mỗi transaction và tối đa mỗi request
+    bulk_chunk_size: int = 500
+    bulk_max_items: int = 50000
+
+    # Thống kê theo tenant (bảng tenant_stats của shared database)
+    tenant_stats_enabled: bool = True
+    tenant_stats_flush_interval: float = 1.0  # giây giữa các lần ghi vào shared database
+
+    # Fan-out truy vấn qua nhiều tenant databases (admin reporting)
+    fanout_concurrency: int = 16  # Số tenant được truy vấn đồng thời
+    fanout_tenant_timeout: float = 10.0  # Timeout cho mỗi tenant (giây)
+
+    # Read-through cache cho User/Tenant records của shared database
+    record_cache_enabled: bool = True
+    record_cache_size: int = 10000
+    record_cache_ttl: float = 60.0  # giây
+    # Backend phát invalidation giữa các worker: "memory" (một process) hoặc "file"
+    record_cache_backend: str = "memory"
+    record_cache_invalidation_path: str = "./.cache/record_invalidations.log"
+    record_cache_poll_interval: float = 0.5  # giây giữa các lần đọc invalidation
+
+    # Metrics (Prometheus text format tại /metrics)
+    metrics_enabled: bool = True
+    # Số tenant tối đa có nhãn riêng (các tenant nhiều request nhất); các tenant
+    # còn lại gộp vào nhãn "other"
+    metrics_max_tenants: int = 50
+    # Chu kỳ (giây) tính lại top tenant theo số request
+    metrics_tenant_rank_interval: float = 60.0
+
+    # List routes: SELECT cột của response schema (Core rows) và serialize thẳng
+    # ra JSON thay vì ORM objects + Pydantic validation. Encoder là orjson nếu đã
+    # cài extra `fast` (`uv sync --extra fast` / `pip install -e ".[fast]"`),
+    # nếu không dùng thư viện json chuẩn
+    fast_list_serialization: bool = True
+
+    # Conditional GET cho tenant reads: ETag theo version của tenant tables (lưu
+    # trong tenant database, tăng bởi triggers), If-None-Match khớp -> 304 mà
+    # không chạy truy vấn của route
+    tenant_etag_enabled: bool = True
+    # Cache response bytes trong process theo (tenant, route, params, version)
+    response_cache_enabled: bool = False
+    response_cache_size: int = 1000
+    response_cache_ttl: float = 60.0  # giây
+    response_cache_max_entry_bytes: int = 1048576  # Response lớn hơn không được cache
+
+    # Gộp các GET request giống hệt nhau đang chạy đồng thời (chạy một lần, dùng
+    # chung response). Chỉ khai báo các route idempotent (regex theo path)
+    request_coalescing_enabled: bool = False
+    request_coalescing_paths: List[str] = [
+        r"^/shared/(users|tenants)$",
+        r"^/tenants/[^/]+/(profiles|documents)$",
+        r"^/tenants/profiles/me$",
+    ]
+    request_coalescing_max_bytes: int = 1048576  # Response lớn hơn không được chia sẻ
+
     # Backward compatibility - giữ lại cho các code cũ
     database_url: str = "sqlite+aiosqlite:///./profile.db"  # Default database
     
@@ -41,19 +180,78 @@ class Settings(BaseSettings):
             
         Returns:
             Path object đến tenant database file
+
+        Raises:
+            InvalidTenantIdError: Tenant ID không hợp lệ
         """
+        validate_tenant_id(tenant_id)
         tenant_dir = Path(self.tenant_database_dir)
         tenant_dir.mkdir(parents=True, exist_ok=True)
         
         db_filename = self.tenant_database_template.format(tenant_id=tenant_id)
         return tenant_dir / db_filename
     
-    def get_tenant_database_url(self, tenant_id: str) -> str:
+    def get_blob_storage_dir(self, tenant_id: str) -> Path:
+        """
+        Thư mục blob store của tenant cụ thể.
+
+        Args:
+            tenant_id: ID của tenant/cá thể
+
+        Returns:
+            Path object đến thư mục blob của tenant
+
+        Raises:
+            InvalidTenantIdError: Tenant ID không hợp lệ
+        """
+        validate_tenant_id(tenant_id)
+        root = Path(self.blob_storage_dir or Path(self.tenant_database_dir) / "blobs")
+        path = root / tenant_id
+        # Phòng thủ thêm: thư mục của tenant phải nằm ngay trong root
+        if path.resolve().parent != root.resolve():
+            raise InvalidTenantIdError(f"Tenant ID không hợp lệ: {tenant_id!r}")
+        return path
+
+    def get_tenant_template_dir(self) -> Path:
+        """
+        Thư mục chứa các file mẫu tenant database.
+
+        Returns:
+            Path object đến thư mục file mẫu
+        """
+        return Path(self.tenant_template_dir or Path(self.tenant_database_dir) / "templates")
+
+    def list_tenant_ids(self) -> list[str]:
+        """
+        Liệt kê tenant IDs có database file trong thư mục tenant databases.
+
+        Returns:
+            Danh sách tenant IDs (sắp xếp theo tên)
+        """
+        tenant_dir = Path(self.tenant_database_dir)
+        if not tenant_dir.is_dir():
+            return []
+
+        prefix, _, suffix = self.tenant_database_template.partition("{tenant_id}")
+        tenant_ids = []
+        for path in tenant_dir.iterdir():
+            name = path.name
+            if (
+                path.is_file()
+                and name.startswith(prefix)
+                and name.endswith(suffix)
+                and len(name) > len(prefix) + len(suffix)
+            ):
+                tenant_ids.append(name[len(prefix):len(name) - len(suffix)])
+        return sorted(tenant_ids)
+    
+    def get_tenant_database_url(self, tenant_id: str, read_only: bool = False) -> str:
         """
         Tạo database URL cho tenant cụ thể.
         
         Args:
             tenant_id: ID của tenant/cá thể
+            read_only: True để mở file ở chế độ chỉ đọc (SQLite URI `mode=ro`)
             
         Returns:
             Database URL dạng SQLite async
@@ -61,7 +259,34 @@ class Settings(BaseSettings):
         db_path = self.get_tenant_database_path(tenant_id)
         # Chuyển đổi path thành URL format (absolute path)
         absolute_path = db_path.resolve()
+        if read_only:
+            return f"sqlite+aiosqlite:///file:{absolute_path}?mode=ro&uri=true"
         return f"sqlite+aiosqlite:///{absolute_path}"
 
+    def get_sqlite_pragmas(self, tenant_id: str | None = None) -> Dict[str, str | int]:
+        """
+        Lấy SQLite pragma profile, kèm phần ghi đè riêng của tenant (nếu có).
+
+        Args:
+            tenant_id: ID của tenant/cá thể. None cho shared database.
+
+        Returns:
+            Dictionary {tên pragma: giá trị}, rỗng nếu tắt pragma profile
+        """
+        if not self.sqlite_pragmas_enabled:
+            return {}
+
+        pragmas: Dict[str, str | int] = {
+            "journal_mode": self.sqlite_journal_mode,
+            "synchronous": self.sqlite_synchronous,
+            "mmap_size": self.sqlite_mmap_size,
+            "cache_size": self.sqlite_cache_size,
+            "busy_timeout": self.sqlite_busy_timeout,
+            "temp_store": self.sqlite_temp_store,
+        }
+        if tenant_id is not None:
+            pragmas.update(self.sqlite_tenant_pragmas.get(tenant_id, {}))
+        return pragmas
+
 
 settings = Settings()
@@ -0,0 +1,323 @@
+import bisect
+import heapq
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from app.core.config import settings
+
+# Bucket mặc định (giây) cho các histogram thời gian
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Bucket cho số câu lệnh SQL mỗi request
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+# Nhãn gom các tenant vượt quá giới hạn cardinality
+OTHER_TENANT = "other"
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Logger cho slow queries và cảnh báo N+1 (QUERY_PROFILING)
+query_logger = logging.getLogger("app.db.queries")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Counter theo nhãn (Prometheus `counter`)."""
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        for label_values, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}"
+
+
+class Histogram:
+    """Histogram theo nhãn với bucket cố định (Prometheus `histogram`)."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [số quan sát theo bucket (không cộng dồn)..., +Inf], tổng, số lượng
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = ([0] * (len(self.buckets) + 1), [0.0, 0])
+        counts, totals = series
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        totals[0] += value
+        totals[1] += 1
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for label_values, (counts, (total, count)) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                yield (
+                    f"{self.name}_bucket{_format_labels(self.labels, label_values, le)} "
+                    f"{cumulative}"
+                )
+            inf = 'le="+Inf"'
+            yield f"{self.name}_bucket{_format_labels(self.labels, label_values, inf)} {count}"
+            yield f"{self.name}_sum{_format_labels(self.labels, label_values)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labels, label_values)} {count}"
+
+
+class TenantLabeler:
+    """
+    Giới hạn cardinality của nhãn tenant: `max_tenants` tenant có nhiều request
+    nhất có nhãn riêng, các tenant còn lại được gom vào nhãn `other`.
+
+    Số request theo tenant được đếm liên tục; mỗi `rank_interval` giây top N
+    được tính lại và các bộ đếm giảm một nửa, nên tenant mới nóng lên sẽ thay
+    tenant đã nguội và bộ nhớ chỉ giữ các tenant còn hoạt động. Trước lần tính
+    lại đầu tiên, các chỗ trống trong top N được cấp cho tenant đến trước.
+    """
+
+    def __init__(self, max_tenants: int, rank_interval: float = 60.0):
+        self.max_tenants = max(0, max_tenants)
+        self.rank_interval = rank_interval
+        self._counts: dict[str, float] = {}
+        self._top: set[str] = set()
+        self._ranked_at = time.monotonic()
+
+    def label(self, tenant_id: str | None) -> str:
+        if tenant_id is None:
+            return "none"
+        self._counts[tenant_id] = self._counts.get(tenant_id, 0) + 1
+        if time.monotonic() - self._ranked_at >= self.rank_interval:
+            self._rank()
+        if tenant_id in self._top:
+            return tenant_id
+        if len(self._top) < self.max_tenants:
+            self._top.add(tenant_id)
+            return tenant_id
+        return OTHER_TENANT
+
+    def _rank(self) -> None:
+        """Tính lại top N theo số request rồi giảm một nửa các bộ đếm."""
+        self._top = set(heapq.nlargest(self.max_tenants, self._counts, key=self._counts.get))
+        self._counts = {
+            tenant_id: count / 2 for tenant_id, count in self._counts.items() if count >= 1
+        }
+        self._ranked_at = time.monotonic()
+
+
+@dataclass
+class RequestMetrics:
+    """Số liệu thu thập trong một request (lưu trong ContextVar)."""
+    started: float = field(default_factory=time.perf_counter)
+    tenant_id: str | None = None
+    query_count: int = 0
+    # Thời gian chạy SQL theo loại database ("shared", "tenant", ...)
+    db_time: dict[str, float] = field(default_factory=dict)
+    bootstrap_time: float = 0.0
+    engine_cache_hits: int = 0
+    engine_cache_misses: int = 0
+    # ASGI scope của request (để lấy route khi log)
+    scope: dict | None = None
+    # Số lần chạy theo câu lệnh SQL (chỉ khi bật QUERY_PROFILING)
+    statement_counts: dict[str, int] = field(default_factory=dict)
+
+    def add_query(self, database: str, elapsed: float) -> None:
+        self.query_count += 1
+        self.db_time[database] = self.db_time.get(database, 0.0) + elapsed
+
+    def count_statement(self, statement: str) -> None:
+        self.statement_counts[statement] = self.statement_counts.get(statement, 0) + 1
+
+    def repeated_statements(self, threshold: int) -> list[tuple[str, int]]:
+        """Các câu lệnh chạy quá `threshold` lần trong request (dấu hiệu N+1)."""
+        repeated = [
+            (statement, count)
+            for statement, count in self.statement_counts.items()
+            if count > threshold
+        ]
+        return sorted(repeated, key=lambda item: -item[1])
+
+    @property
+    def route(self) -> str:
+        return route_label(self.scope) if self.scope is not None else "-"
+
+
+def route_label(scope: dict) -> str:
+    """Nhãn route của request: path template, hoặc `unmatched` nếu không khớp route nào."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+# Metrics của request đang xử lý (None ngoài request hoặc khi tắt metrics)
+current_request_metrics: ContextVar[RequestMetrics | None] = ContextVar(
+    "current_request_metrics", default=None
+)
+
+
+class MetricsRegistry:
+    """Tập hợp metrics của process, render theo Prometheus text format."""
+
+    def __init__(self, max_tenants: int = 50, tenant_rank_interval: float = 60.0):
+        self.tenants = TenantLabeler(max_tenants, tenant_rank_interval)
+        self.request_duration = Histogram(
+            "http_request_duration_seconds",
+            "Tổng thời gian xử lý request.",
+            ("method", "route", "status"),
+        )
+        self.request_db_time = Histogram(
+            "http_request_db_seconds",
+            "Thời gian chạy SQL trong request theo loại database.",
+            ("route", "database"),
+        )
+        self.request_queries = Histogram(
+            "http_request_queries",
+            "Số câu lệnh SQL mỗi request.",
+            ("route",),
+            buckets=QUERY_COUNT_BUCKETS,
+        )
+        self.tenant_duration = Histogram(
+            "tenant_request_duration_seconds",
+            "Tổng thời gian xử lý request theo tenant.",
+            ("tenant",),
+        )
+        self.tenant_db_time = Histogram(
+            "tenant_request_db_seconds",
+            "Thời gian chạy SQL trong request theo tenant.",
+            ("tenant",),
+        )
+        self.tenant_bootstrap = Histogram(
+            "tenant_bootstrap_seconds",
+            "Thời gian chờ ensure_tenant_tables (tạo/kiểm tra schema tenant).",
+            ("tenant",),
+        )
+        self.engine_cache_lookups = Counter(
+            "tenant_engine_cache_lookups_total",
+            "Số lần tra tenant engine cache theo route và kết quả.",
+            ("route", "result"),
+        )
+
+    def observe_request(
+        self, method: str, route: str, status: int, metrics: RequestMetrics
+    ) -> None:
+        """Ghi nhận số liệu của một request đã xong."""
+        duration = time.perf_counter() - metrics.started
+        self.request_duration.observe(duration, method, route, str(status))
+        self.request_queries.observe(metrics.query_count, route)
+        for database, elapsed in metrics.db_time.items():
+            self.request_db_time.observe(elapsed, route, database)
+        if metrics.engine_cache_hits:
+            self.engine_cache_lookups.inc(route, "hit", amount=metrics.engine_cache_hits)
+        if metrics.engine_cache_misses:
+            self.engine_cache_lookups.inc(route, "miss", amount=metrics.engine_cache_misses)
+
+        if metrics.tenant_id is not None:
+            tenant = self.tenants.label(metrics.tenant_id)
+            self.tenant_duration.observe(duration, tenant)
+            self.tenant_db_time.observe(metrics.db_time.get("tenant", 0.0), tenant)
+            if metrics.bootstrap_time:
+                self.tenant_bootstrap.observe(metrics.bootstrap_time, tenant)
+
+    def render(self, extra: Iterable[str] = ()) -> str:
+        """Render toàn bộ metrics (kèm các dòng bổ sung) theo Prometheus text format."""
+        lines: list[str] = []
+        for metric in (
+            self.request_duration,
+            self.request_db_time,
+            self.request_queries,
+            self.tenant_duration,
+            self.tenant_db_time,
+            self.tenant_bootstrap,
+            self.engine_cache_lookups,
+        ):
+            lines.extend(metric.render())
+        lines.extend(extra)
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware đo thời gian từng request và gắn RequestMetrics vào ContextVar
+    để các SQLAlchemy hooks cộng dồn thời gian/số câu lệnh SQL. Khi bật
+    QUERY_PROFILING, cuối request log cảnh báo các câu lệnh bị lặp (N+1).
+
+    Nhãn route là path template (`/tenants/{tenant_id}/profiles`), không phải URL
+    thật, nên số series không tăng theo dữ liệu.
+    """
+
+    def __init__(self, app, registry: "MetricsRegistry"):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics(scope=scope)
+        token = current_request_metrics.set(metrics)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_request_metrics.reset(token)
+            route = route_label(scope)
+            if metrics.tenant_id is None:
+                metrics.tenant_id = scope.get("path_params", {}).get("tenant_id")
+            if settings.metrics_enabled:
+                self.registry.observe_request(scope["method"], route, status, metrics)
+            if settings.query_profiling:
+                for statement, count in metrics.repeated_statements(settings.n_plus_one_threshold):
+                    query_logger.warning(
+                        "Có thể là N+1: câu lệnh chạy %d lần trong một request "
+                        "(route=%s %s, tenant_id=%s): %s",
+                        count, scope["method"], route, metrics.tenant_id, statement,
+                    )
+
+
+# Global metrics registry
+metrics_registry = MetricsRegistry(
+    max_tenants=settings.metrics_max_tenants,
+    tenant_rank_interval=settings.metrics_tenant_rank_interval,
+)
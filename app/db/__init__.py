@@ -3,7 +3,7 @@ Database module - Export các thành phần chính để dễ dàng import.
 
 Sử dụng:
     # Shared database
-    from app.db import SharedBase, get_shared_db
+    from app.db import SharedBase, get_shared_db, get_shared_read_db
     
     # Tenant databases
     from app.db import TenantBase, get_tenant_db, get_tenant_db_from_path, get_tenant_db_from_header
@@ -22,6 +22,7 @@ from app.db.session import (
     get_db_dependency,
     get_db_from_header,
     get_shared_db,
+    get_shared_read_db,
     get_tenant_db,
     get_tenant_db_dependency,
     get_tenant_db_from_header,
@@ -41,6 +42,7 @@ __all__ = [
     "async_session",
     # Shared Database
     "get_shared_db",
+    "get_shared_read_db",
     # Tenant Databases
     "get_tenant_db",
     "get_tenant_db_from_path",
@@ -0,0 +1,159 @@
+"""
+Chuyển document content lớn đang lưu inline trong tenant database sang blob store,
+và index lại (FTS qua `search_text`) các document đã nằm trong blob store.
+
+Sử dụng:
+    python -m app.db.blob_offload                  # mọi tenant trong TENANT_DATABASE_DIR
+    python -m app.db.blob_offload tenant_001 tenant_002
+"""
+
+import argparse
+import asyncio
+import json
+
+from sqlalchemy import LargeBinary, cast, func, select, update
+
+from app.core.config import settings
+from app.db.blob_store import get_blob_store
+from app.db.database_manager import db_manager
+from app.models.tenant import Document
+
+
+async def offload_tenant_documents(tenant_id: str, batch_size: int | None = None) -> int:
+    """
+    Chuyển content lớn hơn DOCUMENT_INLINE_MAX_BYTES của một tenant sang blob store.
+    Nội dung được chuyển sang `search_text` để vẫn tìm được bằng FTS.
+    Mỗi batch được commit riêng nên có thể chạy lại an toàn nếu bị gián đoạn.
+
+    Returns:
+        Số documents đã chuyển
+    """
+    limit = settings.document_inline_max_bytes
+    if not limit:
+        return 0
+
+    batch_size = batch_size or settings.bulk_chunk_size
+    await db_manager.ensure_tenant_tables(tenant_id)
+    engine = db_manager.get_tenant_engine(tenant_id)
+    store = get_blob_store(tenant_id)
+
+    moved = 0
+    last_id = 0
+    while True:
+        async with engine.connect() as conn:
+            result = await conn.execute(
+                select(Document.id, Document.content)
+                .where(
+                    Document.id > last_id,
+                    Document.content_hash.is_(None),
+                    # Độ dài theo bytes (UTF-8), không phải số ký tự
+                    func.length(cast(Document.content, LargeBinary)) > limit,
+                )
+                .order_by(Document.id)
+                .limit(batch_size)
+            )
+            rows = result.all()
+        if not rows:
+            return moved
+
+        # Ghi blobs trước, ngoài transaction ghi của database
+        values = []
+        for document_id, content in rows:
+            data = content.encode()
+            values.append((document_id, await store.put(data), len(data)))
+
+        async with engine.begin() as conn:
+            for document_id, content_hash, content_size in values:
+                await conn.execute(
+                    update(Document)
+                    .where(Document.id == document_id, Document.content_hash.is_(None))
+                    .values(
+                        content=None,
+                        # SET dùng giá trị cũ của dòng: search_text nhận content hiện tại
+                        search_text=Document.content,
+                        content_hash=content_hash,
+                        content_size=content_size,
+                    )
+                )
+        moved += len(rows)
+        last_id = rows[-1][0]
+
+
+async def index_offloaded_documents(tenant_id: str, batch_size: int | None = None) -> int:
+    """
+    Điền `search_text` từ blob store cho các document chưa có (offload trước khi
+    có `search_text`), để FTS index chứa nội dung của chúng.
+
+    Returns:
+        Số documents đã index
+    """
+    batch_size = batch_size or settings.bulk_chunk_size
+    await db_manager.ensure_tenant_tables(tenant_id)
+    engine = db_manager.get_tenant_engine(tenant_id)
+    store = get_blob_store(tenant_id)
+
+    indexed = 0
+    last_id = 0
+    while True:
+        async with engine.connect() as conn:
+            result = await conn.execute(
+                select(Document.id, Document.content_hash)
+                .where(
+                    Document.id > last_id,
+                    Document.content_hash.is_not(None),
+                    Document.search_text.is_(None),
+                )
+                .order_by(Document.id)
+                .limit(batch_size)
+            )
+            rows = result.all()
+        if not rows:
+            return indexed
+
+        values = [
+            (document_id, (await store.read(content_hash)).decode())
+            for document_id, content_hash in rows
+        ]
+        async with engine.begin() as conn:
+            for document_id, search_text in values:
+                await conn.execute(
+                    update(Document)
+                    .where(Document.id == document_id, Document.search_text.is_(None))
+                    .values(search_text=search_text)
+                )
+        indexed += len(rows)
+        last_id = rows[-1][0]
+
+
+async def offload_tenants(tenant_ids: list[str] | None = None) -> dict:
+    """
+    Chạy offload và index cho các tenant.
+
+    Returns:
+        {tenant_id: {"offloaded": số documents đã chuyển, "indexed": số documents đã index}}
+    """
+    report = {}
+    try:
+        for tenant_id in tenant_ids or settings.list_tenant_ids():
+            report[tenant_id] = {
+                "offloaded": await offload_tenant_documents(tenant_id),
+                "indexed": await index_offloaded_documents(tenant_id),
+            }
+    finally:
+        await db_manager.dispose_all()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Chuyển document content lớn sang blob store"
+    )
+    parser.add_argument("tenant_ids", nargs="*", help="Tenant IDs (mặc định: tất cả)")
+    args = parser.parse_args()
+
+    report = asyncio.run(offload_tenants(args.tenant_ids or None))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
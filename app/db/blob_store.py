@@ -0,0 +1,74 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+from app.core.config import settings
+
+
+class BlobStore:
+    """
+    Content-addressed blob store trên đĩa cho một tenant.
+
+    Mỗi blob được lưu tại `<root>/<2 ký tự đầu của sha256>/<sha256>`; nội dung
+    giống nhau chỉ được ghi một lần. Blob được ghi qua file tạm và `os.replace`
+    nên reader không bao giờ thấy file ghi dở.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    @staticmethod
+    def hash_content(data: bytes) -> str:
+        """SHA-256 (hex) của nội dung, dùng làm địa chỉ blob."""
+        return hashlib.sha256(data).hexdigest()
+
+    def path_for(self, content_hash: str) -> Path:
+        """Đường dẫn file của blob theo hash."""
+        if len(content_hash) != 64 or not all(c in "0123456789abcdef" for c in content_hash):
+            raise ValueError(f"Content hash không hợp lệ: {content_hash!r}")
+        return self.root / content_hash[:2] / content_hash
+
+    def exists(self, content_hash: str) -> bool:
+        return self.path_for(content_hash).is_file()
+
+    def _write(self, content_hash: str, data: bytes) -> None:
+        path = self.path_for(content_hash)
+        if path.is_file():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    async def put(self, data: bytes) -> str:
+        """
+        Lưu nội dung vào store (bỏ qua nếu blob đã tồn tại).
+
+        Returns:
+            Content hash của blob
+        """
+        content_hash = self.hash_content(data)
+        # Ghi file trong thread để không chặn event loop
+        await asyncio.to_thread(self._write, content_hash, data)
+        return content_hash
+
+    async def read(self, content_hash: str) -> bytes:
+        """Đọc toàn bộ nội dung blob (chỉ dùng cho blob cần xử lý trong Python)."""
+        return await asyncio.to_thread(self.path_for(content_hash).read_bytes)
+
+
+def get_blob_store(tenant_id: str) -> BlobStore:
+    """Lấy blob store của tenant (thư mục riêng cho từng tenant)."""
+    return BlobStore(settings.get_blob_storage_dir(tenant_id))
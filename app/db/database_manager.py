@@ -1,9 +1,41 @@
-from typing import Dict, Set
-
-from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+import asyncio
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Iterable, Set
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import NullPool
+from sqlalchemy.sql import Executable
 
 from app.core.config import settings
+from app.core.metrics import current_request_metrics
 from app.db.base import SharedBase, TenantBase
+from app.db.fts import ensure_fts_indexes
+from app.db.instrumentation import instrument_engine
+from app.db.routing import SharedReadSession
+from app.db.schema import (
+    add_missing_columns,
+    compute_schema_version,
+    get_user_version,
+    set_user_version,
+)
+from app.db.sqlite import apply_sqlite_pragmas
+from app.db.table_versions import ensure_table_versions, read_table_versions
+from app.db.tenant_cache import TenantCacheStats, TenantEngineCache, TenantEngineEntry
+from app.db.tenant_stats import TenantSession, TenantStatsRecorder, most_active_tenants
+from app.db.tenant_template import TenantTemplate
+from app.db.write_queue import TenantWriteQueue
+
+logger = logging.getLogger(__name__)
 
 
 class DatabaseManager:
@@ -15,21 +47,53 @@ class DatabaseManager:
 
     def __init__(self):
         self._shared_engine: AsyncEngine | None = None
-        self._tenant_engines: Dict[str, AsyncEngine] = {}  # Cache tenant engines
+        # Read replicas của shared database (rỗng = đọc từ primary)
+        self._shared_replica_engines: list[AsyncEngine] = []
+        self._replica_cycle = itertools.count()
+        self._shared_read_session_factory: async_sessionmaker | None = None
+        # Cache tenant engines (LRU có giới hạn + idle TTL)
+        self._tenant_engines = TenantEngineCache(
+            max_size=settings.tenant_engine_cache_size,
+            idle_ttl=settings.tenant_engine_idle_ttl,
+        )
+        # Engines bị evict đang chờ dispose
+        self._disposal_tasks: Set[asyncio.Task] = set()
+        self._pending_disposals: list[TenantEngineEntry] = []
         self._tenant_tables_created: Set[str] = set()  # Track tenants đã tạo tables
+        # Bootstrap đang chạy cho từng tenant (single-flight)
+        self._tenant_bootstrap_tasks: Dict[str, asyncio.Future] = {}
+        self._tenant_schema_version: int | None = None
+        # File mẫu cho tenant databases mới (theo schema version hiện tại)
+        self._tenant_template: TenantTemplate | None = None
+        # Các lần pre-warm đang chạy nền
+        self._prewarm_tasks: Set[asyncio.Task] = set()
+        # Group-commit write queues theo tenant (khi bật TENANT_WRITE_QUEUE_ENABLED)
+        self._write_queues: Dict[str, TenantWriteQueue] = {}
+        # Thống kê theo tenant, cộng dồn vào bảng tenant_stats của shared database
+        self.tenant_stats = TenantStatsRecorder(
+            self.get_shared_engine,
+            flush_interval=settings.tenant_stats_flush_interval,
+            enabled=settings.tenant_stats_enabled,
+        )
         self._other_engines: Dict[
             str, AsyncEngine
         ] = {}  # Các engines khác (backward compatibility)
+        # Session factories đã tạo cho shared/other engines (theo tên database)
+        self._session_factories: Dict[str, async_sessionmaker] = {}
         self._initialize_engines()
 
     def _initialize_engines(self):
         """Khởi tạo shared database engine."""
         # Khởi tạo shared database
-        self._shared_engine = create_async_engine(
-            settings.shared_database_url,
-            echo=settings.debug,
-            future=True,
-        )
+        self._shared_engine = self._create_engine(settings.shared_database_url)
+        self._shared_replica_engines = [
+            self._create_engine(url) for url in settings.shared_database_replica_urls
+        ]
+        if settings.shared_replica_strategy not in ("round_robin", "least_busy"):
+            raise ValueError(
+                f"Chiến lược replica '{settings.shared_replica_strategy}' không hợp lệ. "
+                "Các giá trị hợp lệ: ['round_robin', 'least_busy']"
+            )
 
         # Backward compatibility - giữ lại các engines khác nếu có
         databases: Dict[str, str] = {}
@@ -48,11 +112,83 @@ class DatabaseManager:
                 databases["analytics"] = settings.database_analytics_url
 
         for name, url in databases.items():
-            self._other_engines[name] = create_async_engine(
-                url,
-                echo=settings.debug,
-                future=True,
-            )
+            self._other_engines[name] = self._create_engine(url, database=name)
+
+    def _create_engine(
+        self,
+        url: str,
+        tenant_id: str | None = None,
+        read_only: bool = False,
+        database: str = "shared",
+        **engine_kwargs: Any,
+    ) -> AsyncEngine:
+        """
+        Tạo AsyncEngine và áp dụng SQLite pragma profile (nếu là SQLite).
+
+        Args:
+            url: Database URL
+            tenant_id: ID của tenant, dùng để lấy pragma ghi đè riêng
+            read_only: Engine chỉ đọc: bật `query_only`, bỏ `journal_mode`
+                (không thể đổi journal mode trên connection chỉ đọc)
+            database: Nhãn database trong metrics (tenant engines luôn là "tenant")
+            **engine_kwargs: Tham số bổ sung cho create_async_engine (pool, ...)
+
+        Returns:
+            AsyncEngine instance
+        """
+        engine = create_async_engine(
+            url,
+            echo=settings.debug,
+            future=True,
+            **engine_kwargs,
+        )
+        pragmas = settings.get_sqlite_pragmas(tenant_id)
+        if read_only:
+            pragmas.pop("journal_mode", None)
+            pragmas["query_only"] = "ON"
+        apply_sqlite_pragmas(engine, pragmas)
+        if settings.metrics_enabled or settings.query_profiling:
+            instrument_engine(engine, "tenant" if tenant_id else database, tenant_id)
+        return engine
+
+    @staticmethod
+    def _create_session_factory(engine: AsyncEngine, **session_kwargs: Any) -> async_sessionmaker:
+        """Tạo async_sessionmaker với cấu hình chung cho mọi database."""
+        return async_sessionmaker(
+            engine,
+            class_=AsyncSession,
+            expire_on_commit=False,
+            autocommit=False,
+            autoflush=False,
+            **session_kwargs,
+        )
+
+    def _create_tenant_session_factory(
+        self, engine: AsyncEngine, tenant_id: str
+    ) -> async_sessionmaker:
+        """Session factory của tenant: ghi nhận thay đổi cho tenant statistics."""
+        return self._create_session_factory(
+            engine,
+            sync_session_class=TenantSession,
+            info={"tenant_id": tenant_id, "tenant_stats": self.tenant_stats},
+        )
+
+    def get_session_factory(self, name: str | None = None) -> async_sessionmaker:
+        """
+        Lấy session factory (đã cache) cho database theo tên.
+
+        Args:
+            name: Tên database. None hoặc "shared" là shared database.
+
+        Returns:
+            async_sessionmaker instance
+        """
+        key = name or "shared"
+        factory = self._session_factories.get(key)
+        if factory is None:
+            factory = self._create_session_factory(self.get_engine(name))
+            self._session_factories[key] = factory
+        return factory
 
     def get_shared_engine(self) -> AsyncEngine:
         """
@@ -65,10 +201,46 @@ class DatabaseManager:
             raise RuntimeError("Shared database engine chưa được khởi tạo")
         return self._shared_engine
 
+    def get_shared_read_engine(self) -> AsyncEngine:
+        """
+        Chọn engine để đọc shared database.
+        Trả về một replica theo SHARED_REPLICA_STRATEGY, hoặc primary nếu
+        không cấu hình replica.
+
+        Returns:
+            AsyncEngine instance
+        """
+        replicas = self._shared_replica_engines
+        if not replicas:
+            return self.get_shared_engine()
+        if settings.shared_replica_strategy == "least_busy":
+            return min(replicas, key=lambda engine: engine.pool.checkedout())
+        return replicas[next(self._replica_cycle) % len(replicas)]
+
+    def get_shared_read_session_factory(self) -> async_sessionmaker:
+        """
+        Lấy session factory chỉ đọc cho shared database.
+        Bind được chọn cho từng session (replica, hoặc primary sau khi request
+        đã ghi vào shared database).
+
+        Returns:
+            async_sessionmaker instance
+        """
+        if self._shared_read_session_factory is None:
+            self._shared_read_session_factory = async_sessionmaker(
+                class_=AsyncSession,
+                sync_session_class=SharedReadSession,
+                expire_on_commit=False,
+                autoflush=False,
+                info={"manager": self},
+            )
+        return self._shared_read_session_factory
+
     def get_tenant_engine(self, tenant_id: str) -> AsyncEngine:
         """
         Lấy engine cho tenant database cụ thể.
         Tự động tạo engine nếu chưa có trong cache.
+        Engines ít dùng hoặc idle quá lâu sẽ bị evict và dispose.
 
         Args:
             tenant_id: ID của tenant/cá thể
@@ -76,31 +248,387 @@ class DatabaseManager:
         Returns:
             AsyncEngine instance cho tenant database
         """
-        if tenant_id not in self._tenant_engines:
-            # Tạo engine mới cho tenant
-            db_url = settings.get_tenant_database_url(tenant_id)
-            self._tenant_engines[tenant_id] = create_async_engine(
-                db_url,
-                echo=settings.debug,
-                future=True,
+        return self._get_tenant_entry(tenant_id).engine
+
+    def get_tenant_session_factory(self, tenant_id: str) -> async_sessionmaker:
+        """
+        Lấy session factory (đã cache cùng engine) cho tenant database.
+
+        Args:
+            tenant_id: ID của tenant/cá thể
+
+        Returns:
+            async_sessionmaker instance
+        """
+        return self._get_tenant_entry(tenant_id).session_factory
+
+    def get_tenant_reader_session_factory(self, tenant_id: str) -> async_sessionmaker:
+        """
+        Lấy session factory chỉ đọc cho tenant database.
+        Dùng pool reader riêng (mode=ro, query_only) khi TENANT_READ_WRITE_SPLIT bật,
+        nên các request đọc không tranh connection với writer.
+
+        Args:
+            tenant_id: ID của tenant/cá thể
+
+        Returns:
+            async_sessionmaker instance
+        """
+        return self._get_tenant_entry(tenant_id).reader_session_factory
+
+    def _get_tenant_entry(self, tenant_id: str) -> TenantEngineEntry:
+        self._dispose_entries(self._tenant_engines.evict_idle())
+
+        entry = self._tenant_engines.get(tenant_id)
+        metrics = current_request_metrics.get()
+        if entry is None:
+            entry = self._create_tenant_entry(tenant_id)
+            self._dispose_entries(self._tenant_engines.put(entry))
+            if metrics is not None:
+                metrics.engine_cache_misses += 1
+        elif metrics is not None:
+            metrics.engine_cache_hits += 1
+
+        return entry
+
+    def _create_tenant_entry(self, tenant_id: str) -> TenantEngineEntry:
+        """Tạo engines và session factories cho tenant (chỉ khi cache miss)."""
+        db_url = settings.get_tenant_database_url(tenant_id)
+        if not settings.tenant_read_write_split:
+            engine = self._create_engine(db_url, tenant_id)
+            session_factory = self._create_tenant_session_factory(engine, tenant_id)
+            return TenantEngineEntry(
+                tenant_id=tenant_id,
+                engine=engine,
+                session_factory=session_factory,
+                reader_engine=engine,
+                reader_session_factory=session_factory,
+                url=db_url,
             )
 
-        return self._tenant_engines[tenant_id]
+        # SQLite chỉ có một writer tại một thời điểm: pool một connection để
+        # các request ghi xếp hàng trong pool thay vì gặp "database is locked"
+        engine = self._create_engine(
+            db_url,
+            tenant_id,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=settings.tenant_writer_pool_timeout,
+        )
+        # Với WAL, nhiều reader đọc song song cùng writer
+        reader_engine = self._create_engine(
+            settings.get_tenant_database_url(tenant_id, read_only=True),
+            tenant_id,
+            read_only=True,
+            pool_size=settings.tenant_reader_pool_size,
+            max_overflow=0,
+        )
+        return TenantEngineEntry(
+            tenant_id=tenant_id,
+            engine=engine,
+            session_factory=self._create_tenant_session_factory(engine, tenant_id),
+            reader_engine=reader_engine,
+            reader_session_factory=self._create_tenant_session_factory(reader_engine, tenant_id),
+            url=db_url,
+        )
+
+    def _dispose_entries(self, entries: list[TenantEngineEntry]) -> None:
+        """
+        Dispose các tenant engines bị evict.
+        Chạy nền nếu đang có event loop, ngược lại dispose khi gọi dispose_all.
+        """
+        if not entries:
+            return
+
+        # Đóng ngay, không chờ dispose chạy nền: engine/session factory còn bị
+        # giữ ở nơi khác không mở thêm connection vào pool sắp bị dispose
+        for entry in entries:
+            entry.closed = True
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._pending_disposals.extend(entries)
+            return
+
+        for entry in entries:
+            task = loop.create_task(entry.dispose())
+            self._disposal_tasks.add(task)
+            task.add_done_callback(self._disposal_tasks.discard)
+
+    @asynccontextmanager
+    async def tenant_read_connection(self, tenant_id: str) -> AsyncIterator[AsyncConnection]:
+        """
+        Mở connection chỉ đọc tới tenant database mà không thêm engine vào cache.
 
-    async def ensure_tenant_tables(self, tenant_id: str) -> None:
+        Tenant đang có trong cache dùng lại reader engine sẵn có; tenant khác
+        dùng engine tạm (NullPool, `mode=ro`) được dispose ngay sau khi dùng,
+        phù hợp cho các truy vấn quét nhiều tenant (mỗi tenant chỉ chạm một lần).
+        Không tạo schema: tenant database phải đã tồn tại.
+
+        Args:
+            tenant_id: ID của tenant/cá thể
+
+        Yields:
+            AsyncConnection chỉ đọc
+        """
+        entry = self._tenant_engines.peek(tenant_id)
+        if entry is not None:
+            async with (entry.reader_engine or entry.engine).connect() as conn:
+                yield conn
+            return
+
+        engine = self._create_engine(
+            settings.get_tenant_database_url(tenant_id, read_only=True),
+            tenant_id=tenant_id,
+            read_only=True,
+            poolclass=NullPool,
+        )
+        try:
+            async with engine.connect() as conn:
+                yield conn
+        finally:
+            await engine.dispose()
+
+    def tenant_cache_stats(self) -> TenantCacheStats:
+        """Trả về thống kê hit/miss/eviction của tenant engine cache."""
+        return self._tenant_engines.stats()
+
+    async def ensure_tenant_tables(self, tenant_id: str, cache_engine: bool = True) -> None:
         """
         Đảm bảo tables đã được tạo cho tenant database.
         Chỉ tạo một lần cho mỗi tenant.
 
+        Các request đồng thời cho cùng một tenant chưa bootstrap sẽ dùng chung
+        một lần chạy create_all (single-flight) thay vì tranh nhau write lock.
+        Nếu bootstrap lỗi, lỗi được trả về cho mọi caller đang chờ và lần gọi
+        sau sẽ thử lại.
+
         Args:
             tenant_id: ID của tenant/cá thể
+            cache_engine: False: bootstrap bằng engine tạm (NullPool) thay vì
+                engine trong cache, dùng khi chỉ cần tạo file và schema
+        """
+        if tenant_id in self._tenant_tables_created:
+            return
+
+        metrics = current_request_metrics.get()
+        started = time.perf_counter()
+        task = self._tenant_bootstrap_tasks.get(tenant_id)
+        if task is None:
+            task = asyncio.ensure_future(self._bootstrap_tenant(tenant_id, cache_engine))
+            self._tenant_bootstrap_tasks[tenant_id] = task
+            task.add_done_callback(
+                lambda t, tid=tenant_id: self._finish_bootstrap(tid, t)
+            )
+
+        # shield: caller bị cancel không làm hủy bootstrap của các caller khác
+        try:
+            await asyncio.shield(task)
+        finally:
+            if metrics is not None:
+                metrics.bootstrap_time += time.perf_counter() - started
+
+    async def _bootstrap_tenant(self, tenant_id: str, cache_engine: bool = True) -> None:
         """
-        if tenant_id not in self._tenant_tables_created:
-            engine = self.get_tenant_engine(tenant_id)
-            async with engine.begin() as conn:
+        Tạo schema cho tenant database (chỉ chạy trong single-flight task).
+
+        Tenant file đã được đóng dấu đúng schema version (`PRAGMA user_version`)
+        sẽ bỏ qua create_all, nên mỗi worker chỉ tốn một lần đọc số nguyên
+        thay vì reflect toàn bộ tables và indexes. Tenant chưa có file được
+        tạo bằng cách copy file mẫu (TENANT_TEMPLATE_ENABLED), file mẫu đã đóng
+        dấu schema version nên cũng bỏ qua DDL.
+        """
+        if cache_engine:
+            await self._create_tenant_schema(tenant_id, self.get_tenant_engine(tenant_id))
+        else:
+            engine = self._create_engine(
+                settings.get_tenant_database_url(tenant_id), tenant_id, poolclass=NullPool
+            )
+            try:
+                await self._create_tenant_schema(tenant_id, engine)
+            finally:
+                await engine.dispose()
+        self._tenant_tables_created.add(tenant_id)
+
+    async def _create_tenant_schema(self, tenant_id: str, engine: AsyncEngine) -> None:
+        version = self.tenant_schema_version
+        if settings.tenant_template_enabled and engine.dialect.name == "sqlite":
+            path = settings.get_tenant_database_path(tenant_id)
+            if not path.exists():
+                await self.get_tenant_template().provision(path)
+        async with engine.begin() as conn:
+            is_sqlite = conn.dialect.name == "sqlite"
+            if not is_sqlite or await get_user_version(conn) != version:
                 # Chỉ tạo các bảng thuộc TenantBase (schema dành cho tenant databases)
                 await conn.run_sync(TenantBase.metadata.create_all)
-            self._tenant_tables_created.add(tenant_id)
+                if is_sqlite:
+                    await add_missing_columns(conn, TenantBase.metadata)
+                    await ensure_fts_indexes(conn, TenantBase.metadata)
+                    await ensure_table_versions(conn, TenantBase.metadata)
+                    await set_user_version(conn, version)
+
+    async def get_table_versions(self, tenant_id: str, tables: Iterable[str]) -> dict[str, int]:
+        """
+        Version thay đổi hiện tại của các tenant tables, đọc từ tenant database
+        qua reader pool (triggers tăng version trong cùng transaction với lệnh ghi).
+
+        Args:
+            tenant_id: ID của tenant/cá thể
+            tables: Tên các tables
+
+        Returns:
+            {table: version}
+        """
+        await self.ensure_tenant_tables(tenant_id)
+        async with self._get_tenant_entry(tenant_id).reader_engine.connect() as conn:
+            return await read_table_versions(conn, tables)
+
+    async def warm_tenant(self, tenant_id: str) -> None:
+        """
+        Mở sẵn tenant database: tạo engines, file và schema (ensure_tenant_tables)
+        và một connection trong reader pool, để request đầu tiên không phải chờ.
+        """
+        await self.ensure_tenant_tables(tenant_id)
+        async with self._get_tenant_entry(tenant_id).reader_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async def provision_tenant(self, tenant_id: str) -> str | None:
+        """
+        Tạo file và schema cho tenant mới bằng engine tạm, không thêm engine vào
+        tenant engine cache: tạo nhiều tenant liên tục không evict các tenant
+        đang được dùng.
+
+        Returns:
+            None nếu thành công, hoặc thông báo lỗi
+        """
+        try:
+            await self.ensure_tenant_tables(tenant_id, cache_engine=False)
+        except Exception as exc:
+            logger.warning("Tạo tenant database %s lỗi: %s", tenant_id, exc)
+            return str(exc)
+        return None
+
+    async def prewarm_tenants(
+        self, tenant_ids: Iterable[str], concurrency: int | None = None
+    ) -> dict[str, str | None]:
+        """
+        Pre-warm nhiều tenant, tối đa `concurrency` tenant cùng lúc.
+
+        Returns:
+            {tenant_id: None nếu thành công, hoặc thông báo lỗi}
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency or settings.tenant_prewarm_concurrency))
+        results: dict[str, str | None] = {}
+
+        async def warm(tenant_id: str) -> None:
+            async with semaphore:
+                try:
+                    await self.warm_tenant(tenant_id)
+                    results[tenant_id] = None
+                except Exception as exc:
+                    logger.warning("Pre-warm tenant %s lỗi: %s", tenant_id, exc)
+                    results[tenant_id] = str(exc)
+
+        await asyncio.gather(*(warm(tenant_id) for tenant_id in dict.fromkeys(tenant_ids)))
+        return results
+
+    async def prewarm_active_tenants(self, limit: int | None = None) -> dict[str, str | None]:
+        """
+        Pre-warm các tenant có hoạt động ghi gần nhất (gọi khi khởi động).
+        Số tenant không vượt quá kích thước tenant engine cache.
+        """
+        limit = min(
+            settings.tenant_prewarm_count if limit is None else limit,
+            settings.tenant_engine_cache_size,
+        )
+        if limit <= 0:
+            return {}
+        async with self.get_shared_engine().connect() as conn:
+            tenant_ids = await most_active_tenants(conn, limit)
+        return await self.prewarm_tenants(tenant_ids)
+
+    def schedule_prewarm(self, coro) -> asyncio.Task:
+        """
+        Chạy một coroutine pre-warm (`prewarm_tenants`, `prewarm_active_tenants`,
+        `provision_tenant`) ở nền; các task chưa xong bị hủy khi dispose_all.
+        """
+        async def run():
+            # Task có bản sao context của request đã tạo nó: không cộng thời gian
+            # SQL của pre-warm vào metrics của request đó
+            current_request_metrics.set(None)
+            return await coro
+
+        task = asyncio.get_running_loop().create_task(run())
+        self._prewarm_tasks.add(task)
+        task.add_done_callback(self._prewarm_tasks.discard)
+        return task
+
+    def get_tenant_template(self) -> TenantTemplate:
+        """File mẫu tenant database cho schema version hiện tại."""
+        if self._tenant_template is None:
+            self._tenant_template = TenantTemplate(
+                settings.get_tenant_template_dir(),
+                TenantBase.metadata,
+                self.tenant_schema_version,
+            )
+        return self._tenant_template
+
+    @property
+    def tenant_schema_version(self) -> int:
+        """
+        Schema version của TenantBase.metadata.
+        Tính lazily vì tenant models phải được import trước khi dùng.
+        """
+        if self._tenant_schema_version is None:
+            self._tenant_schema_version = compute_schema_version(TenantBase.metadata)
+        return self._tenant_schema_version
+
+    def _finish_bootstrap(self, tenant_id: str, task: asyncio.Future) -> None:
+        if self._tenant_bootstrap_tasks.get(tenant_id) is task:
+            del self._tenant_bootstrap_tasks[tenant_id]
+        # Đánh dấu exception đã được xử lý nếu không còn caller nào chờ
+        if not task.cancelled():
+            task.exception()
+
+    async def submit_tenant_write(
+        self, tenant_id: str, statement: Executable
+    ) -> dict[str, Any] | None:
+        """
+        Ghi vào tenant database qua group-commit write queue của tenant.
+        Các câu lệnh từ nhiều request đồng thời được commit chung một transaction.
+
+        Args:
+            tenant_id: ID của tenant/cá thể
+            statement: Câu lệnh INSERT/UPDATE (nên có `.returning(...)`)
+
+        Returns:
+            Dòng được RETURNING (dict) hoặc None
+        """
+        queue = self._write_queues.get(tenant_id)
+        if queue is None:
+            queue = TenantWriteQueue(
+                tenant_id,
+                self.get_tenant_engine,
+                window=settings.tenant_write_queue_window_ms / 1000,
+                max_batch=settings.tenant_write_queue_max_batch,
+                idle_timeout=settings.tenant_write_queue_idle_timeout,
+                on_idle=self._write_queue_idle,
+            )
+            self._write_queues[tenant_id] = queue
+        row = await queue.submit(statement)
+        # Write queue ghi bằng Core (không qua TenantSession): ghi nhận thống kê trực tiếp.
+        # INSERT ... WHERE NOT EXISTS bị bỏ qua không trả dòng nào
+        if getattr(statement, "is_insert", False) and (
+            row is not None or not statement.exported_columns
+        ):
+            self.tenant_stats.record(tenant_id, statement.table.name, 1)
+        return row
+
+    def _write_queue_idle(self, tenant_id: str) -> None:
+        queue = self._write_queues.get(tenant_id)
+        if queue is not None and queue.pending() == 0:
+            del self._write_queues[tenant_id]
 
     def get_engine(self, name: str | None = None) -> AsyncEngine:
         """
@@ -138,40 +666,62 @@ class DatabaseManager:
         Returns:
             AsyncEngine instance mới được tạo
         """
-        engine = create_async_engine(
-            url,
-            echo=settings.debug,
-            future=True,
-        )
+        engine = self._create_engine(url, database=name)
         self._other_engines[name] = engine
+        self._session_factories.pop(name, None)
         return engine
 
     def remove_tenant_engine(self, tenant_id: str) -> None:
         """
-        Xóa tenant engine khỏi cache (không dispose).
-        Engine sẽ được dispose khi app shutdown.
+        Xóa tenant engine khỏi cache và dispose engine.
 
         Args:
             tenant_id: ID của tenant
         """
-        if tenant_id in self._tenant_engines:
-            del self._tenant_engines[tenant_id]
+        entry = self._tenant_engines.pop(tenant_id)
+        if entry is not None:
+            self._dispose_entries([entry])
 
     async def dispose_all(self) -> None:
         """Dispose tất cả engines. Gọi khi app shutdown."""
-        # Dispose shared engine
+        # Dừng các lần pre-warm đang chạy nền
+        for task in list(self._prewarm_tasks):
+            task.cancel()
+        if self._prewarm_tasks:
+            await asyncio.gather(*self._prewarm_tasks, return_exceptions=True)
+
+        # Commit nốt các write queues trước khi đóng engines
+        for queue in list(self._write_queues.values()):
+            await queue.close()
+        self._write_queues.clear()
+
+        # Ghi nốt tenant statistics vào shared database (sau write queues, vì
+        # các lệnh ghi vừa commit cũng ghi nhận thống kê)
+        try:
+            await self.tenant_stats.close()
+        except Exception as exc:
+            # Không chặn shutdown; số liệu có thể tính lại bằng rebuild_tenant_stats
+            logger.warning("Không ghi được tenant statistics khi shutdown: %s", exc)
+
+        # Dispose shared engine và replicas
         if self._shared_engine:
             await self._shared_engine.dispose()
-
-        # Dispose tất cả tenant engines
-        for engine in self._tenant_engines.values():
+        for engine in self._shared_replica_engines:
             await engine.dispose()
-        self._tenant_engines.clear()
+
+        # Dispose tất cả tenant engines (kể cả engines bị evict đang chờ dispose)
+        if self._disposal_tasks:
+            await asyncio.gather(*self._disposal_tasks, return_exceptions=True)
+        pending = self._pending_disposals + self._tenant_engines.clear()
+        self._pending_disposals = []
+        for entry in pending:
+            await entry.dispose()
 
         # Dispose các engines khác
         for engine in self._other_engines.values():
             await engine.dispose()
         self._other_engines.clear()
+        self._session_factories.clear()
 
     def list_tenants(self) -> list[str]:
         """Trả về danh sách tenant IDs đã được cache."""
@@ -0,0 +1,114 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+from app.db.database_manager import DatabaseManager, db_manager
+
+# Hàm truy vấn chạy trên connection chỉ đọc của một tenant
+TenantQuery = Callable[[AsyncConnection], Awaitable[Any]]
+
+# Sentinel báo một worker đã xử lý xong
+_DONE: Any = object()
+
+
+@dataclass
+class FanoutResult:
+    """Kết quả truy vấn trên một tenant: `value` hoặc `error`."""
+    tenant_id: str
+    value: Any = None
+    error: str | None = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class TenantFanout:
+    """
+    Chạy một truy vấn trên nhiều tenant databases với số lượng đồng thời giới hạn.
+
+    - Tối đa `concurrency` tenant được truy vấn cùng lúc.
+    - Mỗi tenant có timeout riêng; tenant lỗi/timeout không làm hỏng các tenant khác.
+    - Kết quả được trả về ngay khi từng tenant xong (thứ tự hoàn thành).
+    - Connection mở qua `DatabaseManager.tenant_read_connection`, nên tenant chỉ
+      được chạm một lần không chiếm chỗ trong tenant engine cache.
+
+    Sử dụng:
+        async def count_profiles(conn):
+            return await conn.scalar(select(func.count()).select_from(Profile))
+
+        async for result in TenantFanout().run(count_profiles):
+            print(result.tenant_id, result.value, result.error)
+    """
+
+    def __init__(
+        self,
+        manager: DatabaseManager | None = None,
+        concurrency: int | None = None,
+        timeout: float | None = None,
+    ):
+        self.manager = manager or db_manager
+        self.concurrency = max(1, concurrency or settings.fanout_concurrency)
+        self.timeout = timeout if timeout is not None else settings.fanout_tenant_timeout
+
+    async def _query_tenant(self, tenant_id: str, query: TenantQuery) -> FanoutResult:
+        started = time.perf_counter()
+        try:
+            # Trong try: tenant ID không hợp lệ cũng trả về kết quả lỗi của tenant đó
+            if not settings.get_tenant_database_path(tenant_id).is_file():
+                return FanoutResult(tenant_id, error="Tenant database không tồn tại")
+            async with asyncio.timeout(self.timeout or None):
+                async with self.manager.tenant_read_connection(tenant_id) as conn:
+                    value = await query(conn)
+        except TimeoutError:
+            error = f"Timeout sau {self.timeout} giây"
+            return FanoutResult(tenant_id, error=error, elapsed=time.perf_counter() - started)
+        except Exception as exc:
+            return FanoutResult(tenant_id, error=str(exc), elapsed=time.perf_counter() - started)
+        return FanoutResult(tenant_id, value=value, elapsed=time.perf_counter() - started)
+
+    async def run(
+        self,
+        query: TenantQuery,
+        tenant_ids: Iterable[str] | None = None,
+    ) -> AsyncIterator[FanoutResult]:
+        """
+        Chạy `query` trên các tenant và stream kết quả theo thứ tự hoàn thành.
+
+        Args:
+            query: Coroutine function nhận AsyncConnection (chỉ đọc) của tenant
+            tenant_ids: Danh sách tenant, None để chạy trên mọi tenant file
+
+        Yields:
+            FanoutResult cho từng tenant
+        """
+        pending = iter(list(tenant_ids) if tenant_ids is not None else settings.list_tenant_ids())
+        results: asyncio.Queue[FanoutResult] = asyncio.Queue()
+
+        async def worker() -> None:
+            try:
+                # Các worker dùng chung iterator: mỗi tenant được lấy đúng một lần
+                for tenant_id in pending:
+                    await results.put(await self._query_tenant(tenant_id, query))
+            finally:
+                results.put_nowait(_DONE)
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        running = len(workers)
+        try:
+            while running:
+                result = await results.get()
+                if result is _DONE:
+                    running -= 1
+                    continue
+                yield result
+        finally:
+            # Consumer dừng sớm (client ngắt kết nối, ...): hủy các worker còn chạy
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
@@ -0,0 +1,141 @@
+import re
+from dataclasses import dataclass
+
+from sqlalchemy import MetaData
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+# Key trong MetaData.info chứa các FTS index của schema
+FTS_INFO_KEY = "fts_indexes"
+
+_TOKEN_RE = re.compile(r"\w+\*?", re.UNICODE)
+
+
+@dataclass(frozen=True)
+class FTSIndex:
+    """
+    SQLite FTS5 index (external content) cho một bảng của schema.
+
+    Virtual table chỉ lưu index, nội dung đọc từ bảng gốc qua `content_rowid`;
+    triggers giữ index đồng bộ khi INSERT/UPDATE/DELETE trên bảng gốc.
+    """
+    name: str
+    table: str
+    columns: tuple[str, ...]
+    content_rowid: str = "id"
+    # remove_diacritics 2: tìm "tai lieu" khớp "tài liệu"
+    tokenize: str = "unicode61 remove_diacritics 2"
+
+    def ddl(self) -> dict[str, str]:
+        """
+        Các câu lệnh CREATE của index, theo tên object trong `sqlite_master`.
+        Không dùng IF NOT EXISTS để so khớp được với `sqlite_master.sql`.
+        """
+        columns = ", ".join(self.columns)
+        new_values = ", ".join(f"new.{column}" for column in self.columns)
+        old_values = ", ".join(f"old.{column}" for column in self.columns)
+        insert_new = (
+            f"INSERT INTO {self.name}(rowid, {columns}) "
+            f"VALUES (new.{self.content_rowid}, {new_values});"
+        )
+        delete_old = (
+            f"INSERT INTO {self.name}({self.name}, rowid, {columns}) "
+            f"VALUES ('delete', old.{self.content_rowid}, {old_values});"
+        )
+        return {
+            self.name: (
+                f"CREATE VIRTUAL TABLE {self.name} USING fts5({columns}, "
+                f"content='{self.table}', content_rowid='{self.content_rowid}', "
+                f"tokenize='{self.tokenize}')"
+            ),
+            f"{self.name}_ai": (
+                f"CREATE TRIGGER {self.name}_ai AFTER INSERT ON {self.table} BEGIN "
+                f"{insert_new} END"
+            ),
+            f"{self.name}_ad": (
+                f"CREATE TRIGGER {self.name}_ad AFTER DELETE ON {self.table} BEGIN "
+                f"{delete_old} END"
+            ),
+            f"{self.name}_au": (
+                f"CREATE TRIGGER {self.name}_au AFTER UPDATE OF {columns} ON {self.table} "
+                f"BEGIN {delete_old} {insert_new} END"
+            ),
+        }
+
+
+def register_fts(metadata: MetaData, index: FTSIndex) -> FTSIndex:
+    """
+    Đăng ký FTS index vào schema. Index được tạo khi bootstrap database
+    và được tính vào schema version (`compute_schema_version`).
+    """
+    metadata.info.setdefault(FTS_INFO_KEY, []).append(index)
+    return index
+
+
+def get_fts_indexes(metadata: MetaData) -> list[FTSIndex]:
+    """Các FTS index đã đăng ký cho schema."""
+    return list(metadata.info.get(FTS_INFO_KEY, ()))
+
+
+async def ensure_fts_indexes(conn: AsyncConnection, metadata: MetaData) -> list[str]:
+    """
+    Tạo (hoặc tạo lại khi định nghĩa thay đổi) các FTS index của schema.
+    Index mới được backfill từ dữ liệu có sẵn trong bảng gốc bằng `rebuild`.
+    Index có bảng gốc chưa tồn tại được bỏ qua.
+
+    Args:
+        conn: Connection tới SQLite database (trong transaction)
+        metadata: MetaData đã đăng ký FTS index
+
+    Returns:
+        Tên các FTS index đã được rebuild
+    """
+    result = await conn.exec_driver_sql(
+        "SELECT name, sql FROM sqlite_master WHERE type IN ('table', 'trigger')"
+    )
+    existing = {name: sql for name, sql in result.all()}
+
+    rebuilt = []
+    for index in get_fts_indexes(metadata):
+        if index.table not in existing:
+            continue
+        statements = index.ddl()
+        changed = [name for name, sql in statements.items() if existing.get(name) != sql]
+        if not changed:
+            continue
+
+        # Định nghĩa khác (hoặc thiếu): tạo lại toàn bộ index cho đơn giản
+        for name in statements:
+            if name == index.name:
+                continue
+            await conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+        await conn.exec_driver_sql(f"DROP TABLE IF EXISTS {index.name}")
+        for sql in statements.values():
+            await conn.exec_driver_sql(sql)
+        await rebuild_fts_index(conn, index)
+        rebuilt.append(index.name)
+    return rebuilt
+
+
+async def rebuild_fts_index(conn: AsyncConnection, index: FTSIndex) -> None:
+    """Dựng lại FTS index từ toàn bộ nội dung bảng gốc."""
+    await conn.exec_driver_sql(
+        f"INSERT INTO {index.name}({index.name}) VALUES ('rebuild')"
+    )
+
+
+def build_match_query(text: str) -> str | None:
+    """
+    Chuyển chuỗi tìm kiếm của người dùng thành FTS5 MATCH expression an toàn.
+    Mỗi từ được đặt trong dấu nháy (không diễn giải cú pháp FTS5), các từ được
+    AND với nhau; từ kết thúc bằng `*` là tìm theo tiền tố.
+
+    Returns:
+        MATCH expression, hoặc None nếu chuỗi không có từ nào
+    """
+    terms = []
+    for token in _TOKEN_RE.findall(text):
+        if token.endswith("*"):
+            terms.append(f'"{token[:-1]}"*')
+        else:
+            terms.append(f'"{token}"')
+    return " ".join(terms) or None
@@ -0,0 +1,63 @@
+"""
+Backfill FTS index cho các tenant database đã có trên đĩa.
+
+Sử dụng:
+    python -m app.db.fts_backfill                  # mọi tenant trong TENANT_DATABASE_DIR
+    python -m app.db.fts_backfill tenant_001 --rebuild
+"""
+
+import argparse
+import asyncio
+import json
+
+# Import models để đăng ký tables và FTS index vào TenantBase.metadata
+import app.models.tenant  # noqa: F401
+from app.core.config import settings
+from app.db.base import TenantBase
+from app.db.database_manager import db_manager
+from app.db.fts import ensure_fts_indexes, get_fts_indexes, rebuild_fts_index
+
+
+async def backfill_tenants(tenant_ids: list[str] | None = None, rebuild: bool = False) -> dict:
+    """
+    Đảm bảo FTS index cho các tenant database đã có trên đĩa.
+
+    Args:
+        tenant_ids: Danh sách tenant, None để xử lý mọi tenant file trong TENANT_DATABASE_DIR
+        rebuild: True để rebuild index kể cả khi đã đồng bộ
+
+    Returns:
+        Dictionary {tenant_id: danh sách index đã rebuild}
+    """
+    report = {}
+    try:
+        for tenant_id in tenant_ids or settings.list_tenant_ids():
+            async with db_manager.get_tenant_engine(tenant_id).begin() as conn:
+                rebuilt = await ensure_fts_indexes(conn, TenantBase.metadata)
+                if rebuild:
+                    for index in get_fts_indexes(TenantBase.metadata):
+                        if index.name not in rebuilt:
+                            await rebuild_fts_index(conn, index)
+                            rebuilt.append(index.name)
+            # Tạo các bảng còn thiếu và đóng dấu schema version
+            await db_manager.ensure_tenant_tables(tenant_id)
+            report[tenant_id] = rebuilt
+    finally:
+        await db_manager.dispose_all()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Backfill FTS index cho các tenant database đã có"
+    )
+    parser.add_argument("tenant_ids", nargs="*", help="Tenant IDs (mặc định: tất cả)")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild cả index đã đồng bộ")
+    args = parser.parse_args()
+
+    report = asyncio.run(backfill_tenants(args.tenant_ids or None, rebuild=args.rebuild))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import time
+from typing import Iterable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.metrics import current_request_metrics, query_logger
+from app.db.tenant_cache import TenantCacheStats
+
+# Key trong Connection.info chứa thời điểm bắt đầu các câu lệnh đang chạy
+_START_KEY = "query_start_time"
+
+# Các loại câu lệnh có query plan (DDL/PRAGMA không EXPLAIN được)
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+def instrument_engine(engine: AsyncEngine, database: str, tenant_id: str | None = None) -> None:
+    """
+    Gắn SQLAlchemy cursor hooks để cộng dồn thời gian và số câu lệnh SQL vào
+    RequestMetrics của request hiện tại (bỏ qua khi ngoài request).
+    Khi bật QUERY_PROFILING: log câu lệnh chậm (kèm query plan) và đếm số lần
+    chạy từng câu lệnh để phát hiện N+1.
+
+    Args:
+        engine: AsyncEngine cần đo
+        database: Loại database dùng làm nhãn ("shared", "tenant", ...)
+        tenant_id: ID của tenant nếu là tenant engine
+    """
+    profiling = settings.query_profiling
+    slow_threshold = settings.slow_query_threshold_ms / 1000
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if profiling or current_request_metrics.get() is not None:
+            conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get(_START_KEY)
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+
+        metrics = current_request_metrics.get()
+        if metrics is not None:
+            metrics.add_query(database, elapsed)
+            if tenant_id is not None and metrics.tenant_id is None:
+                metrics.tenant_id = tenant_id
+            if profiling:
+                metrics.count_statement(statement)
+
+        if profiling and elapsed >= slow_threshold:
+            _log_slow_query(conn, statement, parameters, executemany, elapsed, metrics)
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def _handle_error(exception_context):
+        # Câu lệnh lỗi không tới after_cursor_execute: bỏ thời điểm bắt đầu của nó
+        conn = exception_context.connection
+        if conn is not None:
+            starts = conn.info.get(_START_KEY)
+            if starts:
+                starts.pop()
+
+    def _log_slow_query(conn, statement, parameters, executemany, elapsed, metrics):
+        plan = None
+        if (
+            conn.dialect.name == "sqlite"
+            and not executemany
+            and statement.lstrip().upper().startswith(_EXPLAINABLE)
+        ):
+            plan = _sqlite_query_plan(conn, statement, parameters)
+        query_logger.warning(
+            "Slow query %.1f ms (database=%s, tenant_id=%s, route=%s): %s | params=%r%s",
+            elapsed * 1000,
+            database,
+            tenant_id or (metrics.tenant_id if metrics is not None else None),
+            metrics.route if metrics is not None else "-",
+            statement,
+            parameters,
+            f"\n{plan}" if plan else "",
+        )
+
+
+def _sqlite_query_plan(conn, statement: str, parameters) -> str | None:
+    """
+    Lấy `EXPLAIN QUERY PLAN` của câu lệnh bằng DBAPI cursor riêng
+    (không đi qua SQLAlchemy events, nên không đệ quy vào hooks).
+    """
+    try:
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ())
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+    except Exception as exc:
+        return f"(không lấy được query plan: {exc})"
+    # Mỗi dòng: (id, parent, notused, detail)
+    return "\n".join(f"  {row[3]}" for row in rows)
+
+
+def engine_cache_metrics(stats: TenantCacheStats) -> Iterable[str]:
+    """Thống kê tenant engine cache dưới dạng Prometheus text format."""
+    yield "# HELP tenant_engine_cache_size Số tenant engines đang được cache."
+    yield "# TYPE tenant_engine_cache_size gauge"
+    yield f"tenant_engine_cache_size {stats.size}"
+    for name, value, documentation in (
+        ("hits", stats.hits, "Số lần tìm thấy tenant engine trong cache."),
+        ("misses", stats.misses, "Số lần phải tạo tenant engine mới."),
+        ("evictions", stats.evictions, "Số tenant engines bị evict khỏi cache."),
+    ):
+        yield f"# HELP tenant_engine_cache_{name}_total {documentation}"
+        yield f"# TYPE tenant_engine_cache_{name}_total counter"
+        yield f"tenant_engine_cache_{name}_total {value}"
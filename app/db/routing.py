@@ -0,0 +1,63 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class SharedRoutingState:
+    """
+    Trạng thái routing của shared database trong phạm vi một request.
+
+    Sau khi session ghi (primary) commit thay đổi, `wrote` được bật và các
+    session đọc của cùng request chuyển sang primary (read-your-writes), vì
+    replica có thể chưa kịp nhận dữ liệu vừa ghi.
+    """
+
+    def __init__(self):
+        self.wrote = False
+        self.read_sessions: list[Session] = []
+
+    def track_writes(self, session: Session) -> None:
+        """Theo dõi session ghi để bật stickiness khi nó commit thay đổi."""
+        event.listen(session, "after_flush", _mark_pending_write)
+        event.listen(session, "do_orm_execute", _mark_pending_dml)
+        event.listen(session, "after_commit", self._after_commit)
+
+    def _after_commit(self, session: Session) -> None:
+        if not session.info.pop("pending_write", False):
+            return
+        self.wrote = True
+        # Kết thúc transaction đang mở trên replica để lần đọc sau chọn lại bind.
+        # after_commit chạy trong greenlet của AsyncSession nên close() an toàn.
+        for read_session in self.read_sessions:
+            read_session.close()
+
+
+def _mark_pending_write(session: Session, flush_context) -> None:
+    session.info["pending_write"] = True
+
+
+def _mark_pending_dml(orm_execute_state) -> None:
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        orm_execute_state.session.info["pending_write"] = True
+
+
+class SharedReadSession(Session):
+    """
+    Session chỉ đọc cho shared database.
+    Chọn replica (theo chiến lược trong Settings) cho mỗi session; chuyển sang
+    primary khi request đã ghi vào shared database.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        manager = self.info["manager"]
+        routing: SharedRoutingState | None = self.info.get("routing")
+        if routing is not None and routing.wrote:
+            return manager.get_shared_engine().sync_engine
+
+        engine = self.info.get("replica")
+        if engine is None:
+            engine = self.info["replica"] = manager.get_shared_read_engine()
+        return engine.sync_engine
@@ -0,0 +1,88 @@
+import hashlib
+
+from sqlalchemy import MetaData
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.db.fts import get_fts_indexes
+from app.db.table_versions import table_versions_ddl
+
+_SQLITE_DIALECT = sqlite.dialect()
+
+
+def compute_schema_version(metadata: MetaData) -> int:
+    """
+    Tính schema version ổn định từ MetaData (tables, columns, indexes, FTS indexes,
+    triggers tăng version của tables).
+    Kết quả là số nguyên dương 31-bit, vừa với SQLite `PRAGMA user_version`.
+
+    Args:
+        metadata: MetaData cần tính version (ví dụ TenantBase.metadata)
+
+    Returns:
+        Schema version (luôn > 0)
+    """
+    digest = hashlib.sha256()
+    for table in sorted(metadata.tables.values(), key=lambda t: t.name):
+        digest.update(f"table:{table.name}\n".encode())
+        for column in table.columns:
+            column_type = column.type.compile(dialect=_SQLITE_DIALECT)
+            digest.update(
+                f"column:{column.name}:{column_type}:{column.nullable}:"
+                f"{column.primary_key}:{column.unique}\n".encode()
+            )
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            columns = ",".join(column.name for column in index.columns)
+            digest.update(f"index:{index.name}:{columns}:{index.unique}\n".encode())
+
+    for index in get_fts_indexes(metadata):
+        for name, sql in sorted(index.ddl().items()):
+            digest.update(f"fts:{name}:{sql}\n".encode())
+
+    for name, sql in sorted(table_versions_ddl(metadata).items()):
+        digest.update(f"versions:{name}:{sql}\n".encode())
+
+    version = int.from_bytes(digest.digest()[:4], "big") & 0x7FFFFFFF
+    return version or 1
+
+
+async def add_missing_columns(conn: AsyncConnection, metadata: MetaData) -> list[str]:
+    """
+    Thêm các cột mới của model vào bảng đã tồn tại (SQLite `ALTER TABLE ADD COLUMN`).
+    `create_all` chỉ tạo bảng còn thiếu, không sửa bảng cũ; chỉ hỗ trợ cột
+    nullable, không phải primary key (đủ cho việc bổ sung cột tuỳ chọn).
+
+    Args:
+        conn: Connection tới SQLite database (trong transaction)
+        metadata: MetaData của schema
+
+    Returns:
+        Danh sách cột đã thêm dạng `table.column`
+    """
+    added = []
+    for table in metadata.sorted_tables:
+        result = await conn.exec_driver_sql(f'PRAGMA table_info("{table.name}")')
+        existing = {row[1] for row in result.all()}
+        if not existing:
+            # Bảng chưa tồn tại: create_all sẽ tạo đầy đủ
+            continue
+        for column in table.columns:
+            if column.name in existing or column.primary_key or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=_SQLITE_DIALECT)
+            await conn.exec_driver_sql(
+                f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'
+            )
+            added.append(f"{table.name}.{column.name}")
+    return added
+
+
+async def get_user_version(conn: AsyncConnection) -> int:
+    """Đọc `PRAGMA user_version` của SQLite database."""
+    result = await conn.exec_driver_sql("PRAGMA user_version")
+    return int(result.scalar() or 0)
+
+
+async def set_user_version(conn: AsyncConnection, version: int) -> None:
+    """Ghi `PRAGMA user_version` (PRAGMA không hỗ trợ bind parameter)."""
+    await conn.exec_driver_sql(f"PRAGMA user_version = {int(version)}")
@@ -1,14 +1,16 @@
 from typing import Annotated
 
-from fastapi import Depends, Header, Path, Query
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from fastapi import Depends, Header, Path, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.database_manager import db_manager
+from app.db.routing import SharedRoutingState
 
 
 def get_session_factory(db_name: str | None = None):
     """
     Lấy session factory cho database cụ thể.
+    Factory được cache trong db_manager, không tạo mới cho mỗi request.
 
     Args:
         db_name: Tên database. Nếu None, sử dụng default database.
@@ -16,24 +18,11 @@ def get_session_factory(db_name: str | None = None):
     Returns:
         async_sessionmaker instance
     """
-    engine = db_manager.get_engine(db_name)
-    return async_sessionmaker(
-        engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-        autocommit=False,
-        autoflush=False,
-    )
+    return db_manager.get_session_factory(db_name)
 
 
 # Shared database session factory
-shared_session_factory = async_sessionmaker(
-    db_manager.get_shared_engine(),
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False,
-)
+shared_session_factory = db_manager.get_session_factory("shared")
 
 # Default session factory (sử dụng shared database)
 default_async_session = shared_session_factory
@@ -177,9 +166,21 @@ def get_db_dependency(db_name: str):
 # ==================== Shared Database Dependencies ====================
 
 
-async def get_shared_db() -> AsyncSession:
+def get_shared_routing_state() -> SharedRoutingState:
+    """
+    Dependency tạo trạng thái routing shared database cho request.
+    FastAPI cache dependency trong một request nên get_shared_db và
+    get_shared_read_db dùng chung một state (read-your-writes).
+    """
+    return SharedRoutingState()
+
+
+async def get_shared_db(
+    routing: Annotated[SharedRoutingState, Depends(get_shared_routing_state)] = None,
+) -> AsyncSession:
     """
     Dependency function để lấy session từ shared database (database chung).
+    Session luôn dùng primary; dùng cho các route ghi hoặc cần đọc nhất quán.
 
     Sử dụng trong FastAPI routes như:
 
@@ -193,6 +194,8 @@ async def get_shared_db() -> AsyncSession:
         return result.scalars().all()
     """
     async with shared_session_factory() as session:
+        if routing is not None:
+            routing.track_writes(session.sync_session)
         try:
             yield session
             await session.commit()
@@ -203,12 +206,43 @@ async def get_shared_db() -> AsyncSession:
             await session.close()
 
 
+async def get_shared_read_db(
+    routing: Annotated[SharedRoutingState, Depends(get_shared_routing_state)] = None,
+) -> AsyncSession:
+    """
+    Dependency function để lấy session chỉ đọc từ shared database.
+    Đọc từ read replica (SHARED_DATABASE_REPLICA_URLS) nếu có cấu hình; sau
+    khi request đã ghi qua get_shared_db, các lần đọc tiếp theo dùng primary.
+
+    Sử dụng trong FastAPI routes như:
+
+    from fastapi import Depends
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from app.db.session import get_shared_read_db
+
+    @app.get("/users")
+    async def get_users(db: AsyncSession = Depends(get_shared_read_db)):
+        result = await db.execute(select(User))
+        return result.scalars().all()
+    """
+    session_factory = db_manager.get_shared_read_session_factory()
+    async with session_factory() as session:
+        if routing is not None:
+            session.info["routing"] = routing
+            routing.read_sessions.append(session.sync_session)
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
 # ==================== Tenant Database Dependencies ====================
 
 
 def get_tenant_session_factory(tenant_id: str):
     """
     Lấy session factory cho tenant database cụ thể.
+    Factory được cache cùng tenant engine, không tạo mới cho mỗi request.
 
     Args:
         tenant_id: ID của tenant/cá thể
@@ -216,14 +250,28 @@ def get_tenant_session_factory(tenant_id: str):
     Returns:
         async_sessionmaker instance
     """
-    engine = db_manager.get_tenant_engine(tenant_id)
-    return async_sessionmaker(
-        engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-        autocommit=False,
-        autoflush=False,
-    )
+    return db_manager.get_tenant_session_factory(tenant_id)
+
+
+# Các HTTP method chỉ đọc: session lấy từ reader pool của tenant
+READ_ONLY_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def get_tenant_session_factory_for_request(tenant_id: str, request: Request):
+    """
+    Chọn session factory theo HTTP method của request:
+    GET/HEAD/OPTIONS dùng reader pool, các method khác dùng writer.
+
+    Args:
+        tenant_id: ID của tenant/cá thể
+        request: Request hiện tại
+
+    Returns:
+        async_sessionmaker instance
+    """
+    if request.method in READ_ONLY_METHODS:
+        return db_manager.get_tenant_reader_session_factory(tenant_id)
+    return db_manager.get_tenant_session_factory(tenant_id)
 
 
 async def get_tenant_db(tenant_id: str) -> AsyncSession:
@@ -262,9 +310,11 @@ async def get_tenant_db(tenant_id: str) -> AsyncSession:
 
 async def get_tenant_db_from_path(
     tenant_id: Annotated[str, Path(description="ID của tenant/cá thể")],
+    request: Request,
 ) -> AsyncSession:
     """
     Dependency function để lấy tenant database session từ path parameter.
+    GET/HEAD/OPTIONS dùng reader pool chỉ đọc, các method khác dùng writer.
 
     Sử dụng trong FastAPI routes như:
 
@@ -280,7 +330,7 @@ async def get_tenant_db_from_path(
     # Đảm bảo tables đã được tạo cho tenant database
     await db_manager.ensure_tenant_tables(tenant_id)
     
-    session_factory = get_tenant_session_factory(tenant_id)
+    session_factory = get_tenant_session_factory_for_request(tenant_id, request)
     async with session_factory() as session:
         try:
             yield session
@@ -294,9 +344,11 @@ async def get_tenant_db_from_path(
 
 async def get_tenant_db_from_query(
     tenant_id: Annotated[str, Query(description="ID của tenant/cá thể")],
+    request: Request,
 ) -> AsyncSession:
     """
     Dependency function để lấy tenant database session từ query parameter.
+    GET/HEAD/OPTIONS dùng reader pool chỉ đọc, các method khác dùng writer.
 
     Sử dụng trong FastAPI routes như:
 
@@ -312,7 +364,7 @@ async def get_tenant_db_from_query(
     # Đảm bảo tables đã được tạo cho tenant database
     await db_manager.ensure_tenant_tables(tenant_id)
     
-    session_factory = get_tenant_session_factory(tenant_id)
+    session_factory = get_tenant_session_factory_for_request(tenant_id, request)
     async with session_factory() as session:
         try:
             yield session
@@ -326,9 +378,11 @@ async def get_tenant_db_from_query(
 
 async def get_tenant_db_from_header(
     x_tenant_id: Annotated[str, Header(description="ID của tenant/cá thể")],
+    request: Request,
 ) -> AsyncSession:
     """
     Dependency function để lấy tenant database session từ HTTP header 'X-Tenant-ID'.
+    GET/HEAD/OPTIONS dùng reader pool chỉ đọc, các method khác dùng writer.
 
     Sử dụng trong FastAPI routes như:
 
@@ -346,7 +400,7 @@ async def get_tenant_db_from_header(
     # Đảm bảo tables đã được tạo cho tenant database
     await db_manager.ensure_tenant_tables(x_tenant_id)
     
-    session_factory = get_tenant_session_factory(x_tenant_id)
+    session_factory = get_tenant_session_factory_for_request(x_tenant_id, request)
     async with session_factory() as session:
         try:
             yield session
@@ -0,0 +1,73 @@
+import re
+from typing import Mapping
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Các pragma được phép cấu hình qua Settings
+ALLOWED_PRAGMAS = frozenset(
+    {
+        "journal_mode",
+        "synchronous",
+        "mmap_size",
+        "cache_size",
+        "busy_timeout",
+        "temp_store",
+        "foreign_keys",
+        "wal_autocheckpoint",
+        "journal_size_limit",
+        "query_only",
+    }
+)
+
+_PRAGMA_VALUE = re.compile(r"^-?[A-Za-z0-9_]+$")
+
+
+def build_pragma_statements(pragmas: Mapping[str, str | int]) -> list[str]:
+    """
+    Tạo danh sách câu lệnh PRAGMA từ profile.
+
+    Args:
+        pragmas: Dictionary {tên pragma: giá trị}
+
+    Returns:
+        Danh sách câu lệnh SQL, ví dụ ["PRAGMA journal_mode=WAL", ...]
+
+    Raises:
+        ValueError: Nếu tên pragma không được hỗ trợ hoặc giá trị không hợp lệ
+    """
+    statements = []
+    for name, value in pragmas.items():
+        if name not in ALLOWED_PRAGMAS:
+            raise ValueError(
+                f"SQLite pragma '{name}' không được hỗ trợ. "
+                f"Các pragma hợp lệ: {sorted(ALLOWED_PRAGMAS)}"
+            )
+        if not _PRAGMA_VALUE.match(str(value)):
+            raise ValueError(f"Giá trị không hợp lệ cho pragma '{name}': {value!r}")
+        statements.append(f"PRAGMA {name}={value}")
+    return statements
+
+
+def apply_sqlite_pragmas(engine: AsyncEngine, pragmas: Mapping[str, str | int]) -> None:
+    """
+    Đăng ký connect event để áp dụng pragma profile cho mọi connection mới.
+    Bỏ qua nếu engine không phải SQLite hoặc profile rỗng.
+
+    Args:
+        engine: AsyncEngine cần cấu hình
+        pragmas: Dictionary {tên pragma: giá trị}
+    """
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    statements = build_pragma_statements(pragmas)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
@@ -0,0 +1,95 @@
+from typing import Iterable
+
+from sqlalchemy import MetaData, bindparam, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+# Bảng lưu version thay đổi của từng tenant table (trong chính tenant database)
+TABLE_VERSIONS_TABLE = "_table_versions"
+
+_SELECT_VERSIONS = text(
+    f"SELECT name, version FROM {TABLE_VERSIONS_TABLE} WHERE name IN :names"
+).bindparams(bindparam("names", expanding=True))
+
+
+def table_versions_ddl(metadata: MetaData) -> dict[str, str]:
+    """
+    Các câu lệnh CREATE của bảng version và triggers, theo tên object trong
+    `sqlite_master`. Không dùng IF NOT EXISTS để so khớp được với `sqlite_master.sql`.
+
+    Mỗi bảng của schema có triggers AFTER INSERT/UPDATE/DELETE tăng version
+    trong cùng transaction với lệnh ghi, nên mọi thay đổi đều đổi version:
+    qua app (session, write queue) của bất kỳ worker nào, CLI hay sqlite client.
+    """
+    statements = {
+        TABLE_VERSIONS_TABLE: (
+            f"CREATE TABLE {TABLE_VERSIONS_TABLE} "
+            "(name TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0) WITHOUT ROWID"
+        ),
+    }
+    for table in sorted(metadata.tables):
+        bump = (
+            f"UPDATE {TABLE_VERSIONS_TABLE} SET version = version + 1 "
+            f"WHERE name = '{table}';"
+        )
+        for suffix, event in (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE")):
+            name = f"{table}_version_{suffix}"
+            statements[name] = (
+                f"CREATE TRIGGER {name} AFTER {event} ON {table} BEGIN {bump} END"
+            )
+    return statements
+
+
+async def ensure_table_versions(conn: AsyncConnection, metadata: MetaData) -> list[str]:
+    """
+    Tạo (hoặc tạo lại khi định nghĩa thay đổi) bảng version và triggers của
+    các bảng đã tồn tại trong database.
+
+    Args:
+        conn: Connection tới SQLite database (trong transaction)
+        metadata: MetaData của schema
+
+    Returns:
+        Tên các triggers đã được tạo
+    """
+    result = await conn.exec_driver_sql(
+        "SELECT name, sql FROM sqlite_master WHERE type IN ('table', 'trigger')"
+    )
+    existing = {name: sql for name, sql in result.all()}
+
+    statements = table_versions_ddl(metadata)
+    if existing.get(TABLE_VERSIONS_TABLE) != statements[TABLE_VERSIONS_TABLE]:
+        await conn.exec_driver_sql(f"DROP TABLE IF EXISTS {TABLE_VERSIONS_TABLE}")
+        await conn.exec_driver_sql(statements[TABLE_VERSIONS_TABLE])
+
+    created = []
+    for table in sorted(metadata.tables):
+        if table not in existing:
+            continue
+        for suffix in ("ai", "au", "ad"):
+            name = f"{table}_version_{suffix}"
+            if existing.get(name) == statements[name]:
+                continue
+            await conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+            await conn.exec_driver_sql(statements[name])
+            created.append(name)
+        await conn.exec_driver_sql(
+            f"INSERT OR IGNORE INTO {TABLE_VERSIONS_TABLE} (name) VALUES (?)", (table,)
+        )
+    return created
+
+
+async def read_table_versions(conn: AsyncConnection, tables: Iterable[str]) -> dict[str, int]:
+    """
+    Version hiện tại của các tables (0 nếu bảng chưa từng được ghi).
+
+    Args:
+        conn: Connection tới tenant database (đọc được qua reader pool)
+        tables: Tên các tables cần lấy version
+
+    Returns:
+        {table: version}
+    """
+    tables = list(tables)
+    result = await conn.execute(_SELECT_VERSIONS, {"names": tables})
+    versions = dict(result.all())
+    return {table: versions.get(table, 0) for table in tables}
@@ -0,0 +1,232 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+
+class TenantEngineClosedError(RuntimeError):
+    """Engine của tenant đã bị evict và dispose, không mở connection mới được nữa."""
+
+
+@dataclass
+class TenantEngineEntry:
+    """
+    Một phần tử trong cache engine của tenant.
+    Giữ writer/reader engines, session factories và URL đã resolve cùng thời
+    điểm sử dụng gần nhất để phục vụ idle eviction. Request path chỉ cần tra
+    cache, không phải tạo object hay gọi filesystem.
+
+    Khi không tách reader/writer, `reader_engine` là chính `engine`.
+
+    `AsyncEngine.dispose()` tạo pool mới, nên engine hay session factory còn bị
+    giữ sau khi entry bị evict vẫn mở được connection mà không ai dispose nữa.
+    Entry đã đóng (`closed`) từ chối mở DBAPI connection mới bằng
+    `TenantEngineClosedError`: caller phải lấy lại engine/session factory từ
+    DatabaseManager.
+    """
+
+    tenant_id: str
+    engine: AsyncEngine
+    session_factory: async_sessionmaker
+    reader_engine: AsyncEngine
+    reader_session_factory: async_sessionmaker
+    url: str = ""
+    last_used: float = 0.0
+    closed: bool = False
+
+    def __post_init__(self) -> None:
+        for engine in self._engines():
+            event.listen(engine.sync_engine, "do_connect", self._refuse_if_closed)
+
+    def _refuse_if_closed(self, dialect, conn_rec, cargs, cparams) -> None:
+        # Chạy trước khi mở DBAPI connection nên không có connection nào bị rò rỉ
+        if self.closed:
+            raise TenantEngineClosedError(
+                f"Engine của tenant '{self.tenant_id}' đã bị dispose; "
+                "lấy lại engine/session factory từ DatabaseManager"
+            )
+
+    def _engines(self) -> list[AsyncEngine]:
+        if self.reader_engine is self.engine:
+            return [self.engine]
+        return [self.engine, self.reader_engine]
+
+    def checked_out(self) -> int:
+        """Số connection đang được checkout khỏi pool của các engines."""
+        total = 0
+        for engine in self._engines():
+            checkedout = getattr(engine.pool, "checkedout", None)
+            total += checkedout() if checkedout is not None else 0
+        return total
+
+    def is_busy(self) -> bool:
+        """Engine đang có connection được sử dụng thì không được evict."""
+        return self.checked_out() > 0
+
+    async def dispose(self) -> None:
+        """Đánh dấu entry đã đóng và đóng toàn bộ connection của các engines."""
+        self.closed = True
+        for engine in self._engines():
+            await engine.dispose()
+
+
+@dataclass
+class TenantCacheStats:
+    """Thống kê hoạt động của tenant engine cache."""
+
+    size: int = 0
+    max_size: int = 0
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    idle_evictions: int = 0
+    overflow: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "size": self.size,
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "idle_evictions": self.idle_evictions,
+            "overflow": self.overflow,
+        }
+
+
+class TenantEngineCache:
+    """
+    LRU cache có giới hạn cho tenant engines, kèm idle TTL.
+
+    - Tối đa `max_size` engines; khi vượt quá, engine ít được dùng nhất bị evict.
+    - Engine không được dùng quá `idle_ttl` giây cũng bị evict.
+    - Engine đang có connection checkout không bao giờ bị evict; nếu mọi engine
+      đều bận, cache tạm thời vượt giới hạn (được đếm trong `overflow`).
+
+    Cache không tự dispose engine: các phần tử bị evict được trả về cho caller
+    (DatabaseManager) để dispose bất đồng bộ.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        idle_ttl: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max(1, max_size)
+        self.idle_ttl = idle_ttl if idle_ttl and idle_ttl > 0 else None
+        self._clock = clock
+        self._entries: "OrderedDict[str, TenantEngineEntry]" = OrderedDict()
+        self._stats = TenantCacheStats(max_size=self.max_size)
+
+    def get(self, tenant_id: str) -> TenantEngineEntry | None:
+        """
+        Lấy entry của tenant, cập nhật thứ tự LRU và thời điểm sử dụng.
+
+        Returns:
+            TenantEngineEntry hoặc None nếu chưa có trong cache
+        """
+        entry = self._entries.get(tenant_id)
+        if entry is None:
+            self._stats.misses += 1
+            return None
+
+        self._stats.hits += 1
+        entry.last_used = self._clock()
+        self._entries.move_to_end(tenant_id)
+        return entry
+
+    def peek(self, tenant_id: str) -> TenantEngineEntry | None:
+        """Lấy entry của tenant mà không cập nhật thứ tự LRU hay thống kê."""
+        return self._entries.get(tenant_id)
+
+    def put(self, entry: TenantEngineEntry) -> list[TenantEngineEntry]:
+        """
+        Thêm entry mới vào cache.
+
+        Returns:
+            Danh sách entries bị evict (caller chịu trách nhiệm dispose)
+        """
+        entry.last_used = self._clock()
+        self._entries[entry.tenant_id] = entry
+        self._entries.move_to_end(entry.tenant_id)
+        return self._evict_overflow()
+
+    def pop(self, tenant_id: str) -> TenantEngineEntry | None:
+        """Xóa entry khỏi cache (không tính là eviction)."""
+        return self._entries.pop(tenant_id, None)
+
+    def evict_idle(self) -> list[TenantEngineEntry]:
+        """
+        Evict các entries không được dùng quá idle TTL.
+        Duyệt từ entry cũ nhất và dừng ở entry đầu tiên còn hạn nên chi phí
+        tỉ lệ với số entries bị evict.
+        """
+        if self.idle_ttl is None:
+            return []
+
+        deadline = self._clock() - self.idle_ttl
+        evicted: list[TenantEngineEntry] = []
+        for tenant_id in list(self._entries):
+            entry = self._entries[tenant_id]
+            if entry.last_used > deadline:
+                break
+            if entry.is_busy():
+                continue
+            del self._entries[tenant_id]
+            evicted.append(entry)
+
+        self._stats.evictions += len(evicted)
+        self._stats.idle_evictions += len(evicted)
+        return evicted
+
+    def _evict_overflow(self) -> list[TenantEngineEntry]:
+        evicted: list[TenantEngineEntry] = []
+        excess = len(self._entries) - self.max_size
+        if excess <= 0:
+            return evicted
+
+        # Không evict entry vừa thêm (nằm cuối OrderedDict)
+        for tenant_id in list(self._entries)[:-1]:
+            if excess <= 0:
+                break
+            entry = self._entries[tenant_id]
+            if entry.is_busy():
+                continue
+            del self._entries[tenant_id]
+            evicted.append(entry)
+            excess -= 1
+
+        if excess > 0:
+            self._stats.overflow += 1
+        self._stats.evictions += len(evicted)
+        return evicted
+
+    def stats(self) -> TenantCacheStats:
+        """Trả về snapshot thống kê hiện tại của cache."""
+        self._stats.size = len(self._entries)
+        return TenantCacheStats(**self._stats.as_dict())
+
+    def keys(self) -> list[str]:
+        return list(self._entries.keys())
+
+    def values(self) -> list[TenantEngineEntry]:
+        return list(self._entries.values())
+
+    def clear(self) -> list[TenantEngineEntry]:
+        """Xóa toàn bộ cache, trả về các entries để caller dispose."""
+        entries = list(self._entries.values())
+        self._entries.clear()
+        return entries
+
+    def __contains__(self, tenant_id: object) -> bool:
+        return tenant_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._entries))
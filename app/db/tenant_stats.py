@@ -0,0 +1,291 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable
+
+from sqlalchemy import column, event, func, insert, select, table, update
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from sqlalchemy.orm import Session
+
+from app.core.metrics import current_request_metrics
+from app.models.shared import Tenant, TenantStats
+
+# Bảng tenant được thống kê -> prefix cột trong TenantStats
+TRACKED_TABLES = {"profiles": "profile", "documents": "document"}
+
+# Key trong Session.info chứa thay đổi chưa commit của session
+_DELTA_KEY = "tenant_stats_delta"
+
+
+@dataclass
+class StatsDelta:
+    """Thay đổi thống kê của một bảng tenant (chưa được ghi vào shared database)."""
+    count: int = 0
+    modified_at: datetime | None = None
+
+    def add(self, count: int, modified_at: datetime) -> None:
+        self.count += count
+        if self.modified_at is None or modified_at > self.modified_at:
+            self.modified_at = modified_at
+
+
+class TenantSession(Session):
+    """
+    Session của tenant database (`info["tenant_id"]`).
+    Ghi nhận INSERT/UPDATE/DELETE trên các bảng được thống kê và chuyển cho
+    TenantStatsRecorder sau khi transaction commit thành công.
+    """
+
+
+def _session_delta(session: Session, table: str) -> StatsDelta:
+    deltas = session.info.setdefault(_DELTA_KEY, {})
+    delta = deltas.get(table)
+    if delta is None:
+        delta = deltas[table] = StatsDelta()
+    return delta
+
+
+def _table_name(obj: Any) -> str | None:
+    table = getattr(obj, "__tablename__", None)
+    return table if table in TRACKED_TABLES else None
+
+
+@event.listens_for(TenantSession, "after_flush")
+def _track_flush(session: Session, flush_context) -> None:
+    now = datetime.utcnow()
+    for objects, sign in ((session.new, 1), (session.deleted, -1), (session.dirty, 0)):
+        for obj in objects:
+            table = _table_name(obj)
+            if table is not None:
+                _session_delta(session, table).add(sign, now)
+
+
+@event.listens_for(TenantSession, "do_orm_execute")
+def _track_execute(orm_execute_state):
+    if not (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        return None
+
+    table = getattr(orm_execute_state.statement, "table", None)
+    if table is None or table.name not in TRACKED_TABLES:
+        return None
+
+    session = orm_execute_state.session
+    now = datetime.utcnow()
+    if orm_execute_state.is_insert:
+        # executemany: mỗi bộ tham số là một dòng
+        params = orm_execute_state.parameters
+        count = len(params) if isinstance(params, list) else 1
+        _session_delta(session, table.name).add(count, now)
+        return None
+
+    result = orm_execute_state.invoke_statement()
+    count = result.rowcount if orm_execute_state.is_delete and result.rowcount > 0 else 0
+    _session_delta(session, table.name).add(-count, now)
+    return result
+
+
+@event.listens_for(TenantSession, "after_commit")
+def _commit_delta(session: Session) -> None:
+    deltas = session.info.pop(_DELTA_KEY, None)
+    recorder = session.info.get("tenant_stats")
+    if deltas and recorder is not None:
+        for table, delta in deltas.items():
+            recorder.record(session.info["tenant_id"], table, delta.count, delta.modified_at)
+
+
+@event.listens_for(TenantSession, "after_soft_rollback")
+def _discard_delta(session: Session, previous_transaction) -> None:
+    session.info.pop(_DELTA_KEY, None)
+
+
+class TenantStatsRecorder:
+    """
+    Gom thay đổi thống kê (số profiles/documents, thời điểm sửa cuối) của các
+    tenant trong bộ nhớ và ghi vào bảng `tenant_stats` của shared database theo
+    chu kỳ `flush_interval`, mỗi tenant một câu UPDATE cộng dồn.
+
+    Nhiều worker cùng ghi an toàn vì chỉ cộng delta. Thay đổi chưa flush bị mất
+    nếu process dừng đột ngột; tính lại chính xác bằng `compute_tenant_stats`
+    + `set_absolute` (endpoint `POST /admin/tenants/stats/rebuild`).
+    """
+
+    def __init__(
+        self,
+        get_engine: Callable[[], AsyncEngine],
+        flush_interval: float = 1.0,
+        enabled: bool = True,
+    ):
+        self._get_engine = get_engine
+        self._flush_interval = flush_interval
+        self.enabled = enabled
+        self._pending: dict[str, dict[str, StatsDelta]] = {}
+        self._task: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+
+    def record(
+        self,
+        tenant_id: str,
+        table: str,
+        count: int,
+        modified_at: datetime | None = None,
+    ) -> None:
+        """
+        Ghi nhận thay đổi đã commit của một tenant table.
+        Dùng trực tiếp cho các đường ghi không qua TenantSession (write queue, ...).
+        """
+        if not self.enabled or table not in TRACKED_TABLES:
+            return
+        tenant_deltas = self._pending.setdefault(tenant_id, {})
+        delta = tenant_deltas.get(table)
+        if delta is None:
+            delta = tenant_deltas[table] = StatsDelta()
+        delta.add(count, modified_at or datetime.utcnow())
+
+        if self._task is None or self._task.done():
+            try:
+                self._task = asyncio.get_running_loop().create_task(self._flush_later())
+            except RuntimeError:
+                # Không có event loop: giữ lại, flush ở lần gọi flush()/close() tiếp theo
+                pass
+
+    async def _flush_later(self) -> None:
+        # Task có bản sao context của request đã ghi: không cộng SQL của các lần
+        # flush vào metrics của request đó
+        current_request_metrics.set(None)
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                # Shared database tạm thời lỗi: thay đổi được giữ lại, thử lại ở chu kỳ sau
+                pass
+            if not self._pending:
+                return
+
+    async def flush(self) -> None:
+        """Ghi các thay đổi đang chờ vào shared database."""
+        async with self._lock:
+            pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            try:
+                async with self._get_engine().begin() as conn:
+                    for tenant_id, deltas in pending.items():
+                        await self._apply(conn, tenant_id, deltas)
+            except Exception:
+                # Giữ lại để thử lại ở lần flush sau
+                for tenant_id, deltas in pending.items():
+                    for table, delta in deltas.items():
+                        self.record(tenant_id, table, delta.count, delta.modified_at)
+                raise
+
+    @staticmethod
+    async def _apply(conn, tenant_id: str, deltas: dict[str, StatsDelta]) -> None:
+        now = datetime.utcnow()
+        values: dict[str, Any] = {"updated_at": now}
+        for table, delta in deltas.items():
+            prefix = TRACKED_TABLES[table]
+            count_column = TenantStats.__table__.c[f"{prefix}_count"]
+            values[count_column.name] = count_column + delta.count
+            if delta.modified_at is not None:
+                values[f"{prefix}_modified_at"] = delta.modified_at
+
+        result = await conn.execute(
+            update(TenantStats).where(TenantStats.tenant_id == tenant_id).values(values)
+        )
+        if result.rowcount:
+            return
+
+        # Chưa có dòng thống kê của tenant. Nếu worker khác vừa tạo dòng này,
+        # INSERT lỗi unique và cả batch được giữ lại để cộng dồn ở lần flush sau.
+        row = {"tenant_id": tenant_id, "updated_at": now}
+        for table, delta in deltas.items():
+            prefix = TRACKED_TABLES[table]
+            row[f"{prefix}_count"] = delta.count
+            row[f"{prefix}_modified_at"] = delta.modified_at
+        await conn.execute(insert(TenantStats).values(row))
+
+    async def set_absolute(
+        self,
+        tenant_id: str,
+        counts: dict[str, int],
+        modified_at: dict[str, datetime | None],
+    ) -> None:
+        """Ghi đè thống kê của tenant bằng giá trị tính lại từ tenant database."""
+        row: dict[str, Any] = {"updated_at": datetime.utcnow()}
+        for table, prefix in TRACKED_TABLES.items():
+            row[f"{prefix}_count"] = counts.get(table, 0)
+            row[f"{prefix}_modified_at"] = modified_at.get(table)
+
+        async with self._lock:
+            # Thay đổi đang chờ của tenant đã nằm trong số liệu tính lại
+            self._pending.pop(tenant_id, None)
+            async with self._get_engine().begin() as conn:
+                result = await conn.execute(
+                    update(TenantStats).where(TenantStats.tenant_id == tenant_id).values(row)
+                )
+                if not result.rowcount:
+                    await conn.execute(insert(TenantStats).values(tenant_id=tenant_id, **row))
+
+    async def close(self) -> None:
+        """Flush các thay đổi còn lại (gọi khi shutdown)."""
+        task = self._task
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+
+
+async def most_active_tenants(conn: AsyncConnection, limit: int) -> list[str]:
+    """
+    Các tenant đang active có hoạt động ghi gần nhất (theo `tenant_stats.updated_at`,
+    tenant chưa có thống kê xếp theo `tenants.updated_at`).
+
+    Args:
+        conn: Connection tới shared database
+        limit: Số tenant tối đa
+
+    Returns:
+        Danh sách tenant IDs, hoạt động gần nhất trước
+    """
+    last_activity = func.coalesce(TenantStats.updated_at, Tenant.updated_at)
+    result = await conn.execute(
+        select(Tenant.tenant_id)
+        .outerjoin(TenantStats, TenantStats.tenant_id == Tenant.tenant_id)
+        .where(Tenant.status == "active")
+        .order_by(last_activity.desc().nulls_last(), Tenant.id)
+        .limit(limit)
+    )
+    return list(result.scalars())
+
+
+async def compute_tenant_stats(
+    conn: AsyncConnection,
+) -> tuple[dict[str, int], dict[str, datetime | None]]:
+    """
+    Tính lại thống kê từ tenant database (COUNT(*) trên từng bảng được thống kê).
+
+    Returns:
+        ({table: số dòng}, {table: updated_at lớn nhất})
+    """
+    counts: dict[str, int] = {}
+    modified_at: dict[str, datetime | None] = {}
+    for name in TRACKED_TABLES:
+        updated_at = column("updated_at")
+        result = await conn.execute(
+            select(func.count(), func.max(updated_at)).select_from(table(name, updated_at))
+        )
+        count, last_modified = result.one()
+        counts[name] = count
+        if isinstance(last_modified, str):
+            # Core select không có kiểu cột: SQLite trả về chuỗi ISO
+            last_modified = datetime.fromisoformat(last_modified)
+        modified_at[name] = last_modified
+    return counts, modified_at
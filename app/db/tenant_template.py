@@ -0,0 +1,151 @@
+import asyncio
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from sqlalchemy import MetaData
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.db.fts import ensure_fts_indexes
+from app.db.schema import set_user_version
+from app.db.table_versions import ensure_table_versions
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# ioctl FICLONE (Linux): tạo reflink, file mới dùng chung block với file nguồn
+# (btrfs, XFS, ...) nên copy gần như không tốn I/O
+FICLONE = 0x40049409
+
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def _copy_fd(src_fd: int, dst_fd: int, size: int) -> str:
+    """Copy nội dung file theo cách nhanh nhất hệ điều hành hỗ trợ."""
+    if fcntl is not None:
+        try:
+            fcntl.ioctl(dst_fd, FICLONE, src_fd)
+            return "reflink"
+        except OSError:
+            pass
+
+    if hasattr(os, "copy_file_range"):
+        try:
+            copied = 0
+            while copied < size:
+                count = os.copy_file_range(src_fd, dst_fd, size - copied, copied, copied)
+                if count == 0:
+                    break
+                copied += count
+            if copied == size:
+                return "copy_file_range"
+        except OSError:
+            pass
+        # Không hỗ trợ (khác filesystem, kernel cũ, ...): copy lại từ đầu
+        os.ftruncate(dst_fd, 0)
+
+    os.lseek(src_fd, 0, os.SEEK_SET)
+    os.lseek(dst_fd, 0, os.SEEK_SET)
+    with open(src_fd, "rb", closefd=False) as src, open(dst_fd, "wb", closefd=False) as dst:
+        shutil.copyfileobj(src, dst, _COPY_CHUNK_SIZE)
+    return "copy"
+
+
+def clone_file(source: str | Path, destination: str | Path) -> str | None:
+    """
+    Copy `source` thành `destination` nếu `destination` chưa tồn tại.
+
+    Ưu tiên reflink (FICLONE), sau đó `copy_file_range`, cuối cùng là copy
+    thường. File được ghi qua file tạm, fsync rồi `os.link` vào đích nên không
+    bao giờ ghi đè file đã có và reader không thấy file copy dở.
+
+    Returns:
+        Cách copy đã dùng ("reflink", "copy_file_range", "copy"), hoặc None
+        nếu `destination` đã tồn tại
+    """
+    destination = Path(destination)
+    fd, tmp_path = tempfile.mkstemp(dir=destination.parent, prefix=".tmp-")
+    try:
+        with open(source, "rb") as src:
+            method = _copy_fd(src.fileno(), fd, os.fstat(src.fileno()).st_size)
+        os.fsync(fd)
+        os.close(fd)
+        fd = None
+        try:
+            os.link(tmp_path, destination)
+        except FileExistsError:
+            return None
+        return method
+    finally:
+        if fd is not None:
+            os.close(fd)
+        os.unlink(tmp_path)
+
+
+class TenantTemplate:
+    """
+    File SQLite mẫu cho tenant databases mới: đã có toàn bộ tables, indexes,
+    FTS, triggers version và `PRAGMA user_version` của một schema version, đã VACUUM.
+
+    Tenant mới được tạo bằng cách copy file mẫu thay vì chạy DDL, nên tạo hàng
+    nghìn tenant (ví dụ khi import dữ liệu) chỉ tốn I/O. Mỗi schema version có
+    một file mẫu riêng (`tenant_schema_<version>.db`), được tạo lần đầu khi cần.
+    """
+
+    def __init__(self, directory: str | Path, metadata: MetaData, version: int):
+        self.directory = Path(directory)
+        self.metadata = metadata
+        self.version = version
+        self._lock = asyncio.Lock()
+
+    @property
+    def path(self) -> Path:
+        return self.directory / f"tenant_schema_{self.version}.db"
+
+    async def ensure(self) -> Path:
+        """Tạo file mẫu nếu chưa có (các worker khác có thể tạo song song, kết quả như nhau)."""
+        if self.path.is_file():
+            return self.path
+        async with self._lock:
+            if not self.path.is_file():
+                await self._build()
+        return self.path
+
+    async def _build(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        os.close(fd)
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}", poolclass=NullPool)
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(self.metadata.create_all)
+                await ensure_fts_indexes(conn, self.metadata)
+                await ensure_table_versions(conn, self.metadata)
+                await set_user_version(conn, self.version)
+            # VACUUM không chạy được trong transaction
+            async with engine.connect() as conn:
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                await conn.exec_driver_sql("VACUUM")
+            await engine.dispose()
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            await engine.dispose()
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    async def provision(self, destination: str | Path) -> str | None:
+        """
+        Tạo tenant database tại `destination` bằng cách copy file mẫu.
+
+        Returns:
+            Cách copy đã dùng, hoặc None nếu `destination` đã tồn tại
+        """
+        source = await self.ensure()
+        return await asyncio.to_thread(clone_file, source, destination)
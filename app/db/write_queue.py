@@ -0,0 +1,144 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.sql import Executable
+
+from app.core.metrics import current_request_metrics
+
+# Sentinel báo writer task dừng sau khi commit các câu lệnh đang chờ
+_STOP: Any = object()
+
+
+@dataclass
+class PendingWrite:
+    """Một câu lệnh ghi đang chờ được commit cùng batch."""
+    statement: Executable
+    future: asyncio.Future
+
+
+class TenantWriteQueue:
+    """
+    Group-commit write queue cho một tenant database.
+
+    Các câu lệnh ghi (INSERT/UPDATE, nên có `.returning(...)`) từ nhiều request
+    đồng thời được gom lại trong một cửa sổ thời gian ngắn (hoặc tới khi đủ
+    `max_batch`) và commit chung một transaction, nên số lần fsync tỉ lệ với
+    số batch thay vì số request. Future của từng request nhận dòng được
+    RETURNING (dạng dict) hoặc exception của riêng câu lệnh đó.
+
+    Writer task tự dừng sau `idle_timeout` giây không có việc.
+    """
+
+    def __init__(
+        self,
+        tenant_id: str,
+        get_engine: Callable[[str], AsyncEngine],
+        window: float,
+        max_batch: int,
+        idle_timeout: float,
+        on_idle: Callable[[str], None] | None = None,
+    ):
+        self.tenant_id = tenant_id
+        self._get_engine = get_engine
+        self._window = window
+        self._max_batch = max(1, max_batch)
+        self._idle_timeout = idle_timeout
+        self._on_idle = on_idle
+        self._queue: asyncio.Queue[PendingWrite] = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+
+    async def submit(self, statement: Executable) -> dict[str, Any] | None:
+        """
+        Đưa câu lệnh vào queue và chờ batch chứa nó được commit.
+
+        Returns:
+            Dòng đầu tiên được RETURNING (dict), hoặc None nếu câu lệnh không trả dòng
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(PendingWrite(statement, future))
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return await future
+
+    async def _run(self) -> None:
+        # Task có bản sao context của request đầu tiên gửi ghi: không cộng SQL
+        # của các batch (gồm ghi của request khác) vào metrics của request đó
+        current_request_metrics.set(None)
+        loop = asyncio.get_running_loop()
+        stop = False
+        while not stop:
+            try:
+                first = await asyncio.wait_for(self._queue.get(), self._idle_timeout)
+            except TimeoutError:
+                if self._queue.empty():
+                    break
+                continue
+            if first is _STOP:
+                break
+
+            batch = [first]
+            deadline = loop.time() + self._window
+            while len(batch) < self._max_batch:
+                if not self._queue.empty():
+                    item = self._queue.get_nowait()
+                else:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), remaining)
+                    except TimeoutError:
+                        break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+        self._task = None
+        if self._on_idle is not None:
+            self._on_idle(self.tenant_id)
+
+    async def _flush(self, batch: list[PendingWrite]) -> None:
+        results: list[tuple[PendingWrite, Any, BaseException | None]] = []
+        try:
+            engine = self._get_engine(self.tenant_id)
+            async with engine.begin() as conn:
+                for item in batch:
+                    # SQLite rollback lỗi ở mức câu lệnh (constraint, ...) nên
+                    # một câu lệnh lỗi không ảnh hưởng các câu lệnh khác trong batch
+                    try:
+                        result = await conn.execute(item.statement)
+                        row = result.mappings().first() if result.returns_rows else None
+                        results.append((item, dict(row) if row else None, None))
+                    except Exception as exc:
+                        results.append((item, None, exc))
+        except Exception as exc:
+            # Commit lỗi: không câu lệnh nào trong batch được ghi
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(exc)
+            return
+
+        for item, row, exc in results:
+            if item.future.done():
+                continue
+            if exc is not None:
+                item.future.set_exception(exc)
+            else:
+                item.future.set_result(row)
+
+    def pending(self) -> int:
+        """Số câu lệnh đang chờ trong queue."""
+        return self._queue.qsize()
+
+    async def close(self) -> None:
+        """Commit nốt các câu lệnh còn trong queue rồi dừng writer task."""
+        task = self._task
+        if task is None or task.done():
+            return
+        self._queue.put_nowait(_STOP)
+        await task
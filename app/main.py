@@ -1,18 +1,24 @@
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import shared_routes, tenant_routes
-from app.core.config import settings
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.api import admin_routes, shared_routes, tenant_routes
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.core.coalescing import RequestCoalescingMiddleware
+from app.core.config import InvalidTenantIdError, settings
+from app.core.metrics import PROMETHEUS_CONTENT_TYPE, MetricsMiddleware, metrics_registry
 from app.db import SharedBase, db_manager
+from app.db.instrumentation import engine_cache_metrics
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Lifespan context manager để quản lý database engine lifecycle.
-    - Startup: Tạo tables tự động cho shared database
-    - Shutdown: Đóng và dispose tất cả engines (shared + tenant databases)
+    - Startup: Tạo tables tự động cho shared database, pre-warm tenant databases
+    - Shutdown: Commit write queues, flush tenant statistics đang chờ, rồi đóng
+      và dispose tất cả engines (shared + tenant databases)
     """
     # Startup - Tạo tables cho shared database (chỉ các model kế thừa SharedBase)
     # Tenant databases sẽ tự động tạo schema riêng khi được sử dụng lần đầu
@@ -20,9 +26,17 @@ async def lifespan(app: FastAPI):
     async with shared_engine.begin() as conn:
         await conn.run_sync(SharedBase.metadata.create_all)
 
+    # Pre-warm các tenant hoạt động gần nhất (chạy nền, hoặc chờ xong nếu
+    # TENANT_PREWARM_WAIT) để request đầu tiên sau deploy không phải mở database
+    if settings.tenant_prewarm_count > 0:
+        if settings.tenant_prewarm_wait:
+            await db_manager.prewarm_active_tenants()
+        else:
+            db_manager.schedule_prewarm(db_manager.prewarm_active_tenants())
+
     yield
 
-    # Shutdown - dispose tất cả database engines (shared + tenant)
+    # Shutdown - flush tenant statistics và dispose tất cả database engines (shared + tenant)
     await db_manager.dispose_all()
 
 
@@ -37,9 +51,18 @@ app = FastAPI(
     ## Endpoints:
     - `/shared/*`: Routes cho shared database
     - `/tenants/*`: Routes cho tenant databases
+    - `/admin/*`: Truy vấn tổng hợp qua nhiều tenant databases
     """,
 )
 
+# Gộp GET request giống hệt nhau (thêm trước CORS để CORS headers vẫn tính theo từng request)
+if settings.request_coalescing_enabled:
+    app.add_middleware(
+        RequestCoalescingMiddleware,
+        paths=settings.request_coalescing_paths,
+        max_bytes=settings.request_coalescing_max_bytes,
+    )
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -47,11 +70,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
+# Metrics middleware (thêm sau cùng để bao ngoài CORS, đo toàn bộ request)
+if settings.metrics_enabled or settings.query_profiling:
+    app.add_middleware(MetricsMiddleware, registry=metrics_registry)
+
+
+@app.exception_handler(InvalidTenantIdError)
+async def invalid_tenant_id_handler(request: Request, exc: InvalidTenantIdError):
+    """Tenant ID không hợp lệ (path, query, header) -> 400 thay vì 500."""
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+
 # Include routers
 app.include_router(shared_routes.router)
 app.include_router(tenant_routes.router)
+app.include_router(admin_routes.router)
 
 
 @app.get("/")
@@ -62,3 +98,14 @@ def read_root():
         "shared_database": "/shared",
         "tenant_databases": "/tenants",
     }
+
+
+if settings.metrics_enabled:
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Metrics của process theo Prometheus text format."""
+        return PlainTextResponse(
+            metrics_registry.render(engine_cache_metrics(db_manager.tenant_cache_stats())),
+            media_type=PROMETHEUS_CONTENT_TYPE,
+        )
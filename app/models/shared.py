@@ -32,3 +32,20 @@ class Tenant(SharedBase):
     status = Column(String, default="active")  # active, inactive, suspended
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class TenantStats(SharedBase):
+    """
+    Model cho shared database - Thống kê của từng tenant (số profiles/documents,
+    thời điểm sửa cuối), được cập nhật cộng dồn khi ghi vào tenant database
+    nên dashboard không phải mở từng tenant database để COUNT(*).
+    """
+    __tablename__ = "tenant_stats"
+
+    id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(String, unique=True, index=True, nullable=False)
+    profile_count = Column(Integer, nullable=False, default=0)
+    document_count = Column(Integer, nullable=False, default=0)
+    profile_modified_at = Column(DateTime)
+    document_modified_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
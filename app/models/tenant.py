@@ -1,8 +1,10 @@
 from datetime import datetime
 
 from sqlalchemy import Column, DateTime, Integer, String, Text
+from sqlalchemy.orm import deferred
 
 from app.db.base import TenantBase
+from app.db.fts import FTSIndex, register_fts
 
 
 class Profile(TenantBase):
@@ -31,7 +33,21 @@ class Document(TenantBase):
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
-    content = Column(Text)
+    content = Column(Text)  # None nếu nội dung được lưu trong blob store
+    content_hash = Column(String(64))  # SHA-256 của blob (nội dung lớn)
+    content_size = Column(Integer)  # Kích thước nội dung (bytes, UTF-8)
+    # Bản text của nội dung trong blob store, chỉ để FTS index (không load cùng Document)
+    search_text = deferred(Column(Text))
     file_path = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+# Full-text search cho documents (SQLite FTS5), đồng bộ bằng triggers.
+# Document có nội dung trong blob store được index qua `search_text`
+documents_fts = register_fts(
+    TenantBase.metadata,
+    FTSIndex(
+        name="documents_fts", table="documents", columns=("title", "content", "search_text")
+    ),
+)
@@ -0,0 +1,91 @@
+"""
+Benchmark: chi phí trả về một trang danh sách lớn, ORM objects + Pydantic
+validation so với fast path (Core rows serialize thẳng ra JSON bytes).
+
+Chạy:
+    python -m benchmarks.bench_list_serialization --rows 5000 --limit 100,1000 --iterations 50
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+import httpx
+
+from app.api.serialization import orjson
+
+
+async def _measure(client: httpx.AsyncClient, url: str, iterations: int) -> tuple[float, bytes]:
+    body = b""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        response = await client.get(url)
+        response.raise_for_status()
+        body = response.content
+    return (time.perf_counter() - started) / iterations, body
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5000, help="Số profiles/documents trong tenant")
+    parser.add_argument("--limit", default="100,1000", help="Kích thước trang cần đo")
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.update({
+            "SHARED_DATABASE_URL": f"sqlite+aiosqlite:///{tmp}/shared.db",
+            "TENANT_DATABASE_DIR": f"{tmp}/tenants",
+            "RECORD_CACHE_INVALIDATION_PATH": f"{tmp}/record_invalidations.log",
+            "METRICS_ENABLED": "false",
+        })
+        from app.core.config import settings
+        from app.main import app
+
+        results = []
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60
+            ) as client:
+                users = [
+                    {"email": f"user{index}@example.com", "name": f"Người dùng {index}"}
+                    for index in range(args.rows)
+                ]
+                await client.post("/shared/users/bulk", json=users)
+                await client.post("/tenants/bench/profiles/bulk", json=[
+                    {"user_id": index + 1, "full_name": f"Hồ sơ {index}", "bio": "Giới thiệu " * 10}
+                    for index in range(args.rows)
+                ])
+                await client.post("/tenants/bench/documents/bulk", json=[
+                    {"title": f"Tài liệu {index}", "content": "Nội dung " * 50}
+                    for index in range(args.rows)
+                ])
+
+                for limit in (int(value) for value in args.limit.split(",")):
+                    for route in ("/tenants/bench/profiles", "/tenants/bench/documents"):
+                        url = f"{route}?limit={limit}"
+                        timings = {}
+                        bodies = {}
+                        for variant, enabled in (("orm_pydantic", False), ("fast_path", True)):
+                            settings.fast_list_serialization = enabled
+                            await _measure(client, url, 3)
+                            timings[variant], bodies[variant] = await _measure(
+                                client, url, args.iterations
+                            )
+                        results.append({
+                            "route": route,
+                            "limit": limit,
+                            "orm_pydantic_ms": round(timings["orm_pydantic"] * 1000, 2),
+                            "fast_path_ms": round(timings["fast_path"] * 1000, 2),
+                            "speedup": round(timings["orm_pydantic"] / timings["fast_path"], 2),
+                            "same_json": json.loads(bodies["orm_pydantic"]) == json.loads(bodies["fast_path"]),
+                            "encoder": "orjson" if orjson is not None else "json",
+                        })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
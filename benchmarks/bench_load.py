@@ -0,0 +1,482 @@
+"""
+Load test: phát lại các requests trong Bruno collection (`bruno/`) theo tỉ lệ
+của từng kịch bản với số request đồng thời cho trước, đo req/s, latency
+p50/p95/p99 và số lỗi.
+
+Mỗi kịch bản chạy trên dữ liệu mới (N tenants, mỗi tenant M profiles/documents,
+tạo qua các bulk endpoints) và thứ tự requests được sinh từ `--seed`, nên kết
+quả so sánh được giữa các commit.
+
+Chạy:
+    python -m benchmarks.bench_load --scenario all --requests 5000 --concurrency 32
+    python -m benchmarks.bench_load --scenario hot-tenant --mode uvicorn
+    python -m benchmarks.bench_load --scenario mixed --url http://localhost:8000
+
+Chế độ:
+    inprocess  app.main:app chạy trong process qua ASGI transport (mặc định)
+    uvicorn    khởi động uvicorn trên localhost, đo cả HTTP stack
+    --url      dùng server đang chạy sẵn (không đổi được settings của kịch bản)
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from benchmarks.bruno import BrunoRequest, load_collection, load_environment
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+@dataclass
+class Scenario:
+    """Kịch bản load test: tỉ lệ requests (theo tên trong Bruno) và dữ liệu cần tạo."""
+    description: str
+    # Tên request trong Bruno collection -> trọng số
+    mix: dict[str, int]
+    tenants: int = 10
+    # "random": chọn tenant ngẫu nhiên, "round_robin": lần lượt từng tenant,
+    # "hot": luôn dùng tenant đầu tiên
+    tenant_selection: str = "random"
+    # Biến môi trường ghi đè Settings (chỉ áp dụng ở chế độ inprocess/uvicorn)
+    settings: dict[str, str] = field(default_factory=dict)
+
+
+SCENARIOS = {
+    "mixed": Scenario(
+        description="Đọc/ghi shared và tenant database, tenant chọn ngẫu nhiên",
+        mix={
+            "Get Root": 1,
+            "Get All Users": 5,
+            "Get User By ID": 10,
+            "Create User": 2,
+            "Get All Tenants": 2,
+            "Get Tenant By ID": 5,
+            "Get All Profiles (Path)": 10,
+            "Get Profile By ID (Path)": 15,
+            "Get Profile With User (Path)": 15,
+            "Get Profiles (Header)": 5,
+            "Get All Documents": 10,
+            "Get Document By ID": 15,
+            "Search Documents": 5,
+            "Create Document": 5,
+        },
+    ),
+    "hot-tenant": Scenario(
+        description="Mọi request vào cùng một tenant (engine luôn có trong cache)",
+        mix={
+            "Get Profile By ID (Path)": 20,
+            "Get Profile With User (Path)": 20,
+            "Get All Profiles (Path)": 10,
+            "Get Document By ID": 20,
+            "Get All Documents": 10,
+            "Search Documents": 10,
+            "Create Document": 10,
+        },
+        tenant_selection="hot",
+    ),
+    "cold-tenant": Scenario(
+        description=(
+            "Lần lượt qua nhiều tenant hơn kích thước tenant engine cache, "
+            "hầu hết request phải mở lại engine"
+        ),
+        mix={
+            "Get Profile By ID (Path)": 40,
+            "Get Document By ID": 40,
+            "Get All Documents": 20,
+        },
+        tenants=200,
+        tenant_selection="round_robin",
+        settings={"TENANT_ENGINE_CACHE_SIZE": "16"},
+    ),
+    "fan-out": Scenario(
+        description="Truy vấn qua mọi tenant (admin) xen kẽ với đọc từng tenant",
+        mix={
+            "Count Profiles Per Tenant": 10,
+            "Search Documents In Tenants": 10,
+            "Get Profile By ID (Path)": 40,
+            "Get Document By ID": 40,
+        },
+        tenants=50,
+    ),
+}
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Percentile theo nearest-rank của danh sách đã sắp xếp."""
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(percent / 100 * len(values)))
+    return values[rank - 1]
+
+
+def summarize(latencies: list[float]) -> dict[str, float]:
+    values = sorted(latencies)
+    return {
+        "p50": round(percentile(values, 50) * 1000, 2),
+        "p95": round(percentile(values, 95) * 1000, 2),
+        "p99": round(percentile(values, 99) * 1000, 2),
+        "max": round(values[-1] * 1000, 2) if values else 0.0,
+        "mean": round(sum(values) / len(values) * 1000, 2) if values else 0.0,
+    }
+
+
+def git_commit() -> str | None:
+    """Commit hiện tại (kèm `-dirty` nếu có thay đổi chưa commit)."""
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def tenant_name(index: int) -> str:
+    return f"bench_{index:04d}"
+
+
+async def _post(client: httpx.AsyncClient, url: str, payload: Any) -> httpx.Response:
+    response = await client.post(url, json=payload)
+    if response.status_code >= 500:
+        response.raise_for_status()
+    return response
+
+
+async def seed(client: httpx.AsyncClient, tenants: int, rows: int, concurrency: int) -> dict:
+    """
+    Tạo dữ liệu cho kịch bản qua API: `rows` users trong shared database,
+    `tenants` tenants, mỗi tenant `rows` profiles và `rows` documents.
+    Dữ liệu đã tồn tại (khi chạy với --url) được bỏ qua.
+
+    Returns:
+        Danh sách IDs dùng làm biến cho requests
+    """
+    users = [
+        {"email": f"bench-user-{index}@example.com", "name": f"Người dùng {index}"}
+        for index in range(rows)
+    ]
+    response = await _post(client, "/shared/users/bulk", users)
+    user_ids = [user["id"] for user in response.json()["created"]]
+    if len(user_ids) < rows:
+        response = await client.get("/shared/users", params={"limit": rows})
+        user_ids = [user["id"] for user in response.json()]
+
+    profile_ids: set[int] = set()
+    document_ids: set[int] = set()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def seed_tenant(index: int) -> None:
+        tenant_id = tenant_name(index)
+        async with semaphore:
+            await _post(client, "/shared/tenants", {
+                "tenant_id": tenant_id, "name": f"Tenant {index}", "status": "active",
+            })
+            response = await _post(
+                client, f"/tenants/{tenant_id}/profiles/bulk",
+                [{"user_id": user_id, "full_name": f"Hồ sơ {user_id}"} for user_id in user_ids],
+            )
+            profile_ids.update(profile["id"] for profile in response.json()["created"])
+            response = await _post(
+                client, f"/tenants/{tenant_id}/documents/bulk",
+                [
+                    {"title": f"Tài liệu {row}", "content": f"Nội dung tài liệu số {row} " * 20}
+                    for row in range(rows)
+                ],
+            )
+            document_ids.update(document["id"] for document in response.json()["created"])
+
+    await asyncio.gather(*(seed_tenant(index) for index in range(tenants)))
+    return {
+        "user_ids": user_ids,
+        "profile_ids": sorted(profile_ids) or list(range(1, rows + 1)),
+        "document_ids": sorted(document_ids) or list(range(1, rows + 1)),
+    }
+
+
+def build_plan(
+    scenario: Scenario,
+    requests: dict[str, BrunoRequest],
+    environment: dict[str, str],
+    data: dict,
+    tenants: int,
+    count: int,
+    seed_value: int,
+) -> list[tuple[BrunoRequest, str, dict[str, str], Any]]:
+    """Sinh trước danh sách requests (đã thay biến) theo tỉ lệ của kịch bản."""
+    missing = [name for name in scenario.mix if name not in requests]
+    if missing:
+        raise SystemExit(f"Không tìm thấy trong Bruno collection: {', '.join(missing)}")
+
+    rng = random.Random(seed_value)
+    names = list(scenario.mix)
+    weights = [scenario.mix[name] for name in names]
+    plan = []
+    for sequence, name in enumerate(rng.choices(names, weights, k=count)):
+        if scenario.tenant_selection == "hot":
+            tenant_index = 0
+        elif scenario.tenant_selection == "round_robin":
+            tenant_index = sequence % tenants
+        else:
+            tenant_index = rng.randrange(tenants)
+
+        request = requests[name]
+        variables = {
+            **environment,
+            "base_url": "",
+            "tenant_id": tenant_name(tenant_index),
+            "user_id": rng.choice(data["user_ids"]),
+            "profile_id": rng.choice(data["profile_ids"]),
+            "document_id": rng.choice(data["document_ids"]),
+        }
+        url, headers, body = request.render(variables)
+        if isinstance(body, dict) and "email" in body:
+            # Body mẫu có email cố định: thêm số thứ tự để không bị trùng unique
+            body["email"] = f"load-{seed_value}-{sequence}-{body['email']}"
+        plan.append((request, url, headers, body))
+    return plan
+
+
+async def replay(
+    client: httpx.AsyncClient,
+    plan: list[tuple[BrunoRequest, str, dict[str, str], Any]],
+    concurrency: int,
+) -> dict:
+    """Gửi các requests trong plan với `concurrency` workers, đo latency từng request."""
+    latencies: dict[str, list[float]] = {}
+    errors: dict[str, dict[str, int]] = {}
+    position = 0
+
+    async def worker() -> None:
+        nonlocal position
+        while position < len(plan):
+            request, url, headers, body = plan[position]
+            position += 1
+            started = time.perf_counter()
+            try:
+                response = await client.request(request.method, url, headers=headers, json=body)
+                await response.aread()
+                status = str(response.status_code) if response.status_code >= 400 else None
+            except httpx.HTTPError as exc:
+                status = type(exc).__name__
+            latencies.setdefault(request.name, []).append(time.perf_counter() - started)
+            if status is not None:
+                route_errors = errors.setdefault(request.name, {})
+                route_errors[status] = route_errors.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "duration_s": round(elapsed, 3),
+        "requests": len(all_latencies),
+        "errors": sum(sum(counts.values()) for counts in errors.values()),
+        "req_per_sec": round(len(all_latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": summarize(all_latencies),
+        "routes": {
+            name: {
+                "count": len(values),
+                "errors": errors.get(name, {}),
+                **summarize(values),
+            }
+            for name, values in sorted(latencies.items())
+        },
+    }
+
+
+async def run_scenario(name: str, client: httpx.AsyncClient, args: argparse.Namespace) -> dict:
+    scenario = SCENARIOS[name]
+    tenants = args.tenants or scenario.tenants
+    requests = load_collection(args.collection)
+    environment = load_environment(args.collection, args.environment)
+
+    seeding_started = time.perf_counter()
+    data = await seed(client, tenants, args.rows, args.concurrency)
+    seeding_elapsed = time.perf_counter() - seeding_started
+
+    plan = build_plan(
+        scenario, requests, environment, data, tenants,
+        args.warmup + args.requests, args.seed,
+    )
+    if args.warmup:
+        await replay(client, plan[:args.warmup], args.concurrency)
+    result = await replay(client, plan[args.warmup:], args.concurrency)
+
+    return {
+        "scenario": name,
+        "description": scenario.description,
+        "mode": "url" if args.url else args.mode,
+        "commit": git_commit(),
+        "config": {
+            "tenants": tenants,
+            "rows": args.rows,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "tenant_selection": scenario.tenant_selection,
+            "settings": {} if args.url else scenario.settings,
+        },
+        "seed_duration_s": round(seeding_elapsed, 3),
+        **result,
+    }
+
+
+def scenario_environment(scenario: Scenario, data_dir: str) -> dict[str, str]:
+    """Biến môi trường cho app: database trong thư mục tạm + settings của kịch bản."""
+    return {
+        "SHARED_DATABASE_URL": f"sqlite+aiosqlite:///{data_dir}/shared.db",
+        "DATABASE_URL": f"sqlite+aiosqlite:///{data_dir}/profile.db",
+        "TENANT_DATABASE_DIR": f"{data_dir}/tenants",
+        "RECORD_CACHE_INVALIDATION_PATH": f"{data_dir}/record_invalidations.log",
+        **scenario.settings,
+    }
+
+
+async def run_inprocess(name: str, args: argparse.Namespace) -> dict:
+    """Chạy một kịch bản với app trong process hiện tại (settings đọc lúc import)."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        os.environ.update(scenario_environment(SCENARIOS[name], data_dir))
+        from app.main import app
+
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://bench", timeout=args.timeout
+            ) as client:
+                return await run_scenario(name, client, args)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_uvicorn(name: str, args: argparse.Namespace) -> dict:
+    """Khởi động uvicorn trên localhost cho một kịch bản và đo qua HTTP."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        port = _free_port()
+        server = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "app.main:app",
+                "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+            ],
+            cwd=PROJECT_ROOT,
+            env={**os.environ, **scenario_environment(SCENARIOS[name], data_dir)},
+        )
+        try:
+            async with httpx.AsyncClient(
+                base_url=f"http://127.0.0.1:{port}", timeout=args.timeout
+            ) as client:
+                for _ in range(100):
+                    if server.poll() is not None:
+                        raise SystemExit(f"uvicorn dừng với mã {server.returncode}")
+                    try:
+                        await client.get("/")
+                        break
+                    except httpx.TransportError:
+                        await asyncio.sleep(0.1)
+                return await run_scenario(name, client, args)
+        finally:
+            server.terminate()
+            server.wait()
+
+
+async def run_url(name: str, args: argparse.Namespace) -> dict:
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout) as client:
+        return await run_scenario(name, client, args)
+
+
+def run_in_subprocess(name: str, argv: list[str]) -> dict:
+    """
+    Chạy một kịch bản inprocess trong process con: Settings và db_manager được
+    tạo lúc import app nên mỗi kịch bản cần process riêng.
+    """
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_load", *argv, "--scenario", name],
+        cwd=PROJECT_ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        raise SystemExit(f"Kịch bản {name} lỗi (mã {result.returncode})")
+    return json.loads(result.stdout)[0]
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--scenario", default="all",
+        help=f"Tên kịch bản, phân tách bởi dấu phẩy, hoặc 'all' ({', '.join(SCENARIOS)})",
+    )
+    parser.add_argument("--mode", choices=("inprocess", "uvicorn"), default="inprocess")
+    parser.add_argument("--url", help="Base URL của server đang chạy (bỏ qua --mode)")
+    parser.add_argument("--tenants", type=int, help="Số tenants (mặc định theo kịch bản)")
+    parser.add_argument("--rows", type=int, default=100, help="Số profiles/documents mỗi tenant")
+    parser.add_argument("--requests", type=int, default=2000, help="Số requests được đo")
+    parser.add_argument("--warmup", type=int, default=100, help="Số requests chạy trước khi đo")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=0, help="Seed sinh thứ tự requests")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Timeout mỗi request (giây)")
+    parser.add_argument("--collection", default=str(PROJECT_ROOT / "bruno"))
+    parser.add_argument("--environment", default="local", help="Bruno environment lấy biến mặc định")
+    parser.add_argument("--output", help="Ghi kết quả JSON ra file")
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    argv = sys.argv[1:]
+    args = parse_args(argv)
+    names = list(SCENARIOS) if args.scenario == "all" else args.scenario.split(",")
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"Kịch bản không tồn tại: {', '.join(unknown)}")
+
+    results = []
+    for name in names:
+        if args.url:
+            results.append(asyncio.run(run_url(name, args)))
+        elif args.mode == "uvicorn":
+            results.append(asyncio.run(run_uvicorn(name, args)))
+        elif len(names) > 1:
+            child_argv = _without_option(argv, "--scenario")
+            child_argv = _without_option(child_argv, "--output")
+            results.append(run_in_subprocess(name, child_argv))
+        else:
+            results.append(asyncio.run(run_inprocess(name, args)))
+
+    output = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    print(output)
+
+
+def _without_option(argv: list[str], option: str) -> list[str]:
+    """Bỏ `option value` / `option=value` khỏi danh sách tham số dòng lệnh."""
+    result = []
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+        elif arg == option:
+            skip = True
+        elif not arg.startswith(f"{option}="):
+            result.append(arg)
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Microbenchmark: chi phí của tenant session dependency cho mỗi request
+(không chạy query), so sánh factory đã cache với việc tạo mới
+async_sessionmaker + resolve tenant URL ở mỗi request.
+
+Chạy:
+    python -m benchmarks.bench_session_dependency --iterations 20000
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.db.database_manager import db_manager
+from app.db.session import get_tenant_db_from_path
+
+TENANT_ID = "bench_tenant"
+
+# Request tối thiểu cho dependency (GET: session từ reader pool)
+REQUEST = Request({
+    "type": "http",
+    "method": "GET",
+    "path": f"/tenants/{TENANT_ID}/profiles",
+    "query_string": b"",
+    "headers": [],
+})
+
+
+async def _run_dependency(dependency, *args) -> None:
+    generator = dependency(*args)
+    await generator.__anext__()
+    try:
+        await generator.__anext__()
+    except StopAsyncIteration:
+        pass
+
+
+async def _uncached_dependency(tenant_id: str, request: Request):
+    """Tái hiện dependency cũ: resolve URL và tạo sessionmaker mỗi request."""
+    await db_manager.ensure_tenant_tables(tenant_id)
+    settings.get_tenant_database_url(tenant_id)
+    session_factory = async_sessionmaker(
+        db_manager.get_tenant_engine(tenant_id),
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+    async with session_factory() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
+
+async def _measure(name: str, dependency, iterations: int) -> dict:
+    for _ in range(min(iterations, 1000)):
+        await _run_dependency(dependency, TENANT_ID, REQUEST)
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await _run_dependency(dependency, TENANT_ID, REQUEST)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "variant": name,
+        "iterations": iterations,
+        "us_per_request": round(elapsed / iterations * 1_000_000, 2),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.tenant_database_dir = tmp
+        await db_manager.ensure_tenant_tables(TENANT_ID)
+        results = [
+            await _measure("uncached", _uncached_dependency, args.iterations),
+            await _measure("cached", get_tenant_db_from_path, args.iterations),
+        ]
+        await db_manager.dispose_all()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+"""
+Benchmark: so sánh throughput ghi/đọc của SQLite với cấu hình mặc định
+và với pragma profile trong Settings (WAL, synchronous=NORMAL, mmap, ...).
+
+Chạy:
+    python -m benchmarks.bench_sqlite_pragmas --writers 8 --readers 8 --duration 5
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.core.config import settings
+from app.db.sqlite import apply_sqlite_pragmas
+
+
+async def _writer(engine: AsyncEngine, deadline: float, counters: dict) -> None:
+    while time.perf_counter() < deadline:
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(
+                    text("INSERT INTO items (payload) VALUES (:payload)"),
+                    {"payload": "x" * 200},
+                )
+            counters["writes"] += 1
+        except Exception:
+            counters["errors"] += 1
+
+
+async def _reader(engine: AsyncEngine, deadline: float, counters: dict) -> None:
+    while time.perf_counter() < deadline:
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(
+                    text("SELECT id, payload FROM items ORDER BY id DESC LIMIT 20")
+                )
+            counters["reads"] += 1
+        except Exception:
+            counters["errors"] += 1
+
+
+async def run_profile(
+    name: str, pragmas: dict, workdir: Path, writers: int, readers: int, duration: float
+) -> dict:
+    db_path = workdir / f"{name}.db"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    apply_sqlite_pragmas(engine, pragmas)
+
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("CREATE TABLE IF NOT EXISTS items (id INTEGER PRIMARY KEY, payload TEXT)")
+        )
+
+    counters = {"writes": 0, "reads": 0, "errors": 0}
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(_writer(engine, deadline, counters) for _ in range(writers)),
+        *(_reader(engine, deadline, counters) for _ in range(readers)),
+    )
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+
+    return {
+        "profile": name,
+        "pragmas": pragmas,
+        "writes_per_sec": round(counters["writes"] / elapsed, 1),
+        "reads_per_sec": round(counters["reads"] / elapsed, 1),
+        "errors": counters["errors"],
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+
+    profile = settings.get_sqlite_pragmas()
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        results = [
+            await run_profile(
+                "default", {}, workdir, args.writers, args.readers, args.duration
+            ),
+            await run_profile(
+                "profile", profile, workdir, args.writers, args.readers, args.duration
+            ),
+        ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""
+Benchmark: số tenant databases mới tạo được mỗi giây, chạy DDL (create_all,
+FTS, user_version) so với copy file mẫu (reflink/copy_file_range).
+
+Chạy:
+    python -m benchmarks.bench_tenant_provisioning --tenants 500 --concurrency 1,8,32
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from app.core.config import settings
+from app.db.database_manager import DatabaseManager
+from app.db.tenant_template import clone_file
+from app.models import tenant  # noqa: F401  (đăng ký tenant tables vào TenantBase.metadata)
+
+
+async def _measure(name: str, use_template: bool, concurrency: int, tenants: int) -> dict:
+    settings.tenant_template_enabled = use_template
+    manager = DatabaseManager()
+    template_build_ms = None
+    if use_template:
+        # File mẫu chỉ tạo một lần cho mỗi schema version, không tính vào throughput
+        started = time.perf_counter()
+        await manager.get_tenant_template().ensure()
+        template_build_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    errors = 0
+
+    async def _one(index: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            try:
+                await manager.ensure_tenant_tables(f"{name}_{concurrency}_{index}")
+            except Exception:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_one(index) for index in range(tenants)))
+    elapsed = time.perf_counter() - started
+    await manager.dispose_all()
+
+    return {
+        "variant": name,
+        "concurrency": concurrency,
+        "tenants_per_sec": round(tenants / elapsed, 1),
+        "template_build_ms": template_build_ms,
+        "errors": errors,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tenants", type=int, default=500)
+    parser.add_argument("--concurrency", default="1,8,32")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.tenant_database_dir = tmp
+        settings.tenant_template_dir = f"{tmp}/templates"
+        for concurrency in (int(value) for value in args.concurrency.split(",")):
+            results.append(await _measure("ddl", False, concurrency, args.tenants))
+            results.append(await _measure("template", True, concurrency, args.tenants))
+
+        # Cách copy mà filesystem của thư mục tenant hỗ trợ
+        template = next(Path(settings.tenant_template_dir).glob("tenant_schema_*.db"))
+        clone_method = clone_file(template, Path(tmp) / "clone_probe.db")
+    print(json.dumps({"clone_method": clone_method, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
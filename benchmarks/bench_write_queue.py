@@ -0,0 +1,79 @@
+"""
+Benchmark: throughput ghi vào một tenant "nóng" với nhiều request đồng thời,
+commit riêng từng câu lệnh so với group-commit write queue.
+
+Chạy:
+    python -m benchmarks.bench_write_queue --concurrency 1,8,32,128 --writes 2000
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.db.database_manager import DatabaseManager
+from app.models.tenant import Document
+
+
+async def _individual(manager: DatabaseManager, tenant_id: str, stmt) -> None:
+    async with manager.get_tenant_engine(tenant_id).begin() as conn:
+        await conn.execute(stmt)
+
+
+async def _queued(manager: DatabaseManager, tenant_id: str, stmt) -> None:
+    await manager.submit_tenant_write(tenant_id, stmt)
+
+
+async def _measure(name: str, write, concurrency: int, writes: int) -> dict:
+    manager = DatabaseManager()
+    tenant_id = f"{name}_{concurrency}"
+    await manager.ensure_tenant_tables(tenant_id)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    errors = 0
+
+    async def _one(index: int) -> None:
+        nonlocal errors
+        stmt = insert(Document).values(title=f"doc {index}").returning(Document.id)
+        async with semaphore:
+            try:
+                await write(manager, tenant_id, stmt)
+            except Exception:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_one(index) for index in range(writes)))
+    elapsed = time.perf_counter() - started
+    await manager.dispose_all()
+
+    return {
+        "variant": name,
+        "concurrency": concurrency,
+        "writes_per_sec": round(writes / elapsed, 1),
+        "errors": errors,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", default="1,8,32,128")
+    parser.add_argument("--writes", type=int, default=2000)
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.tenant_database_dir = tmp
+        # Chỉ đo write queue: không ghi thống kê tenant vào shared database
+        settings.tenant_stats_enabled = False
+        for concurrency in (int(value) for value in args.concurrency.split(",")):
+            results.append(await _measure("individual", _individual, concurrency, args.writes))
+            results.append(await _measure("write_queue", _queued, concurrency, args.writes))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+"""
+Đọc Bruno collection (`bruno/`) để dùng các requests trong đó làm kịch bản
+cho load test. Chỉ hỗ trợ phần định dạng `.bru` mà collection đang dùng:
+block `meta`, block method (`get`, `post`, ...), `headers`, `body` và `vars`.
+"""
+
+import json
+import re
+import textwrap
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+HTTP_METHODS = ("get", "post", "put", "patch", "delete")
+
+_BLOCK_START = re.compile(r"^([\w:-]+) \{$")
+_VARIABLE = re.compile(r"\{\{(\w+)\}\}")
+
+
+@dataclass
+class BrunoRequest:
+    """Một request trong Bruno collection."""
+    name: str
+    method: str
+    url: str
+    headers: dict[str, str] = field(default_factory=dict)
+    body: str | None = None
+    folder: str = ""
+
+    def render(self, variables: dict[str, Any]) -> tuple[str, dict[str, str], Any]:
+        """
+        Thay các biến `{{name}}` trong URL, headers và body.
+
+        Returns:
+            (url, headers, body JSON đã parse hoặc None)
+        """
+        url = render(self.url, variables)
+        headers = {key: render(value, variables) for key, value in self.headers.items()}
+        body = json.loads(render(self.body, variables)) if self.body else None
+        return url, headers, body
+
+
+def render(template: str, variables: dict[str, Any]) -> str:
+    """Thay `{{name}}` bằng giá trị trong `variables` (giữ nguyên biến không có giá trị)."""
+    return _VARIABLE.sub(
+        lambda match: str(variables.get(match.group(1), match.group(0))), template
+    )
+
+
+def parse_bru(text: str) -> dict[str, str | dict[str, str]]:
+    """
+    Tách file `.bru` thành các block. Block `body` giữ nguyên nội dung,
+    các block khác được parse thành dict `key: value`.
+    """
+    blocks: dict[str, str | dict[str, str]] = {}
+    name: str | None = None
+    lines: list[str] = []
+    for line in text.splitlines():
+        if name is None:
+            match = _BLOCK_START.match(line)
+            if match:
+                name, lines = match.group(1), []
+            continue
+        if line == "}":
+            if name.startswith("body"):
+                blocks[name] = textwrap.dedent("\n".join(lines)).strip()
+            else:
+                pairs = {}
+                for entry in lines:
+                    key, sep, value = entry.strip().partition(":")
+                    if sep:
+                        pairs[key.strip()] = value.strip()
+                blocks[name] = pairs
+            name = None
+            continue
+        lines.append(line)
+    return blocks
+
+
+def load_request(path: Path, root: Path) -> BrunoRequest | None:
+    """Đọc một file request; trả về None nếu file không phải HTTP request."""
+    blocks = parse_bru(path.read_text(encoding="utf-8"))
+    method = next((method for method in HTTP_METHODS if method in blocks), None)
+    if method is None:
+        return None
+    meta = blocks.get("meta", {})
+    body = blocks.get("body") or blocks.get("body:json")
+    return BrunoRequest(
+        name=meta.get("name", path.stem),
+        method=method.upper(),
+        url=blocks[method]["url"],
+        headers=dict(blocks.get("headers", {})),
+        body=body or None,
+        folder=path.parent.relative_to(root).as_posix(),
+    )
+
+
+def load_collection(root: str | Path = "bruno") -> dict[str, BrunoRequest]:
+    """Đọc mọi request trong collection, key là tên request (`meta.name`)."""
+    root = Path(root)
+    requests: dict[str, BrunoRequest] = {}
+    for path in sorted(root.rglob("*.bru")):
+        if path.parent.name == "environments":
+            continue
+        request = load_request(path, root)
+        if request is not None:
+            requests[request.name] = request
+    return requests
+
+
+def load_environment(root: str | Path = "bruno", name: str = "local") -> dict[str, str]:
+    """Đọc biến của một environment (`environments/<name>.bru`)."""
+    path = Path(root) / "environments" / f"{name}.bru"
+    variables = parse_bru(path.read_text(encoding="utf-8")).get("vars", {})
+    return dict(variables)
@@ -0,0 +1,102 @@
+"""
+Tìm kiếm full-text documents có nội dung trong blob store.
+
+Chạy:
+    python -m unittest tests.test_document_search
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+import httpx
+from sqlalchemy import insert, update
+
+from app.core.config import settings
+from app.db.blob_offload import index_offloaded_documents, offload_tenant_documents
+from app.db.database_manager import db_manager
+from app.main import app
+from app.models.tenant import Document
+
+INLINE_MAX_BYTES = 64
+LARGE_CONTENT = "Báo cáo quý ba " + "nội dung dài " * 20 + "ngựa vằn"
+
+
+class OffloadedDocumentSearchTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._saved = {
+            name: getattr(settings, name)
+            for name in (
+                "tenant_database_dir",
+                "blob_storage_dir",
+                "document_inline_max_bytes",
+                "tenant_stats_enabled",
+            )
+        }
+        settings.tenant_database_dir = str(Path(self._tmp.name) / "tenants")
+        settings.blob_storage_dir = str(Path(self._tmp.name) / "blobs")
+        settings.document_inline_max_bytes = INLINE_MAX_BYTES
+        settings.tenant_stats_enabled = False
+        # db_manager global đọc TENANT_STATS_ENABLED lúc import
+        self._stats_enabled = db_manager.tenant_stats.enabled
+        db_manager.tenant_stats.enabled = False
+        self.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        )
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+        await db_manager.dispose_all()
+        db_manager.tenant_stats.enabled = self._stats_enabled
+        for name, value in self._saved.items():
+            setattr(settings, name, value)
+        self._tmp.cleanup()
+
+    async def _search(self, tenant_id: str, q: str) -> list[dict]:
+        response = await self.client.get(f"/tenants/{tenant_id}/documents/search", params={"q": q})
+        self.assertEqual(response.status_code, 200, response.text)
+        return response.json()
+
+    async def test_search_finds_offloaded_document(self):
+        tenant_id = "search_offloaded"
+        response = await self.client.post(
+            f"/tenants/{tenant_id}/documents",
+            json={"title": "Báo cáo", "content": LARGE_CONTENT},
+        )
+        self.assertEqual(response.status_code, 200, response.text)
+        document = response.json()
+        self.assertIsNone(document["content"])
+        self.assertIsNotNone(document["content_hash"])
+
+        results = await self._search(tenant_id, "ngua van")
+        self.assertEqual([result["id"] for result in results], [document["id"]])
+        self.assertIn("<mark>ngựa</mark>", results[0]["snippet"])
+
+    async def test_offload_keeps_document_searchable(self):
+        tenant_id = "search_offload_cli"
+        await db_manager.ensure_tenant_tables(tenant_id)
+        async with db_manager.get_tenant_engine(tenant_id).begin() as conn:
+            result = await conn.execute(
+                insert(Document)
+                .values(title="Báo cáo", content=LARGE_CONTENT)
+                .returning(Document.id)
+            )
+            document_id = result.scalar_one()
+
+        self.assertEqual(await offload_tenant_documents(tenant_id), 1)
+        results = await self._search(tenant_id, "ngựa")
+        self.assertEqual([result["id"] for result in results], [document_id])
+
+        # Document đã offload nhưng chưa có search_text (offload trước khi có cột)
+        async with db_manager.get_tenant_engine(tenant_id).begin() as conn:
+            await conn.execute(update(Document).values(search_text=None))
+        self.assertEqual(await self._search(tenant_id, "ngựa"), [])
+
+        self.assertEqual(await index_offloaded_documents(tenant_id), 1)
+        results = await self._search(tenant_id, "ngựa")
+        self.assertEqual([result["id"] for result in results], [document_id])
+
+
+if __name__ == "__main__":
+    unittest.main()
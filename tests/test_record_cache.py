@@ -0,0 +1,109 @@
+"""
+Invalidation của RecordCache giữa các worker.
+
+Mỗi "worker" là một RecordCache riêng (TTLCache và offset đọc riêng), dùng
+chung file log invalidation như các process uvicorn trên cùng máy. Thời gian
+được điều khiển bằng clock giả để kiểm tra poll interval và TTL.
+
+Chạy:
+    python -m unittest tests.test_record_cache
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.core.cache import (
+    FileInvalidationBackend,
+    InvalidationBackend,
+    RecordCache,
+    TTLCache,
+    create_invalidation_backend,
+    user_keys,
+)
+from app.core.config import Settings
+
+USER = {"id": 1, "email": "a@example.com", "name": "A"}
+TTL = 60.0
+POLL_INTERVAL = 0.5
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class RecordCacheInvalidationTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.log_path = Path(self._tmp.name) / "record_invalidations.log"
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _worker(self, backend: InvalidationBackend) -> RecordCache:
+        cache = RecordCache(
+            TTLCache(100, TTL, clock=self.clock),
+            backend=backend,
+            poll_interval=POLL_INTERVAL,
+            clock=self.clock,
+        )
+        cache.set(user_keys(USER), USER)
+        return cache
+
+    def test_write_on_one_worker_invalidates_other_worker(self):
+        writer = self._worker(FileInvalidationBackend(self.log_path))
+        reader = self._worker(FileInvalidationBackend(self.log_path))
+        self.assertEqual(reader.get("user:id:1"), USER)
+
+        writer.invalidate(*user_keys(USER))
+        self.assertIsNone(writer.get("user:id:1"))
+
+        # Reader chỉ đọc file log mỗi poll interval: trước đó vẫn thấy bản cũ
+        self.assertEqual(reader.get("user:id:1"), USER)
+        self.clock.advance(POLL_INTERVAL)
+        self.assertIsNone(reader.get("user:id:1"))
+        self.assertIsNone(reader.get("user:email:a@example.com"))
+
+    def test_backends_from_settings_share_the_log(self):
+        config = Settings(
+            record_cache_backend="file", record_cache_invalidation_path=str(self.log_path)
+        )
+        writer = self._worker(create_invalidation_backend(config))
+        reader = self._worker(create_invalidation_backend(config))
+
+        writer.invalidate("user:id:1")
+        self.clock.advance(POLL_INTERVAL)
+        self.assertIsNone(reader.get("user:id:1"))
+        # Key khác của cùng bản ghi không bị invalidate
+        self.assertEqual(reader.get("user:email:a@example.com"), USER)
+
+    def test_new_worker_skips_earlier_invalidations(self):
+        FileInvalidationBackend(self.log_path).publish(["user:id:1"])
+        worker = self._worker(FileInvalidationBackend(self.log_path))
+        self.clock.advance(POLL_INTERVAL)
+        self.assertEqual(worker.get("user:id:1"), USER)
+
+    def test_ttl_bounds_staleness_without_broadcast(self):
+        # Backend memory không phát invalidation: worker khác chỉ thấy bản mới
+        # khi entry hết TTL
+        writer = self._worker(InvalidationBackend())
+        reader = self._worker(InvalidationBackend())
+
+        writer.invalidate(*user_keys(USER))
+        self.clock.advance(TTL - 1)
+        self.assertEqual(reader.get("user:id:1"), USER)
+        self.clock.advance(1)
+        self.assertIsNone(reader.get("user:id:1"))
+        self.assertIsNone(reader.get("user:email:a@example.com"))
+
+
+if __name__ == "__main__":
+    unittest.main()
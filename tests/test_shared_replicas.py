@@ -0,0 +1,161 @@
+"""
+Routing đọc/ghi của shared database với read replicas.
+
+Replicas là bản copy file SQLite của shared database; mỗi bản copy có một
+user đánh dấu (`whoami@example.com`) với tên khác nhau để biết câu đọc đã
+chạy trên database nào.
+
+Chạy:
+    python -m unittest tests.test_shared_replicas
+"""
+
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from contextlib import closing
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.db.base import SharedBase
+from app.db.database_manager import DatabaseManager
+from app.db.routing import SharedRoutingState
+from app.models import shared  # noqa: F401  (đăng ký shared tables vào SharedBase.metadata)
+from app.models.shared import User
+
+MARKER_EMAIL = "whoami@example.com"
+
+
+class SharedReplicaRoutingTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        tmp = Path(self._tmp.name)
+        self.primary_path = tmp / "shared.db"
+        self.replica_paths = [tmp / "replica_1.db", tmp / "replica_2.db"]
+
+        engine = create_async_engine(f"sqlite+aiosqlite:///{self.primary_path}")
+        async with engine.begin() as conn:
+            await conn.run_sync(SharedBase.metadata.create_all)
+            await conn.execute(User.__table__.insert().values(email=MARKER_EMAIL, name="primary"))
+        await engine.dispose()
+
+        for index, path in enumerate(self.replica_paths, start=1):
+            shutil.copyfile(self.primary_path, path)
+            with closing(sqlite3.connect(path)) as conn, conn:
+                conn.execute(
+                    "UPDATE users SET name = ? WHERE email = ?", (f"replica_{index}", MARKER_EMAIL)
+                )
+
+        self._saved = {
+            name: getattr(settings, name)
+            for name in (
+                "shared_database_url",
+                "shared_database_replica_urls",
+                "shared_replica_strategy",
+                "tenant_database_dir",
+                "tenant_stats_enabled",
+            )
+        }
+        settings.shared_database_url = f"sqlite+aiosqlite:///{self.primary_path}"
+        settings.shared_database_replica_urls = [
+            f"sqlite+aiosqlite:///{path}" for path in self.replica_paths
+        ]
+        settings.tenant_database_dir = str(tmp / "tenants")
+        settings.tenant_stats_enabled = False
+
+    async def asyncTearDown(self):
+        if hasattr(self, "manager"):
+            await self.manager.dispose_all()
+        for name, value in self._saved.items():
+            setattr(settings, name, value)
+        self._tmp.cleanup()
+
+    def _create_manager(self, strategy: str) -> DatabaseManager:
+        settings.shared_replica_strategy = strategy
+        self.manager = DatabaseManager()
+        return self.manager
+
+    def _read_session(self, routing: SharedRoutingState | None = None):
+        """Session đọc như dependency get_shared_read_db."""
+        session = self.manager.get_shared_read_session_factory()()
+        if routing is not None:
+            session.info["routing"] = routing
+            routing.read_sessions.append(session.sync_session)
+        return session
+
+    def _write_session(self, routing: SharedRoutingState):
+        """Session ghi như dependency get_shared_db."""
+        session = self.manager.get_session_factory("shared")()
+        routing.track_writes(session.sync_session)
+        return session
+
+    @staticmethod
+    async def _whoami(session) -> str:
+        result = await session.execute(select(User.name).where(User.email == MARKER_EMAIL))
+        return result.scalar_one()
+
+    async def test_round_robin_reads(self):
+        self._create_manager("round_robin")
+        served = []
+        for _ in range(4):
+            async with self._read_session() as session:
+                served.append(await self._whoami(session))
+        self.assertEqual(served, ["replica_1", "replica_2", "replica_1", "replica_2"])
+
+    async def test_least_busy_reads(self):
+        self._create_manager("least_busy")
+        replica_1, replica_2 = self.manager._shared_replica_engines
+
+        # replica_1 đang có connection checkout: đọc mới đi replica_2
+        async with replica_1.connect():
+            async with self._read_session() as session:
+                self.assertEqual(await self._whoami(session), "replica_2")
+
+        async with replica_2.connect():
+            async with self._read_session() as session:
+                self.assertEqual(await self._whoami(session), "replica_1")
+
+    async def test_writes_go_to_primary(self):
+        self._create_manager("round_robin")
+        routing = SharedRoutingState()
+        async with self._write_session(routing) as session:
+            session.add(User(email="new@example.com", name="New"))
+            await session.commit()
+
+        for path, expected in [(self.primary_path, 1), *((p, 0) for p in self.replica_paths)]:
+            with closing(sqlite3.connect(path)) as conn:
+                count = conn.execute(
+                    "SELECT COUNT(*) FROM users WHERE email = 'new@example.com'"
+                ).fetchone()[0]
+            self.assertEqual(count, expected, path.name)
+
+    async def test_read_your_writes_in_request(self):
+        self._create_manager("round_robin")
+        routing = SharedRoutingState()
+        async with self._read_session(routing) as read_session:
+            # Trước khi ghi: đọc từ replica
+            self.assertEqual(await self._whoami(read_session), "replica_1")
+
+            async with self._write_session(routing) as write_session:
+                write_session.add(User(email="new@example.com", name="New"))
+                await write_session.commit()
+
+            # Sau khi request đã ghi: session đọc đang mở và session mới đều dùng primary
+            self.assertEqual(await self._whoami(read_session), "primary")
+            async with self._read_session(routing) as session:
+                self.assertEqual(await self._whoami(session), "primary")
+                result = await session.execute(
+                    select(User.name).where(User.email == "new@example.com")
+                )
+                self.assertEqual(result.scalar_one(), "New")
+
+        # Request khác (không ghi) vẫn đọc từ replica
+        async with self._read_session(SharedRoutingState()) as session:
+            self.assertIn(await self._whoami(session), ("replica_1", "replica_2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+Eviction của tenant engine cache khi engine/session factory vẫn còn bị giữ.
+
+Chạy:
+    python -m unittest tests.test_tenant_engine_cache
+"""
+
+import asyncio
+import tempfile
+import unittest
+
+from sqlalchemy import select, text
+
+from app.core.config import settings
+from app.db.database_manager import DatabaseManager
+from app.db.tenant_cache import TenantEngineClosedError
+from app.models.tenant import Document
+
+
+class TenantEngineEvictionTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._saved = {
+            name: getattr(settings, name)
+            for name in (
+                "tenant_database_dir",
+                "tenant_engine_cache_size",
+                "tenant_engine_idle_ttl",
+                "tenant_stats_enabled",
+            )
+        }
+        settings.tenant_database_dir = self._tmp.name
+        settings.tenant_engine_cache_size = 1
+        settings.tenant_engine_idle_ttl = 0
+        settings.tenant_stats_enabled = False
+        self.manager = DatabaseManager()
+        for tenant_id in ("t1", "t2"):
+            await self.manager.ensure_tenant_tables(tenant_id)
+
+    async def asyncTearDown(self):
+        await self.manager.dispose_all()
+        for name, value in self._saved.items():
+            setattr(settings, name, value)
+        self._tmp.cleanup()
+
+    async def _evict(self, tenant_id: str, other_tenant_id: str) -> None:
+        """Dùng tenant khác để đẩy `tenant_id` ra khỏi cache (max_size=1)."""
+        self.manager.get_tenant_engine(other_tenant_id)
+        self.assertNotIn(tenant_id, self.manager._tenant_engines)
+        await asyncio.gather(*self.manager._disposal_tasks)
+
+    async def test_held_factory_fails_fast_after_eviction(self):
+        session_factory = self.manager.get_tenant_session_factory("t1")
+        engine = self.manager.get_tenant_engine("t1")
+        await self._evict("t1", "t2")
+
+        async with session_factory() as session:
+            with self.assertRaises(TenantEngineClosedError):
+                await session.execute(select(Document))
+        with self.assertRaises(TenantEngineClosedError):
+            async with engine.connect():
+                pass
+        # Không có connection nào được mở vào pool mới của engine đã dispose
+        self.assertEqual(engine.pool.checkedout(), 0)
+
+        # Lấy lại từ DatabaseManager: engine mới hoạt động bình thường
+        async with self.manager.get_tenant_session_factory("t1")() as session:
+            result = await session.execute(select(Document))
+            self.assertEqual(result.all(), [])
+
+    async def test_busy_engine_is_not_evicted(self):
+        async with self.manager.get_tenant_engine("t1").connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            self.manager.get_tenant_engine("t2")
+            self.assertIn("t1", self.manager._tenant_engines)
+            await conn.execute(text("SELECT 1"))
+
+
+if __name__ == "__main__":
+    unittest.main()